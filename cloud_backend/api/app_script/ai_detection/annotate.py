@@ -0,0 +1,167 @@
+import threading
+import time
+import numpy as np
+import cv2
+from config import AI_DETECTION_JPEG_QUALITY
+
+# BGR colors cycled by class index
+_COLORS = [
+    (56, 56, 255),
+    (151, 157, 255),
+    (31, 112, 255),
+    (29, 178, 255),
+    (49, 210, 207),
+    (10, 249, 72),
+]
+
+
+def draw_detections(image, boxes, classes, scores, class_names):
+    """
+    Draw labelled detection boxes on a copy of an image
+
+    Args:
+        image: BGR image (not modified)
+        boxes: Nx4 array of x1, y1, x2, y2 in image pixels
+        classes: N class indices
+        scores: N confidences
+        class_names: Mapping from class index to name
+
+    Returns:
+        numpy.ndarray: Annotated copy of the image
+    """
+    annotated = image.copy()
+    height, width = annotated.shape[:2]
+    line_width = max(round((height + width) / 2 * 0.003), 2)
+    font_scale = line_width / 3
+
+    for box, c, score in zip(boxes, classes, scores):
+        x1, y1, x2, y2 = (int(v) for v in box)
+        color = _COLORS[int(c) % len(_COLORS)]
+        cv2.rectangle(annotated, (x1, y1), (x2, y2), color, line_width)
+
+        label = f"{class_names[int(c)]} {float(score):.2f}"
+        (text_w, text_h), _ = cv2.getTextSize(
+            label, cv2.FONT_HERSHEY_SIMPLEX, font_scale, max(line_width - 1, 1)
+        )
+        label_top = y1 - text_h - 6 if y1 - text_h - 6 >= 0 else y1
+        cv2.rectangle(
+            annotated, (x1, label_top), (x1 + text_w, label_top + text_h + 6), color, -1
+        )
+        cv2.putText(
+            annotated,
+            label,
+            (x1, label_top + text_h + 2),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            font_scale,
+            (255, 255, 255),
+            max(line_width - 1, 1),
+            cv2.LINE_AA,
+        )
+    return annotated
+
+
+class DetectionImage:
+    """
+    Detection result image that is rendered and encoded only on demand
+
+    Holds the frame plus boxes/classes/scores. The annotated image is drawn
+    the first time a sink asks for it and encoded to JPEG once; storage and
+    notifications share the same bytes. A frame without detections is never
+    re-encoded, its original JPEG is reused, and a Frame source is only
+    decoded at full resolution if something has to be drawn. The time spent
+    rendering and encoding is kept in timings (milliseconds).
+
+    Args:
+        image: Decoded BGR frame or a camera Frame (not modified)
+        boxes: Nx4 array of x1, y1, x2, y2 in full-resolution pixels
+        classes: N class indices
+        scores: N confidences
+        class_names: Mapping from class index to name
+        source_jpeg: Original JPEG bytes of the frame, if available
+        plot: Optional callable rendering the annotated image (e.g. the
+            Ultralytics Results.plot), used instead of draw_detections
+        quality: JPEG quality for the encoded image
+    """
+
+    def __init__(
+        self,
+        image,
+        boxes,
+        classes,
+        scores,
+        class_names,
+        source_jpeg=None,
+        plot=None,
+        quality=AI_DETECTION_JPEG_QUALITY,
+    ):
+        self.image = image
+        self.boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        self.classes = np.asarray(classes, dtype=np.int32).reshape(-1)
+        self.scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+        self.class_names = class_names
+        self.source_jpeg = source_jpeg
+        self.plot = plot
+        self.quality = quality
+        self._rendered = None
+        self._jpeg = None
+        self._lock = threading.Lock()
+        self.timings = {}
+
+    @property
+    def size(self):
+        """Element count of the full frame, like numpy's ndarray.size"""
+        if isinstance(self.image, np.ndarray):
+            return self.image.size
+        if self.image is not None and self.image.dimensions:
+            return self.image.width * self.image.height * 3
+        return 0
+
+    def _full_image(self):
+        if self.image is None or isinstance(self.image, np.ndarray):
+            return self.image
+        return self.image.image
+
+    @property
+    def has_detections(self):
+        return len(self.classes) > 0
+
+    def render(self):
+        """Get the annotated image, drawing it on first use"""
+        with self._lock:
+            return self._render()
+
+    def _render(self):
+        if self._rendered is None:
+            started = time.perf_counter()
+            if not self.has_detections:
+                self._rendered = self._full_image()
+            elif self.plot is not None:
+                self._rendered = self.plot()
+            else:
+                self._rendered = draw_detections(
+                    self._full_image(),
+                    self.boxes,
+                    self.classes,
+                    self.scores,
+                    self.class_names,
+                )
+            self.timings["render"] = (time.perf_counter() - started) * 1000
+        return self._rendered
+
+    def encode(self):
+        """Get the annotated image as JPEG bytes, encoding it at most once"""
+        with self._lock:
+            if self._jpeg is None:
+                if not self.has_detections and self.source_jpeg:
+                    self._jpeg = self.source_jpeg
+                else:
+                    rendered = self._render()
+                    started = time.perf_counter()
+                    ok, buffer = cv2.imencode(
+                        ".jpg", rendered, [cv2.IMWRITE_JPEG_QUALITY, self.quality]
+                    )
+                    if not ok:
+                        raise ValueError("JPEG encoding of detection image failed")
+                    self._jpeg = buffer.tobytes()
+                    self.timings["encode"] = (time.perf_counter() - started) * 1000
+            return self._jpeg
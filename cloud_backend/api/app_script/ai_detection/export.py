@@ -0,0 +1,95 @@
+import importlib.util
+import os
+import shutil
+from config import AI_MODEL_FORMAT, AI_EXPORT_IMGSZ
+from utils.terminal import print_info, print_warning, print_success, print_error
+
+# Ultralytics export format -> (runtime module needed at inference, path suffix)
+EXPORT_FORMATS = {
+    "onnx": ("onnxruntime", ".onnx"),
+    "openvino": ("openvino", "_openvino_model"),
+}
+
+
+def exported_model_path(model_path, model_format, imgsz=AI_EXPORT_IMGSZ):
+    """Path of the cached export of a .pt model for a runtime and input size"""
+    runtime, suffix = EXPORT_FORMATS[model_format]
+    return f"{os.path.splitext(model_path)[0]}_{imgsz}{suffix}"
+
+
+def is_format_available(model_format):
+    """Check that the runtime for a model format is installed"""
+    if model_format == "pytorch":
+        return True
+    if model_format not in EXPORT_FORMATS:
+        return False
+    runtime, _ = EXPORT_FORMATS[model_format]
+    return importlib.util.find_spec(runtime) is not None
+
+
+def resolve_model_path(model_path, model_format=AI_MODEL_FORMAT, imgsz=AI_EXPORT_IMGSZ):
+    """
+    Get the model file to load for a runtime, exporting it if needed
+
+    The export is cached next to the .pt weights, one per input size, and
+    reused until the weights are newer than it. Exports have a dynamic
+    batch axis so micro-batches and tiled frames run in one call. If the
+    runtime is not installed or the export fails, the .pt weights are used
+    instead.
+
+    Args:
+        model_path: Path to the .pt weights
+        model_format: "pytorch", "onnx" or "openvino"
+        imgsz: Input size for the export
+
+    Returns:
+        tuple: (path to load, format actually used)
+    """
+    if model_format == "pytorch":
+        return model_path, "pytorch"
+
+    if model_format not in EXPORT_FORMATS:
+        print_warning(f"Unknown model format '{model_format}', using PyTorch")
+        return model_path, "pytorch"
+
+    if not is_format_available(model_format):
+        runtime, _ = EXPORT_FORMATS[model_format]
+        print_warning(f"{runtime} is not installed, using PyTorch model")
+        return model_path, "pytorch"
+
+    export_path = exported_model_path(model_path, model_format, imgsz)
+    if os.path.exists(export_path) and os.path.getmtime(
+        export_path
+    ) >= os.path.getmtime(model_path):
+        print_info(f"Using cached {model_format} model at {export_path}")
+        return export_path, model_format
+
+    try:
+        from ultralytics import YOLO
+
+        print_info(f"Exporting {model_path} to {model_format} (one-time)...")
+        exported = YOLO(model_path).export(
+            format=model_format,
+            imgsz=imgsz,
+            # Dynamic batch so micro-batches run in one call
+            dynamic=True,
+            device="cpu",
+            verbose=False,
+        )
+
+        # Ultralytics names the export after the weights only; move it to a
+        # name that records the input size it was built for
+        _, suffix = EXPORT_FORMATS[model_format]
+        exported = (
+            str(exported) if exported else os.path.splitext(model_path)[0] + suffix
+        )
+        if os.path.isdir(export_path):
+            shutil.rmtree(export_path)
+        elif os.path.exists(export_path):
+            os.remove(export_path)
+        shutil.move(exported, export_path)
+        print_success(f"Exported {model_format} model to {export_path}")
+        return export_path, model_format
+    except Exception as e:
+        print_error(f"Error exporting model to {model_format}: {e}")
+        return model_path, "pytorch"
@@ -7,12 +7,87 @@ import threading
 from ultralytics import YOLO
 from PIL import Image
 import io
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from camera.frame import as_frame
+from ai_detection.inference import InferenceService
+from ai_detection.annotate import DetectionImage
+from ai_detection.export import resolve_model_path
+from ai_detection.gating import FrameGate
+from ai_detection.tiling import TileGrid, RegionMask, nms
+from ai_detection.result_cache import ResultCache, content_hash
+from config import (
+    AI_DETECT_TIMEOUT,
+    AI_INFERENCE_BACKEND,
+    AI_MODEL_FORMAT,
+    AI_FRAME_GATE_ENABLED,
+    AI_INFERENCE_IMGSZ,
+    AI_REDUCED_DECODE,
+    AI_TILED_INFERENCE,
+    AI_TILE_NMS_IOU,
+    AI_RESULT_CACHE_ENABLED,
+)
 from utils.terminal import print_info, print_error, print_warning, print_success
 
 # Set environment variable to avoid issues with OpenCV
 os.environ["KMP_DUPLICATE_LIB_OK"] = "True"
 
 
+def _elapsed_ms(started):
+    return (time.perf_counter() - started) * 1000
+
+
+def _add_timing(timings, stage, ms):
+    timings[stage] = timings.get(stage, 0.0) + ms
+
+
+def _add_model_speed(timings, future, results, waited_ms):
+    """
+    Split the wait for model results into stages
+
+    A frame waits for the whole batch it ran in, so the batch wall time
+    stamped on the future by the inference service is its model time, and
+    the stamped queue wait is its queueing. Ultralytics' per-image speeds
+    are the batch times divided by the batch size, so they only give the
+    preprocess/inference/postprocess proportions. Without the stamps the
+    speeds are used as-is and the rest of the wait counts as queueing;
+    without either, the whole wait counts as inference.
+    """
+    speeds = [
+        (
+            result.get("speed")
+            if isinstance(result, dict)
+            else getattr(result, "speed", None)
+        )
+        for result in results
+    ]
+    shares = {}
+    if speeds and all(speeds):
+        for stage, key in (
+            ("preprocess", "preprocess"),
+            ("inference", "inference"),
+            ("nms", "postprocess"),
+        ):
+            shares[stage] = sum(speed.get(key) or 0.0 for speed in speeds)
+
+    batch_ms = getattr(future, "batch_ms", None)
+    if batch_ms is not None:
+        model_ms = sum(shares.values())
+        if model_ms > 0:
+            for stage, ms in shares.items():
+                _add_timing(timings, stage, batch_ms * ms / model_ms)
+        else:
+            _add_timing(timings, "inference", batch_ms)
+        _add_timing(timings, "queue", future.queue_ms)
+        return
+
+    if not shares:
+        _add_timing(timings, "inference", waited_ms)
+        return
+    for stage, ms in shares.items():
+        _add_timing(timings, stage, ms)
+    _add_timing(timings, "queue", max(0.0, waited_ms - sum(shares.values())))
+
+
 class TimeoutError(Exception):
     pass
 
@@ -42,17 +117,45 @@ class ThreadWithTimeout(threading.Thread):
 
 
 class FireDetector:
-    def __init__(self, model_path, conf_threshold=0.25, iou_threshold=0.45):
+    def __init__(
+        self,
+        model_path,
+        conf_threshold=0.25,
+        iou_threshold=0.45,
+        backend=AI_INFERENCE_BACKEND,
+        model_format=AI_MODEL_FORMAT,
+    ):
         self.model_path = model_path
+        self.model_format = model_format
+        # Weights actually loaded (an exported model for onnx/openvino)
+        self.runtime_path = model_path
         self.conf_threshold = conf_threshold
         self.iou_threshold = iou_threshold
+        self.backend = backend
+        self.imgsz = AI_INFERENCE_IMGSZ
+        self.reduced_decode = AI_REDUCED_DECODE
         self.model = None
         self.model_loaded = False
+        self.class_names = None
+        # Worker processes owning the model when backend == "process"
+        self.process_pool = None
+        # Long-lived worker that owns the model and batches frames; a hung
+        # predict gets its worker replaced instead of stalling every camera
+        self.inference = InferenceService(
+            self._predict_batch, batch_timeout=AI_DETECT_TIMEOUT
+        )
+        # Optional reuse of results for unchanged scenes
+        self.frame_gate = FrameGate() if AI_FRAME_GATE_ENABLED else None
+        # Results (and stored files) of recent frames, by content hash
+        self.result_cache = ResultCache() if AI_RESULT_CACHE_ENABLED else None
+        # Regions never analyzed, and the tiles used for small distant smoke
+        self.roi_mask = RegionMask()
+        self.tiles = TileGrid(mask=self.roi_mask) if AI_TILED_INFERENCE else None
 
     def _load_model_worker(self):
         """Worker function to load the model in a separate thread"""
         try:
-            model = YOLO(self.model_path)
+            model = YOLO(self.runtime_path, task="detect")
             # Immediately run a small inference to fully initialize the model
             dummy_img = np.zeros((100, 100, 3), dtype=np.uint8)
             model.predict(dummy_img, verbose=False)
@@ -61,14 +164,43 @@ class FireDetector:
             print_error(f"Error in model loading worker: {e}")
             raise
 
+    def _load_process_pool(self):
+        """Start the inference worker processes, each loading the model"""
+        from ai_detection.process_pool import ProcessInferencePool
+
+        print_info(f"Loading YOLO model from {self.runtime_path} in worker processes")
+        pool = ProcessInferencePool(
+            self.runtime_path, self.conf_threshold, self.iou_threshold, imgsz=self.imgsz
+        )
+        if not pool.start():
+            return False
+
+        self.process_pool = pool
+        self.class_names = pool.names
+        # One dispatcher per process so batches run on all cores at once
+        self.inference = InferenceService(
+            pool.predict_batch, name="InferenceService", workers=pool.size
+        )
+        self.model_loaded = True
+        print_success("YOLO model loaded successfully")
+        return True
+
     def load_model(self):
         """Load the YOLO model with cross-platform timeout"""
         try:
-            if self.model_loaded and self.model is not None:
+            if self.model_loaded:
                 print_info("YOLO model already loaded")
                 return True
 
-            print_info(f"Loading YOLO model from {self.model_path}")
+            # Export once for ONNX Runtime / OpenVINO, reused on later starts
+            self.runtime_path, self.model_format = resolve_model_path(
+                self.model_path, self.model_format
+            )
+
+            if self.backend == "process":
+                return self._load_process_pool()
+
+            print_info(f"Loading YOLO model from {self.runtime_path}")
 
             # Free up memory before loading model
             gc.collect()
@@ -90,6 +222,8 @@ class FireDetector:
                 print_error(f"Error during model initialization: {e}")
                 return False
 
+            # .names also works for exported models (read from their metadata)
+            self.class_names = self.model.names
             self.model_loaded = True
             print_success("YOLO model loaded successfully")
             return True
@@ -97,81 +231,229 @@ class FireDetector:
             print_error(f"Error loading YOLO model: {e}")
             return False
 
-    def _detect_worker(self, img):
-        """Worker function to run detection in a separate thread"""
+    def _predict_batch(self, images):
+        """Run one forward pass over a batch of images (inference thread only)"""
         return self.model.predict(
-            img,
+            images,
             conf=self.conf_threshold,
             iou=self.iou_threshold,
+            imgsz=self.imgsz,
             device="cpu",
             verbose=False,
             max_det=50,
         )
 
-    def detect(self, image_data):
+    @staticmethod
+    def _unpack_result(result):
+        """Get (boxes, classes, confidences, plot) from one model result"""
+        if isinstance(result, dict):
+            # Plain arrays from the process backend
+            return result["boxes"], result["cls"], result["conf"], None
+        if hasattr(result, "boxes") and hasattr(result.boxes, "cls"):
+            return (
+                result.boxes.xyxy.cpu().numpy(),
+                result.boxes.cls.cpu().numpy(),
+                result.boxes.conf.cpu().numpy(),
+                result.plot,
+            )
+        return np.zeros((0, 4), dtype=np.float32), [], [], None
+
+    def _infer(self, img, scale, timings):
+        """
+        Run the whole frame through the model
+
+        Returns:
+            tuple: (boxes, classes, confidences, plot) in full-resolution pixels
+        """
+        # Queue the frame on the inference service, which may batch it with
+        # frames from other sessions and cameras
+        started = time.perf_counter()
+        future = self.inference.submit(img)
+        try:
+            result = future.result(timeout=AI_DETECT_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+        _add_model_speed(timings, future, [result], _elapsed_ms(started))
+
+        boxes, classes, confidences, plot = self._unpack_result(result)
+        if scale != 1.0:
+            # Map boxes back to full resolution for evidence images;
+            # Results.plot would only draw on the reduced frame
+            boxes = np.asarray(boxes, dtype=np.float32) * scale
+            plot = None
+        return boxes, classes, confidences, plot
+
+    def _infer_tiled(self, frame, img, scale, timings):
+        """
+        Run the whole frame plus overlapping full-resolution tiles as one batch
+
+        Distant smoke covers only a few pixels once a UXGA frame is shrunk to
+        imgsz; tiles keep it at native resolution, while the whole-frame pass
+        still catches fires larger than a tile. Boxes are merged with
+        cross-tile NMS.
+
+        Returns:
+            tuple: (boxes, classes, confidences) in full-resolution pixels
+        """
+        started = time.perf_counter()
+        full = frame.image
+        _add_timing(timings, "decode", _elapsed_ms(started))
+
+        started = time.perf_counter()
+        height, width = full.shape[:2]
+        tiles = self.tiles.tiles(width, height)
+        crops = [full[y1:y2, x1:x2] for x1, y1, x2, y2 in tiles]
+        _add_timing(timings, "preprocess", _elapsed_ms(started))
+
+        started = time.perf_counter()
+        future = self.inference.submit_batch([img] + crops)
+        try:
+            results = future.result(timeout=AI_DETECT_TIMEOUT)
+        except FutureTimeoutError:
+            future.cancel()
+            raise
+        _add_model_speed(timings, future, results, _elapsed_ms(started))
+
+        started = time.perf_counter()
+        all_boxes, all_classes, all_confidences = [], [], []
+        offsets = [(0, 0, scale)] + [(x1, y1, 1.0) for x1, y1, _, _ in tiles]
+        for (dx, dy, factor), result in zip(offsets, results):
+            boxes, classes, confidences, _ = self._unpack_result(result)
+            boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4) * factor
+            all_boxes.append(boxes + np.array([dx, dy, dx, dy], dtype=np.float32))
+            all_classes.append(np.asarray(classes).reshape(-1))
+            all_confidences.append(np.asarray(confidences).reshape(-1))
+
+        boxes = np.concatenate(all_boxes)
+        classes = np.concatenate(all_classes)
+        confidences = np.concatenate(all_confidences)
+        keep = nms(boxes, confidences, classes, AI_TILE_NMS_IOU)
+        _add_timing(timings, "nms", _elapsed_ms(started))
+        return boxes[keep], classes[keep], confidences[keep]
+
+    def detect(self, image_data, camera_id=None):
         """
         Detect fire and smoke in image with cross-platform timeout
 
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes or a Frame (decoded only once and reused)
+            camera_id: Camera the frame came from, used by the frame gate
 
         Returns:
             tuple: (processed_image, detection_text, fire_detected, detection_info)
+            where processed_image is a DetectionImage that renders the
+            annotations only when asked for
         """
-        if self.model is None:
+        if not self.model_loaded:
             if not self.load_model():
                 return None, "Failed to load model", False, {}
 
         try:
             start_time = time.time()
-
-            # Convert image data to numpy array
-            nparr = np.frombuffer(image_data, np.uint8)
-            img = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-            if img is None or img.size == 0:
-                return None, "Invalid image data", False, {}
-
-            # Use threading-based timeout for detection (15 seconds)
-            try:
-                detect_thread = ThreadWithTimeout(
-                    target=self._detect_worker, args=(img,), timeout=15
-                )
-                detect_thread.start()
-                results = (
-                    detect_thread.join()
-                )  # This will raise TimeoutError if it times out
-
-            except TimeoutError:
-                print_error("Detection timed out after 15 seconds, skipping")
-                return None, "Detection timed out", False, {}
-            except Exception as e:
-                print_error(f"Error during detection: {e}")
-                return None, f"Detection error: {str(e)}", False, {}
-
-            # Process results
-            if not results or len(results) == 0:
-                return None, "No results from model", False, {}
-
-            result = results[0]
-            class_names = self.model.model.names
+            timings = {}
+
+            frame = as_frame(image_data)
+
+            # Byte-identical frames (a stuck camera resending its buffer)
+            # get the cached result without decoding or inference
+            cached = None
+            frame_hash = None
+            if self.result_cache is not None and frame.data:
+                started = time.perf_counter()
+                frame_hash = content_hash(frame.data)
+                cached = self.result_cache.get(frame_hash)
+                timings["preprocess"] = _elapsed_ms(started)
+
+            reused = None
+            if cached is not None:
+                boxes, classes, confidences = cached
+                plot = None
+            else:
+                # Decode the image, reusing the Frame's buffer if already decoded.
+                # The model only sees imgsz pixels, so a reduced-scale decode is
+                # enough; full resolution is decoded later only for evidence.
+                started = time.perf_counter()
+                if self.reduced_decode:
+                    img, scale = frame.reduced(self.imgsz)
+                else:
+                    img, scale = frame.image, 1.0
+                timings["decode"] = _elapsed_ms(started)
+
+                if img is None or img.size == 0:
+                    return None, "Invalid image data", False, {}
+
+                # Reuse this camera's last result if the scene hasn't changed
+                started = time.perf_counter()
+                if self.frame_gate is not None:
+                    thumb = self.frame_gate.thumbnail(img)
+                    reused = self.frame_gate.lookup(camera_id, thumb, img.shape)
+                _add_timing(timings, "preprocess", _elapsed_ms(started))
+
+                if reused is not None:
+                    boxes, classes, confidences = reused
+                    plot = None
+                else:
+                    try:
+                        if self.tiles is not None:
+                            boxes, classes, confidences = self._infer_tiled(
+                                frame, img, scale, timings
+                            )
+                            plot = None
+                        else:
+                            boxes, classes, confidences, plot = self._infer(
+                                img, scale, timings
+                            )
+                    except FutureTimeoutError:
+                        print_error(
+                            f"Detection timed out after {AI_DETECT_TIMEOUT} seconds, skipping"
+                        )
+                        return None, "Detection timed out", False, {}
+                    except Exception as e:
+                        print_error(f"Error during detection: {e}")
+                        return None, f"Detection error: {str(e)}", False, {}
+
+                    # Drop detections in excluded regions such as the sky
+                    started = time.perf_counter()
+                    if self.roi_mask.exclude:
+                        width, height = frame.dimensions or (
+                            img.shape[1] * scale,
+                            img.shape[0] * scale,
+                        )
+                        keep = self.roi_mask.keep(boxes, width, height)
+                        if not keep.all():
+                            boxes = np.asarray(boxes, dtype=np.float32)
+                            boxes = boxes.reshape(-1, 4)[keep]
+                            classes = np.asarray(classes)[keep]
+                            confidences = np.asarray(confidences)[keep]
+                            plot = None
+                    _add_timing(timings, "nms", _elapsed_ms(started))
+
+                    if self.frame_gate is not None:
+                        self.frame_gate.store(
+                            camera_id, thumb, img.shape, (boxes, classes, confidences)
+                        )
+
+                if frame_hash is not None:
+                    self.result_cache.put(frame_hash, (boxes, classes, confidences))
+
+            class_names = self.class_names
 
             # Check if fire or smoke is detected
             fire_detected = False
+            fire_confidence = 0.0
             class_counts = {}
 
-            if hasattr(result, "boxes") and hasattr(result.boxes, "cls"):
-                classes = result.boxes.cls
-
-                # Count the number of occurrences for each class
-                for c in classes:
-                    c = int(c)
-                    class_name = class_names[c]
-                    class_counts[class_name] = class_counts.get(class_name, 0) + 1
+            # Count the number of occurrences for each class
+            for c, conf in zip(classes, confidences):
+                c = int(c)
+                class_name = class_names[c]
+                class_counts[class_name] = class_counts.get(class_name, 0) + 1
 
-                    # Check if fire or smoke is detected
-                    if class_name.lower() in ["fire", "smoke"]:
-                        fire_detected = True
+                # Check if fire or smoke is detected
+                if class_name.lower() in ["fire", "smoke"]:
+                    fire_detected = True
+                    fire_confidence = max(fire_confidence, float(conf))
 
             # Generate detection text
             detection_text = "Detected "
@@ -192,27 +474,65 @@ class FireDetector:
             latency = (end_time - start_time) * 1000  # in ms
             latency_sec = round(latency / 1000, 2)
             detection_text += f" in {latency_sec} seconds."
-
-            # Get the annotated image
-            result_img = result.plot()
+            if cached is not None:
+                detection_text += " (identical frame, cached result reused)"
+            elif reused is not None:
+                detection_text += " (scene unchanged, previous result reused)"
+
+            # Annotated image, drawn and encoded only if a sink needs it
+            result_img = DetectionImage(
+                frame,
+                boxes,
+                classes,
+                confidences,
+                class_names,
+                source_jpeg=frame.data,
+                plot=plot,
+            )
 
             # Detection info dictionary
             detection_info = {
                 "class_counts": class_counts,
                 "fire_detected": fire_detected,
+                "fire_confidence": fire_confidence,
                 "latency_ms": latency,
                 "latency_sec": latency_sec,
+                "reused": reused is not None,
+                "cached": cached is not None,
+                "content_hash": frame_hash,
+                "model": os.path.basename(self.runtime_path),
+                "timings": {stage: round(ms, 2) for stage, ms in timings.items()},
             }
 
-            # Clean up to free memory
-            gc.collect()
-
             return result_img, detection_text, fire_detected, detection_info
 
         except Exception as e:
             print_error(f"Error detecting fire/smoke: {e}")
             return None, f"Error: {str(e)}", False, {}
 
+    def get_gate_stats(self):
+        """Get frame gate counters, or None if the gate is disabled"""
+        if self.frame_gate is None:
+            return None
+        return self.frame_gate.get_stats()
+
+    def get_cache_stats(self):
+        """Get result cache counters, or None if the cache is disabled"""
+        if self.result_cache is None:
+            return None
+        return self.result_cache.get_stats()
+
+    def get_saved_paths(self, frame_hash):
+        """Get the stored (original_path, detection_path) of a frame, or None"""
+        if self.result_cache is None or frame_hash is None:
+            return None
+        return self.result_cache.get_paths(frame_hash)
+
+    def set_saved_paths(self, frame_hash, original_path, detection_path):
+        """Record where a frame's images were stored, for identical repeats"""
+        if self.result_cache is not None and frame_hash is not None:
+            self.result_cache.set_paths(frame_hash, original_path, detection_path)
+
     def save_detection_image(self, detection_img, output_path):
         """Save the detection image to the specified path"""
         try:
@@ -225,12 +545,16 @@ class FireDetector:
                 print_error("Cannot save detection image: Image data is empty or None")
                 return None
 
-            # Save the image
-            result = cv2.imwrite(output_path, detection_img)
+            # Save the image, reusing the JPEG bytes shared with other sinks
+            if isinstance(detection_img, DetectionImage):
+                with open(output_path, "wb") as f:
+                    f.write(detection_img.encode())
+            else:
+                result = cv2.imwrite(output_path, detection_img)
 
-            if not result:
-                print_error(f"cv2.imwrite failed to save image to {output_path}")
-                return None
+                if not result:
+                    print_error(f"cv2.imwrite failed to save image to {output_path}")
+                    return None
 
             # Verify the file was created and has content
             if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
@@ -250,11 +574,19 @@ class FireDetector:
             traceback.print_exc()
             return None
 
+    def close(self):
+        """Stop the inference workers and free the model"""
+        self.inference.stop(timeout=1)
+        if self.process_pool is not None:
+            self.process_pool.stop()
+            self.process_pool = None
+        self.model = None
+        gc.collect()
+
     def __del__(self):
         """Cleanup when detector is destroyed"""
         try:
             # Free up resources
-            self.model = None
-            gc.collect()
+            self.close()
         except:
             pass
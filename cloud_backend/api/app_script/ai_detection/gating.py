@@ -0,0 +1,94 @@
+import threading
+import numpy as np
+import cv2
+from config import (
+    AI_FRAME_GATE_THRESHOLD,
+    AI_FRAME_GATE_SIZE,
+    AI_FRAME_GATE_MAX_REUSE,
+)
+
+
+class FrameGate:
+    """
+    Pre-inference gate that skips frames of an unchanged scene
+
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the thumbnail of the last frame that was actually inferred for the same
+    camera. If the mean absolute difference is below the threshold, the
+    previous detections are reused. Comparing against the last inferred
+    frame (not the last seen one) means slow drift still triggers
+    inference, and max_reuse bounds how long a result can be carried over.
+
+    Args:
+        threshold: Mean absolute grayscale difference (0-255) below which a
+            frame counts as unchanged
+        size: (width, height) of the compared thumbnails
+        max_reuse: Consecutive reused frames before inference is forced
+    """
+
+    def __init__(
+        self,
+        threshold=AI_FRAME_GATE_THRESHOLD,
+        size=AI_FRAME_GATE_SIZE,
+        max_reuse=AI_FRAME_GATE_MAX_REUSE,
+    ):
+        self.threshold = threshold
+        self.size = tuple(size)
+        self.max_reuse = max_reuse
+        self.cameras = {}  # camera -> {"thumb", "shape", "detections", "reused"}
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.inferred = 0
+        self.skipped = 0
+
+    def thumbnail(self, image):
+        """Downscaled grayscale version of a BGR image"""
+        small = cv2.resize(image, self.size, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2GRAY).astype(np.float32)
+
+    def lookup(self, camera, thumb, shape):
+        """
+        Get the reusable detections for a frame
+
+        Args:
+            camera: Camera the frame came from
+            thumb: thumbnail() of the frame
+            shape: Shape of the full frame (boxes only carry over at equal size)
+
+        Returns:
+            The detections stored for the camera, or None if it must be inferred
+        """
+        with self.lock:
+            state = self.cameras.get(camera)
+            if (
+                state is not None
+                and state["shape"] == shape
+                and state["reused"] < self.max_reuse
+                and float(np.mean(np.abs(thumb - state["thumb"]))) < self.threshold
+            ):
+                state["reused"] += 1
+                self.skipped += 1
+                return state["detections"]
+            self.inferred += 1
+            return None
+
+    def store(self, camera, thumb, shape, detections):
+        """Remember the detections of a freshly inferred frame"""
+        with self.lock:
+            self.cameras[camera] = {
+                "thumb": thumb,
+                "shape": shape,
+                "detections": detections,
+                "reused": 0,
+            }
+
+    def get_stats(self):
+        """Get inferred/skipped counters"""
+        with self.lock:
+            total = self.inferred + self.skipped
+            return {
+                "inferred": self.inferred,
+                "skipped": self.skipped,
+                "skip_ratio": self.skipped / total if total else 0.0,
+            }
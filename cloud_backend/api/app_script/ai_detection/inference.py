@@ -0,0 +1,266 @@
+import itertools
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from config import AI_BATCH_MAX_SIZE, AI_BATCH_MAX_WAIT_MS
+from utils.terminal import print_error, print_warning
+
+_STOP = object()
+
+
+class InferenceService:
+    """
+    Long-lived inference worker with micro-batching
+
+    Callers submit one image at a time and get a Future back. The worker
+    takes the first waiting image, gathers more for up to max_wait_ms or
+    until max_batch_size is reached, and runs them through the model in one
+    call, so concurrent sessions and cameras share forward passes instead of
+    queueing single-image predicts. A group of images submitted together
+    (e.g. the tiles of one frame) always runs in the same batch.
+
+    Before a result is set, each Future gets queue_ms (submit to batch
+    start), batch_ms (wall time of the whole forward pass) and batch_size,
+    so callers can tell waiting apart from the model time they shared.
+
+    With a batch_timeout, a watchdog fails the futures of a batch that runs
+    too long and starts a replacement worker, so one hung predict does not
+    stall every camera. The hung thread cannot be killed and is abandoned;
+    use the process backend when the model itself must be killed.
+
+    Args:
+        predict_batch: Callable taking a list of images and returning one
+            result per image, in order
+        max_batch_size: Max images per batch
+        max_wait_ms: Max milliseconds to wait for a batch to fill
+        name: Worker thread name
+        workers: Batches run concurrently; only useful when predict_batch
+            can run in parallel (e.g. one model process per worker)
+        batch_timeout: Seconds a batch may run before its worker is
+            replaced (None to wait forever)
+    """
+
+    def __init__(
+        self,
+        predict_batch,
+        max_batch_size=AI_BATCH_MAX_SIZE,
+        max_wait_ms=AI_BATCH_MAX_WAIT_MS,
+        name="InferenceService",
+        workers=1,
+        batch_timeout=None,
+    ):
+        self.predict_batch = predict_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait_ms / 1000.0
+        self.name = name
+        self.workers = max(1, workers)
+        self.batch_timeout = batch_timeout
+        self.requests = queue.Queue()
+        self.threads = []
+        self.in_flight = {}  # worker thread -> (started, batch)
+        self.abandoned = set()  # Hung workers that must exit if they return
+        self.thread_ids = itertools.count()
+        self.watchdog = None
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.stats_lock = threading.Lock()
+        self.batches = 0
+        self.frames = 0
+        self.failed_batches = 0
+        self.largest_batch = 0
+        self.hung_batches = 0
+
+    def start(self):
+        """Start the worker threads (no-op if already running)"""
+        with self.lock:
+            if self.threads:
+                return self
+            self.stop_event.clear()
+            for _ in range(self.workers):
+                self._spawn_worker()
+            if self.batch_timeout:
+                self.watchdog = threading.Thread(
+                    target=self._watch, name=f"{self.name}-watchdog", daemon=True
+                )
+                self.watchdog.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the workers after the queued images are processed"""
+        with self.lock:
+            threads = self.threads
+            self.threads = []
+            self.stop_event.set()
+        for _ in threads:
+            self.requests.put(_STOP)
+        for thread in threads:
+            thread.join(timeout)
+
+    def submit(self, image):
+        """
+        Queue an image for inference
+
+        Args:
+            image: Decoded image accepted by predict_batch
+
+        Returns:
+            Future resolving to the image's result
+        """
+        future = Future()
+        self.start()
+        self.requests.put(([image], future, True, time.perf_counter()))
+        return future
+
+    def submit_batch(self, images):
+        """
+        Queue a group of images to run in the same forward pass
+
+        Args:
+            images: List of decoded images accepted by predict_batch
+
+        Returns:
+            Future resolving to the list of results, in order
+        """
+        future = Future()
+        self.start()
+        self.requests.put((list(images), future, False, time.perf_counter()))
+        return future
+
+    def get_stats(self):
+        """Get batching statistics"""
+        with self.stats_lock:
+            return {
+                "batches": self.batches,
+                "frames": self.frames,
+                "avg_batch_size": self.frames / self.batches if self.batches else 0.0,
+                "largest_batch": self.largest_batch,
+                "failed_batches": self.failed_batches,
+                "hung_batches": self.hung_batches,
+                "pending": self.requests.qsize(),
+            }
+
+    def _collect_batch(self, first):
+        batch = [first]
+        size = len(first[0])
+        stop = False
+        deadline = time.time() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.time()
+            try:
+                item = (
+                    self.requests.get(timeout=remaining)
+                    if remaining > 0
+                    else self.requests.get_nowait()
+                )
+            except queue.Empty:
+                break
+            if item is _STOP:
+                stop = True
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch, stop
+
+    def _spawn_worker(self):
+        """Start one worker thread (caller holds self.lock)"""
+        thread = threading.Thread(
+            target=self._worker,
+            name=f"{self.name}-{next(self.thread_ids)}",
+            daemon=True,
+        )
+        thread.start()
+        self.threads.append(thread)
+
+    def _watch(self):
+        """Fail batches running past batch_timeout and replace their workers"""
+        while not self.stop_event.wait(max(0.1, self.batch_timeout / 4)):
+            now = time.perf_counter()
+            hung = []
+            with self.lock:
+                for thread, (started, batch) in list(self.in_flight.items()):
+                    if now - started < self.batch_timeout:
+                        continue
+                    del self.in_flight[thread]
+                    self.abandoned.add(thread)
+                    if thread in self.threads:
+                        self.threads.remove(thread)
+                        self._spawn_worker()
+                    hung.append((thread, batch))
+
+            for thread, batch in hung:
+                with self.stats_lock:
+                    self.hung_batches += 1
+                print_warning(
+                    f"Inference batch on {thread.name} exceeded "
+                    f"{self.batch_timeout}s, replacing the worker"
+                )
+                error = TimeoutError(
+                    f"Inference timed out after {self.batch_timeout} seconds"
+                )
+                for _, future, _, _ in batch:
+                    future.set_exception(error)
+
+    def _worker(self):
+        current = threading.current_thread()
+        while True:
+            first = self.requests.get()
+            if first is _STOP:
+                return
+            batch, stop = self._collect_batch(first)
+
+            # Callers that already gave up don't need a forward pass
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if batch:
+                self._run_batch(batch)
+            with self.lock:
+                # A replacement took over while this worker was hung
+                if current in self.abandoned:
+                    self.abandoned.discard(current)
+                    return
+            if stop:
+                return
+
+    def _run_batch(self, batch):
+        images = [image for group, _, _, _ in batch for image in group]
+        current = threading.current_thread()
+        started = time.perf_counter()
+        with self.lock:
+            self.in_flight[current] = (started, batch)
+        try:
+            results = self.predict_batch(images)
+            if len(results) != len(images):
+                raise RuntimeError(
+                    f"Model returned {len(results)} results for {len(images)} images"
+                )
+        except Exception as e:
+            with self.lock:
+                # The watchdog already failed this batch
+                if self.in_flight.pop(current, None) is None:
+                    return
+            with self.stats_lock:
+                self.failed_batches += 1
+            print_error(f"Error during batched inference: {e}")
+            for _, future, _, _ in batch:
+                future.set_exception(e)
+            return
+
+        batch_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            # Too late: the watchdog already failed this batch
+            if self.in_flight.pop(current, None) is None:
+                return
+        with self.stats_lock:
+            self.batches += 1
+            self.frames += len(images)
+            self.largest_batch = max(self.largest_batch, len(images))
+        offset = 0
+        for group, future, single, submitted_at in batch:
+            group_results = list(results[offset : offset + len(group)])
+            offset += len(group)
+            future.queue_ms = max(0.0, (started - submitted_at) * 1000)
+            future.batch_ms = batch_ms
+            future.batch_size = len(images)
+            future.set_result(group_results[0] if single else group_results)
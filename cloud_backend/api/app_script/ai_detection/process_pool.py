@@ -0,0 +1,268 @@
+import multiprocessing
+import os
+import queue
+import threading
+import numpy as np
+from config import (
+    AI_PROCESS_WORKERS,
+    AI_PROCESS_THREADS_PER_WORKER,
+    AI_PROCESS_LOAD_TIMEOUT,
+    AI_DETECT_TIMEOUT,
+    AI_INFERENCE_IMGSZ,
+)
+from utils.terminal import print_info, print_error, print_warning, print_success
+
+
+def _plain_result(result):
+    """Reduce an ultralytics Results object to picklable arrays"""
+    boxes = result.boxes
+    return {
+        "boxes": boxes.xyxy.cpu().numpy().astype(np.float32),
+        "cls": boxes.cls.cpu().numpy().astype(np.int32),
+        "conf": boxes.conf.cpu().numpy().astype(np.float32),
+        "speed": dict(result.speed),
+    }
+
+
+def _worker_main(conn, model_path, conf, iou, imgsz, threads, cpus):
+    """Entry point of an inference process: load once, then serve batches"""
+    try:
+        # Must be set before torch is imported
+        os.environ["OMP_NUM_THREADS"] = str(threads)
+        if cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, cpus)
+
+        import torch
+        from ultralytics import YOLO
+
+        torch.set_num_threads(threads)
+        model = YOLO(model_path, task="detect")
+        model.predict(np.zeros((100, 100, 3), dtype=np.uint8), verbose=False)
+        conn.send(("ready", dict(model.names)))
+    except Exception as e:
+        conn.send(("error", f"Model load failed: {e}"))
+        return
+
+    while True:
+        try:
+            images = conn.recv()
+        except (EOFError, OSError):
+            return
+        if images is None:
+            return
+        try:
+            results = model.predict(
+                images,
+                conf=conf,
+                iou=iou,
+                imgsz=imgsz,
+                device="cpu",
+                verbose=False,
+                max_det=50,
+            )
+            conn.send(("ok", [_plain_result(r) for r in results]))
+        except Exception as e:
+            conn.send(("error", str(e)))
+
+
+class _Worker:
+    def __init__(self, index, process, conn):
+        self.index = index
+        self.process = process
+        self.conn = conn
+
+
+class ProcessInferencePool:
+    """
+    YOLO inference in worker processes with hard-kill timeouts
+
+    Each process loads the model once, runs with its own torch thread count
+    (pinned to its own cores where the OS allows) and returns boxes, classes
+    and scores as plain arrays. A worker that exceeds the timeout or dies is
+    killed and replaced, so a hung predict cannot leak CPU or memory.
+
+    Args:
+        model_path: YOLO weights path
+        conf_threshold: Confidence threshold
+        iou_threshold: NMS IoU threshold
+        imgsz: Model input size
+        size: Number of worker processes
+        threads_per_worker: Torch threads per process
+        timeout: Seconds a batch may take before its worker is killed
+        load_timeout: Seconds a worker may take to load the model
+    """
+
+    def __init__(
+        self,
+        model_path,
+        conf_threshold,
+        iou_threshold,
+        imgsz=AI_INFERENCE_IMGSZ,
+        size=AI_PROCESS_WORKERS,
+        threads_per_worker=AI_PROCESS_THREADS_PER_WORKER,
+        timeout=AI_DETECT_TIMEOUT,
+        load_timeout=AI_PROCESS_LOAD_TIMEOUT,
+    ):
+        self.model_path = model_path
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.imgsz = imgsz
+        self.size = max(1, size)
+        self.threads_per_worker = max(1, threads_per_worker)
+        self.timeout = timeout
+        self.load_timeout = load_timeout
+        # spawn: never fork a process that already holds threads and torch state
+        self.context = multiprocessing.get_context("spawn")
+        self.workers = []
+        self.idle = queue.Queue()
+        self.names = None
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.killed = 0
+        self.respawned = 0
+
+    def _cpus_for(self, index):
+        if not hasattr(os, "sched_getaffinity"):
+            return None
+        available = sorted(os.sched_getaffinity(0))
+        if len(available) < self.size * self.threads_per_worker:
+            return None
+        start = index * self.threads_per_worker
+        return set(available[start : start + self.threads_per_worker])
+
+    def _spawn(self, index):
+        parent_conn, child_conn = self.context.Pipe()
+        process = self.context.Process(
+            target=_worker_main,
+            args=(
+                child_conn,
+                self.model_path,
+                self.conf_threshold,
+                self.iou_threshold,
+                self.imgsz,
+                self.threads_per_worker,
+                self._cpus_for(index),
+            ),
+            name=f"InferenceWorker-{index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        worker = _Worker(index, process, parent_conn)
+
+        if not parent_conn.poll(self.load_timeout):
+            self._kill(worker)
+            raise TimeoutError(
+                f"Inference worker {index} did not load within {self.load_timeout}s"
+            )
+        try:
+            status, payload = parent_conn.recv()
+        except (EOFError, OSError):
+            self._kill(worker)
+            raise RuntimeError(f"Inference worker {index} exited while loading")
+        if status != "ready":
+            self._kill(worker)
+            raise RuntimeError(payload)
+        self.names = payload
+        return worker
+
+    def _kill(self, worker):
+        try:
+            worker.process.kill()
+            worker.process.join(5)
+            worker.conn.close()
+        except Exception:
+            pass
+
+    def start(self):
+        """
+        Start every worker and wait for its model to load
+
+        Returns:
+            bool: True if all workers are ready
+        """
+        try:
+            for index in range(self.size):
+                worker = self._spawn(index)
+                self.workers.append(worker)
+                self.idle.put(worker)
+            print_success(f"Started {self.size} inference worker process(es)")
+            return True
+        except Exception as e:
+            print_error(f"Error starting inference workers: {e}")
+            self.stop()
+            return False
+
+    def stop(self):
+        """Stop all workers"""
+        workers, self.workers = self.workers, []
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except Exception:
+                pass
+        for worker in workers:
+            worker.process.join(2)
+            if worker.process.is_alive():
+                self._kill(worker)
+
+    def _replace(self, worker):
+        """Kill a worker and start a new one in its slot"""
+        self._kill(worker)
+        print_info(f"Respawning inference worker {worker.index}...")
+        try:
+            replacement = self._spawn(worker.index)
+            self.respawned += 1
+        except Exception as e:
+            print_error(f"Error respawning inference worker {worker.index}: {e}")
+            # Keep the dead slot; the next batch on it retries the respawn
+            replacement = worker
+        with self.lock:
+            if worker in self.workers:
+                self.workers[self.workers.index(worker)] = replacement
+        return replacement
+
+    def predict_batch(self, images):
+        """
+        Run a batch on the next idle worker
+
+        Returns:
+            list: One dict of boxes/cls/conf arrays per image
+
+        Raises:
+            TimeoutError: If the worker exceeded the timeout (it is killed)
+            RuntimeError: If the worker failed or died
+        """
+        worker = self.idle.get()
+        try:
+            if not worker.process.is_alive():
+                worker = self._replace(worker)
+            worker.conn.send(images)
+            if not worker.conn.poll(self.timeout):
+                print_warning(
+                    f"Inference worker {worker.index} exceeded {self.timeout}s, killing it"
+                )
+                self.killed += 1
+                worker = self._replace(worker)
+                raise TimeoutError(f"Inference timed out after {self.timeout} seconds")
+            status, payload = worker.conn.recv()
+            if status != "ok":
+                raise RuntimeError(payload)
+            return payload
+        except (EOFError, BrokenPipeError, ConnectionResetError) as e:
+            worker = self._replace(worker)
+            raise RuntimeError(f"Inference worker died: {e}")
+        finally:
+            self.idle.put(worker)
+
+    def get_stats(self):
+        """Get pool statistics"""
+        with self.lock:
+            alive = sum(1 for worker in self.workers if worker.process.is_alive())
+        return {
+            "workers": self.size,
+            "alive": alive,
+            "killed": self.killed,
+            "respawned": self.respawned,
+        }
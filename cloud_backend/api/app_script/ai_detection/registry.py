@@ -0,0 +1,273 @@
+import glob
+import os
+import threading
+import time
+from config import (
+    AI_MODELS_DIR,
+    AI_MODEL_PATH,
+    AI_CONF_THRESHOLD,
+    AI_IOU_THRESHOLD,
+    AI_DETECT_TIMEOUT,
+    AI_MODEL_WATCH_ENABLED,
+    AI_MODEL_WATCH_PATTERN,
+    AI_MODEL_WATCH_INTERVAL,
+    AI_MODEL_SETTLE_SECONDS,
+)
+from utils.terminal import print_info, print_error, print_warning, print_success
+
+
+def _version_of(path):
+    """(path, mtime, size) identifying one version of a model file"""
+    stat = os.stat(path)
+    return (path, stat.st_mtime, stat.st_size)
+
+
+class ModelRegistry:
+    """
+    Keeps the current fire model loaded and swaps in new versions live
+
+    The registry stands in for a FireDetector: sessions call detect() on it
+    and each call runs on whichever model is current at that moment, so a
+    new version takes effect between frames. New versions dropped into the
+    models directory are loaded and warmed next to the current model in the
+    background; the old model keeps serving until the swap and is closed
+    once its in-flight detections have finished.
+
+    Args:
+        models_dir: Directory watched for model versions
+        model_path: Model used when no file matches the pattern
+        conf_threshold: Detection confidence threshold
+        iou_threshold: NMS IoU threshold
+        pattern: Glob of model versions inside models_dir; the most recently
+            modified file is the current version
+        interval: Seconds between directory scans
+        settle_seconds: Files modified more recently than this are skipped
+    """
+
+    def __init__(
+        self,
+        models_dir=AI_MODELS_DIR,
+        model_path=AI_MODEL_PATH,
+        conf_threshold=AI_CONF_THRESHOLD,
+        iou_threshold=AI_IOU_THRESHOLD,
+        pattern=AI_MODEL_WATCH_PATTERN,
+        interval=AI_MODEL_WATCH_INTERVAL,
+        settle_seconds=AI_MODEL_SETTLE_SECONDS,
+        watch=AI_MODEL_WATCH_ENABLED,
+    ):
+        self.models_dir = models_dir
+        self.model_path = model_path
+        self.conf_threshold = conf_threshold
+        self.iou_threshold = iou_threshold
+        self.pattern = pattern
+        self.interval = interval
+        self.settle_seconds = settle_seconds
+        self.watch = watch
+
+        self.lock = threading.Lock()
+        # Held while a model loads, so callers can wait for the startup load
+        self.load_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+        self.detector = None
+        self.version = None
+        self.failed_versions = set()
+        self.in_flight = {}
+        self.swaps = 0
+
+    @property
+    def model_name(self):
+        """File name of the current model, or None before the first load"""
+        with self.lock:
+            return os.path.basename(self.version[0]) if self.version else None
+
+    def start(self):
+        """Load and warm the model in the background, then watch for new versions"""
+        if self.thread is not None and self.thread.is_alive():
+            return self
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._run, name="ModelRegistry", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop watching and close the current model"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            self.thread = None
+        with self.lock:
+            detector, self.detector, self.version = self.detector, None, None
+        if detector is not None:
+            detector.close()
+
+    def latest_version(self):
+        """Find the newest settled model version, or None if there is none"""
+        paths = glob.glob(os.path.join(self.models_dir, self.pattern))
+        if not paths and os.path.exists(self.model_path):
+            paths = [self.model_path]
+
+        latest = None
+        now = time.time()
+        for path in paths:
+            try:
+                version = _version_of(path)
+            except OSError:
+                continue  # Removed while scanning
+            if now - version[1] < self.settle_seconds:
+                continue
+            if latest is None or version[1] > latest[1]:
+                latest = version
+        return latest
+
+    def has_model(self):
+        """Check whether a model is loaded or available to load"""
+        return self.detector is not None or self.latest_version() is not None
+
+    def load_model(self):
+        """
+        Make sure a model is loaded, waiting for a background load in progress
+
+        Returns:
+            bool: True if a model is ready to use
+        """
+        # Hot path: once loaded, a hot swap only replaces the detector, so
+        # callers never need to queue behind a background load
+        if self.detector is not None:
+            return True
+        with self.load_lock:
+            if self.detector is not None:
+                return True
+            return self._load_latest()
+
+    def _load_latest(self):
+        """Load the newest version if it differs from the current one (load_lock held)"""
+        version = self.latest_version()
+        if version is None:
+            if self.detector is None:
+                print_warning(f"No model found in {self.models_dir}")
+            return self.detector is not None
+        if version == self.version or version in self.failed_versions:
+            return self.detector is not None
+
+        from ai_detection.fire_detector import FireDetector
+
+        path = version[0]
+        detector = FireDetector(
+            model_path=path,
+            conf_threshold=self.conf_threshold,
+            iou_threshold=self.iou_threshold,
+        )
+        if self.detector is not None:
+            print_info(f"New model version found: {os.path.basename(path)}")
+        # Loading also warms the model with a dummy inference
+        if not detector.load_model():
+            print_error(f"Failed to load model {path}, keeping the current model")
+            self.failed_versions.add(version)
+            detector.close()
+            return self.detector is not None
+
+        with self.lock:
+            old, self.detector, self.version = self.detector, detector, version
+            if old is not None:
+                self.swaps += 1
+        if old is not None:
+            print_success(f"Switched to model {os.path.basename(path)}")
+            threading.Thread(
+                target=self._retire, args=(old,), name="ModelRetire", daemon=True
+            ).start()
+        return True
+
+    def _retire(self, detector):
+        """Close a replaced model once its in-flight detections are done"""
+        deadline = time.time() + AI_DETECT_TIMEOUT * 2
+        while time.time() < deadline:
+            with self.lock:
+                if not self.in_flight.get(id(detector)):
+                    break
+            time.sleep(0.1)
+        detector.close()
+
+    def _run(self):
+        try:
+            with self.load_lock:
+                self._load_latest()
+        except Exception as e:
+            print_error(f"Error loading model at startup: {e}")
+
+        while self.watch and not self.stop_event.wait(self.interval):
+            try:
+                with self.load_lock:
+                    self._load_latest()
+            except Exception as e:
+                print_error(f"Error checking for new model versions: {e}")
+
+    def _acquire(self):
+        with self.lock:
+            detector = self.detector
+            if detector is not None:
+                key = id(detector)
+                self.in_flight[key] = self.in_flight.get(key, 0) + 1
+            return detector
+
+    def _release(self, detector):
+        with self.lock:
+            key = id(detector)
+            self.in_flight[key] -= 1
+            if not self.in_flight[key]:
+                del self.in_flight[key]
+
+    def detect(self, image_data, camera_id=None):
+        """Run FireDetector.detect on the current model version"""
+        detector = self._acquire()
+        if detector is None and self.load_model():
+            detector = self._acquire()
+        if detector is None:
+            return None, "Failed to load model", False, {}
+        try:
+            return detector.detect(image_data, camera_id=camera_id)
+        finally:
+            self._release(detector)
+
+    def save_detection_image(self, detection_img, output_path):
+        """Save a detection image (independent of the model version)"""
+        detector = self.detector
+        if detector is None:
+            print_error("Cannot save detection image: no model loaded")
+            return None
+        return detector.save_detection_image(detection_img, output_path)
+
+    def get_gate_stats(self):
+        """Frame gate counters of the current model, or None"""
+        detector = self.detector
+        return detector.get_gate_stats() if detector is not None else None
+
+    def get_cache_stats(self):
+        """Result cache counters of the current model, or None"""
+        detector = self.detector
+        return detector.get_cache_stats() if detector is not None else None
+
+    def get_saved_paths(self, frame_hash):
+        """Stored files of an identical earlier frame (current model only)"""
+        detector = self.detector
+        return detector.get_saved_paths(frame_hash) if detector is not None else None
+
+    def set_saved_paths(self, frame_hash, original_path, detection_path):
+        """Record where a frame's images were stored"""
+        detector = self.detector
+        if detector is not None:
+            detector.set_saved_paths(frame_hash, original_path, detection_path)
+
+    def get_stats(self):
+        """Get the current version and swap count"""
+        with self.lock:
+            return {
+                "model": os.path.basename(self.version[0]) if self.version else None,
+                "loaded": self.detector is not None,
+                "swaps": self.swaps,
+                "failed_versions": len(self.failed_versions),
+                "in_flight": sum(self.in_flight.values()),
+            }
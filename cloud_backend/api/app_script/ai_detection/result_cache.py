@@ -0,0 +1,95 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from config import AI_RESULT_CACHE_SIZE
+
+
+def content_hash(data):
+    """Fast 128-bit hash of raw frame bytes, as hex"""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of detection results keyed by frame content
+
+    ESP32-CAMs can return the same buffered JPEG over and over after a
+    sensor glitch, and concurrent sessions may fetch the same frame. Keyed
+    by a hash of the raw JPEG bytes, such repeats get the earlier boxes
+    back without inference, and the files already written for them can be
+    referenced instead of saved again.
+
+    Args:
+        max_entries: Frames remembered before the least recently used is evicted
+    """
+
+    def __init__(self, max_entries=AI_RESULT_CACHE_SIZE):
+        self.max_entries = max(1, max_entries)
+        self.entries = OrderedDict()  # hash -> {"result": ..., "paths": ...}
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.file_reuses = 0
+
+    def get(self, key):
+        """Get the cached (boxes, classes, confidences) for a hash, or None"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry["result"]
+
+    def put(self, key, result):
+        """Remember the (boxes, classes, confidences) of a frame"""
+        with self.lock:
+            if key in self.entries:
+                self.entries[key]["result"] = result
+                self.entries.move_to_end(key)
+                return
+            self.entries[key] = {"result": result, "paths": None}
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def set_paths(self, key, original_path, detection_path):
+        """Record where a frame's original and detection images were stored"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                entry["paths"] = (original_path, detection_path)
+
+    def get_paths(self, key):
+        """
+        Get the stored (original_path, detection_path) of a frame
+
+        Returns:
+            tuple or None: None if not stored yet or the files are gone
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+            paths = entry["paths"] if entry is not None else None
+        if not paths or not all(path and os.path.exists(path) for path in paths):
+            return None
+        with self.lock:
+            self.file_reuses += 1
+        return paths
+
+    def get_stats(self):
+        """Get hit/miss counters"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "file_reuses": self.file_reuses,
+            }
@@ -0,0 +1,136 @@
+import math
+import numpy as np
+from config import (
+    AI_TILE_SIZE,
+    AI_TILE_OVERLAP,
+    AI_ROI_EXCLUDE,
+    AI_TILE_MIN_ROI_COVERAGE,
+)
+
+
+def _positions(length, tile, overlap):
+    """Evenly spaced tile offsets covering length with at least the given overlap"""
+    if length <= tile:
+        return [0]
+    stride = max(1, int(tile * (1 - overlap)))
+    count = math.ceil((length - tile) / stride) + 1
+    step = (length - tile) / (count - 1)
+    return [int(round(i * step)) for i in range(count)]
+
+
+class RegionMask:
+    """
+    Excluded regions of a camera view, in fractions of the frame
+
+    Args:
+        exclude: List of (x1, y1, x2, y2) fractions that are never analyzed
+    """
+
+    def __init__(self, exclude=AI_ROI_EXCLUDE):
+        self.exclude = [tuple(float(v) for v in rect) for rect in exclude]
+
+    def coverage(self, box, width, height):
+        """
+        Fraction of a pixel box outside every excluded region
+
+        Overlapping exclusions are handled approximately (their overlap is
+        subtracted twice), which only errs towards skipping.
+        """
+        x1, y1, x2, y2 = box
+        area = max(1.0, (x2 - x1) * (y2 - y1))
+        excluded = 0.0
+        for ex1, ey1, ex2, ey2 in self.exclude:
+            ix = min(x2, ex2 * width) - max(x1, ex1 * width)
+            iy = min(y2, ey2 * height) - max(y1, ey1 * height)
+            if ix > 0 and iy > 0:
+                excluded += ix * iy
+        return max(0.0, 1.0 - excluded / area)
+
+    def keep(self, boxes, width, height):
+        """Boolean mask of boxes whose centre is outside every excluded region"""
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        keep = np.ones(len(boxes), dtype=bool)
+        if not self.exclude or not len(boxes):
+            return keep
+        cx = (boxes[:, 0] + boxes[:, 2]) / 2 / width
+        cy = (boxes[:, 1] + boxes[:, 3]) / 2 / height
+        for ex1, ey1, ex2, ey2 in self.exclude:
+            keep &= ~((cx >= ex1) & (cx < ex2) & (cy >= ey1) & (cy < ey2))
+        return keep
+
+
+class TileGrid:
+    """
+    Overlapping tile layout for a frame size, filtered by a RegionMask
+
+    Args:
+        tile_size: Tile side in pixels
+        overlap: Fraction of a tile shared with its neighbour
+        mask: RegionMask used to drop tiles
+        min_coverage: Tiles with less of their area inside the ROI are dropped
+    """
+
+    def __init__(
+        self,
+        tile_size=AI_TILE_SIZE,
+        overlap=AI_TILE_OVERLAP,
+        mask=None,
+        min_coverage=AI_TILE_MIN_ROI_COVERAGE,
+    ):
+        self.tile_size = tile_size
+        self.overlap = overlap
+        self.mask = mask or RegionMask()
+        self.min_coverage = min_coverage
+        self._cache = {}
+
+    def tiles(self, width, height):
+        """Get the (x1, y1, x2, y2) tiles to analyze for a frame size"""
+        key = (width, height)
+        if key not in self._cache:
+            tile_w = min(self.tile_size, width)
+            tile_h = min(self.tile_size, height)
+            tiles = [
+                (x, y, x + tile_w, y + tile_h)
+                for y in _positions(height, tile_h, self.overlap)
+                for x in _positions(width, tile_w, self.overlap)
+            ]
+            self._cache[key] = [
+                tile
+                for tile in tiles
+                if self.mask.coverage(tile, width, height) >= self.min_coverage
+            ]
+        return self._cache[key]
+
+
+def nms(boxes, scores, classes, iou_threshold):
+    """
+    Class-aware greedy non-maximum suppression
+
+    Returns:
+        numpy.ndarray: Indices of the boxes to keep, highest score first
+    """
+    boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+    scores = np.asarray(scores, dtype=np.float32).reshape(-1)
+    classes = np.asarray(classes).reshape(-1)
+    if not len(boxes):
+        return np.zeros(0, dtype=np.int64)
+
+    # Offset boxes per class so different classes never overlap
+    offset = classes.astype(np.float32)[:, None] * (boxes.max() + 1)
+    shifted = boxes + offset
+    areas = (shifted[:, 2] - shifted[:, 0]) * (shifted[:, 3] - shifted[:, 1])
+    order = scores.argsort()[::-1]
+
+    keep = []
+    while len(order):
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        xx1 = np.maximum(shifted[i, 0], shifted[rest, 0])
+        yy1 = np.maximum(shifted[i, 1], shifted[rest, 1])
+        xx2 = np.minimum(shifted[i, 2], shifted[rest, 2])
+        yy2 = np.minimum(shifted[i, 3], shifted[rest, 3])
+        inter = np.clip(xx2 - xx1, 0, None) * np.clip(yy2 - yy1, 0, None)
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-9)
+        order = rest[iou <= iou_threshold]
+    return np.array(keep, dtype=np.int64)
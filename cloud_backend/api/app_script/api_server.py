@@ -12,6 +12,7 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 # Import the prediction function
 from prediction_service import make_future_predictions
 from utils.terminal import print_info, print_warning, print_error, print_success
+from utils.latency import get_latency_stats
 
 # Import MongoDB utilities
 from db_utils import (
@@ -31,6 +32,21 @@ def health_check():
     return jsonify({"status": "ok", "message": "API server is running"})
 
 
+@app.route("/latency", methods=["GET"])
+def latency():
+    """
+    Per-stage detection latency percentiles
+
+    Optional query parameters camera and model filter the result. Only
+    frames processed by this process are included, so the server has to
+    run inside the detection pipeline (LATENCY_API_ENABLED).
+    """
+    summary = get_latency_stats().get_summary(
+        camera=request.args.get("camera"), model=request.args.get("model")
+    )
+    return jsonify(summary)
+
+
 @app.route("/predict", methods=["POST"])
 def predict():
     """
@@ -214,6 +230,7 @@ def start_api_server(host="0.0.0.0", port=5000, debug=False):
         print_info(
             f"MongoDB-based prediction endpoint available at http://{host}:{port}/predict-from-db"
         )
+        print_info(f"Latency metrics available at http://{host}:{port}/latency")
         return api_thread
     except Exception as e:
         print_error(f"Failed to start API server: {e}")
@@ -0,0 +1,74 @@
+import argparse
+import statistics
+import time
+import requests
+from camera.client import CameraClient
+from camera.fake_camera import FakeCamera
+from utils.terminal import print_header, print_info, print_separator
+
+
+def _summarize(label, latencies, connections):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print_info(
+        f"{label}: mean {statistics.mean(latencies):.1f} ms, "
+        f"p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms, "
+        f"{connections} connection(s) for {len(latencies)} frames"
+    )
+
+
+def benchmark_camera(frames=50, connection_delay=0.02):
+    """Compare per-frame fetch latency with and without connection reuse"""
+    camera = FakeCamera(connection_delay=connection_delay).start()
+    capture_url = f"http://{camera.address}/capture"
+
+    try:
+        print_header("CAMERA FETCH BENCHMARK")
+        print_info(
+            f"Fake camera at {camera.address}, {connection_delay*1000:.0f} ms connection cost"
+        )
+        print_separator()
+
+        # Warm the fake camera's JPEG cache so both runs serve identical bytes
+        requests.get(capture_url, timeout=10)
+
+        start_connections = camera.connections
+        latencies = []
+        for _ in range(frames):
+            started = time.perf_counter()
+            requests.get(capture_url, timeout=10).content
+            latencies.append((time.perf_counter() - started) * 1000)
+        _summarize(
+            "New connection per frame",
+            latencies,
+            camera.connections - start_connections,
+        )
+
+        client = CameraClient(camera.address)
+        start_connections = camera.connections
+        latencies = []
+        for _ in range(frames):
+            started = time.perf_counter()
+            client.get("/capture").content
+            latencies.append((time.perf_counter() - started) * 1000)
+        _summarize(
+            "Keep-alive CameraClient",
+            latencies,
+            camera.connections - start_connections,
+        )
+        client.close()
+    finally:
+        camera.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark camera frame fetches")
+    parser.add_argument("--frames", type=int, default=50)
+    parser.add_argument(
+        "--connection-delay",
+        type=float,
+        default=0.02,
+        help="Seconds the fake camera spends accepting each new connection",
+    )
+    args = parser.parse_args()
+    benchmark_camera(args.frames, args.connection_delay)
@@ -0,0 +1,173 @@
+import argparse
+import glob
+import os
+import statistics
+import time
+import numpy as np
+import cv2
+from ultralytics import YOLO
+from ai_detection.export import resolve_model_path, is_format_available
+from config import (
+    AI_MODEL_PATH,
+    AI_CONF_THRESHOLD,
+    AI_IOU_THRESHOLD,
+    AI_BATCH_MAX_SIZE,
+    IMAGE_FOLDER,
+)
+from utils.terminal import (
+    print_header,
+    print_info,
+    print_warning,
+    print_separator,
+)
+
+
+def _load_images(image_dir, limit):
+    paths = sorted(
+        glob.glob(os.path.join(image_dir, "**", "*_original.jpg"), recursive=True)
+    ) or sorted(glob.glob(os.path.join(image_dir, "**", "*.jpg"), recursive=True))
+    images = []
+    for path in paths[:limit]:
+        img = cv2.imread(path)
+        if img is not None:
+            images.append(img)
+    return images
+
+
+def _box_iou(a, b):
+    x1, y1 = np.maximum(a[:2], b[:2])
+    x2, y2 = np.minimum(a[2:], b[2:])
+    inter = max(0.0, x2 - x1) * max(0.0, y2 - y1)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+def _run(model, images, runs):
+    latencies = []
+    detections = []
+    for i in range(runs):
+        for img in images:
+            started = time.perf_counter()
+            result = model.predict(
+                img,
+                conf=AI_CONF_THRESHOLD,
+                iou=AI_IOU_THRESHOLD,
+                device="cpu",
+                verbose=False,
+                max_det=50,
+            )[0]
+            latencies.append((time.perf_counter() - started) * 1000)
+            if i == 0:
+                boxes = result.boxes
+                detections.append(
+                    (
+                        boxes.xyxy.cpu().numpy(),
+                        boxes.cls.cpu().numpy().astype(int),
+                    )
+                )
+    return latencies, detections
+
+
+def _check_batch(model, images, batch_size):
+    """Run one batched predict, as the inference service does; None if it works"""
+    try:
+        results = model.predict(
+            images[:batch_size],
+            conf=AI_CONF_THRESHOLD,
+            iou=AI_IOU_THRESHOLD,
+            device="cpu",
+            verbose=False,
+            max_det=50,
+        )
+        if len(results) != min(batch_size, len(images)):
+            return f"{len(results)} results for {batch_size} images"
+        return None
+    except Exception as e:
+        return str(e)
+
+
+def _agreement(reference, candidate):
+    """Share of images with the same classes, and mean IoU of matched boxes"""
+    same_classes = 0
+    ious = []
+    for (ref_boxes, ref_cls), (boxes, cls) in zip(reference, candidate):
+        if sorted(ref_cls.tolist()) == sorted(cls.tolist()):
+            same_classes += 1
+        for ref_box, c in zip(ref_boxes, ref_cls):
+            matches = [_box_iou(ref_box, box) for box, k in zip(boxes, cls) if k == c]
+            ious.append(max(matches) if matches else 0.0)
+    return (
+        same_classes / len(reference) if reference else 0.0,
+        statistics.mean(ious) if ious else None,
+    )
+
+
+def benchmark_models(formats, image_dir, limit=20, runs=3):
+    """Compare latency and detections of the fire model across CPU runtimes"""
+    images = _load_images(image_dir, limit)
+    if not images:
+        print_warning(f"No images found in {image_dir}, using random frames")
+        rng = np.random.default_rng(0)
+        images = [
+            rng.integers(0, 255, (1200, 1600, 3), dtype=np.uint8) for _ in range(limit)
+        ]
+
+    print_header("FIRE MODEL RUNTIME BENCHMARK")
+    print_info(f"{len(images)} image(s) x {runs} run(s), model {AI_MODEL_PATH}")
+    print_separator()
+
+    reference = None
+    for model_format in formats:
+        if not is_format_available(model_format):
+            print_warning(f"{model_format}: runtime not installed, skipped")
+            continue
+        path, used_format = resolve_model_path(AI_MODEL_PATH, model_format)
+        if used_format != model_format:
+            print_warning(f"{model_format}: export unavailable, skipped")
+            continue
+
+        model = YOLO(path, task="detect")
+        model.predict(images[0], device="cpu", verbose=False)  # warm up
+        latencies, detections = _run(model, images, runs)
+        batch_error = _check_batch(model, images, AI_BATCH_MAX_SIZE)
+
+        latencies.sort()
+        p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+        line = (
+            f"{model_format}: mean {statistics.mean(latencies):.1f} ms, "
+            f"p50 {statistics.median(latencies):.1f} ms, p95 {p95:.1f} ms"
+        )
+        if reference is None:
+            reference = detections
+            line += " (reference)"
+        else:
+            same_classes, mean_iou = _agreement(reference, detections)
+            line += f", same classes on {same_classes*100:.0f}% of images"
+            if mean_iou is not None:
+                line += f", box IoU vs reference {mean_iou:.2f}"
+        print_info(line)
+        if batch_error is not None:
+            print_warning(
+                f"{model_format}: batch of {AI_BATCH_MAX_SIZE} failed ({batch_error}), "
+                "the inference service would fail under concurrent sessions"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Compare fire model latency/accuracy across CPU runtimes"
+    )
+    parser.add_argument(
+        "--formats",
+        default="pytorch,onnx,openvino",
+        help="Comma-separated runtimes; the first one is the accuracy reference",
+    )
+    parser.add_argument(
+        "--images",
+        default=IMAGE_FOLDER,
+        help="Folder searched recursively for test images (default: saved alerts)",
+    )
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    benchmark_models(args.formats.split(","), args.images, args.limit, args.runs)
@@ -0,0 +1,114 @@
+import threading
+import time
+import requests
+from config import CAMERA_BREAKER_FAILURE_THRESHOLD, CAMERA_BREAKER_RESET_SECONDS
+from utils.terminal import print_info, print_warning, print_success
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half-open"
+
+
+class CameraUnavailableError(requests.exceptions.ConnectionError):
+    """Raised instead of contacting a camera whose circuit is open"""
+
+
+class CircuitBreaker:
+    """
+    Per-camera circuit breaker
+
+    Closed: requests go through and consecutive transport failures are
+    counted. Open: requests fail immediately for reset_timeout seconds.
+    Half-open: one health probe is let through; success closes the
+    circuit, failure opens it again.
+
+    Args:
+        name: Camera name used in log lines
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Seconds the circuit stays open before a probe
+    """
+
+    def __init__(
+        self,
+        name,
+        failure_threshold=CAMERA_BREAKER_FAILURE_THRESHOLD,
+        reset_timeout=CAMERA_BREAKER_RESET_SECONDS,
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.lock = threading.Lock()
+
+        # Metrics
+        self.times_opened = 0
+        self.rejected = 0
+
+    def allow_request(self):
+        """
+        Check whether a request may be sent now
+
+        Returns:
+            bool: True if closed, or if this caller gets the half-open probe
+        """
+        with self.lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if (
+                self.state == STATE_OPEN
+                and time.time() - self.opened_at >= self.reset_timeout
+            ):
+                self.state = STATE_HALF_OPEN
+                self.probe_in_flight = False
+                print_info(f"Camera {self.name} circuit half-open, probing health")
+            if self.state == STATE_HALF_OPEN and not self.probe_in_flight:
+                self.probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self):
+        with self.lock:
+            if self.state != STATE_CLOSED:
+                print_success(f"Camera {self.name} is reachable again, circuit closed")
+            self.state = STATE_CLOSED
+            self.failures = 0
+            self.probe_in_flight = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            self.probe_in_flight = False
+            if self.state == STATE_HALF_OPEN or (
+                self.state == STATE_CLOSED and self.failures >= self.failure_threshold
+            ):
+                self.state = STATE_OPEN
+                self.opened_at = time.time()
+                self.times_opened += 1
+                print_warning(
+                    f"Camera {self.name} unreachable after {self.failures} failure(s), "
+                    f"circuit open for {self.reset_timeout}s"
+                )
+
+    def get_state(self):
+        with self.lock:
+            return self.state
+
+    def is_open(self):
+        """True while requests are being refused without a probe slot"""
+        with self.lock:
+            if self.state == STATE_OPEN:
+                return time.time() - self.opened_at < self.reset_timeout
+            return self.state == STATE_HALF_OPEN and self.probe_in_flight
+
+    def get_stats(self):
+        with self.lock:
+            return {
+                "state": self.state,
+                "failures": self.failures,
+                "times_opened": self.times_opened,
+                "rejected": self.rejected,
+            }
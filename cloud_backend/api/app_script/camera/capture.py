@@ -1,15 +1,29 @@
 import requests
 import time
-import io
 from datetime import datetime
-import numpy as np
-import cv2
-from PIL import Image
-from config import CAPTURE_URL, CONTROL_URL, DEFAULT_FRAMESIZE, FRAMESIZE_UXGA
+from config import (
+    CAMERA_IP,
+    DEFAULT_FRAMESIZE,
+    FRAMESIZE_UXGA,
+    FRAMESIZE_DIMENSIONS,
+    CAPTURE_MODE,
+    CAMERA_STREAM_MAX_FRAME_AGE,
+)
+from camera.client import get_camera_client
+from camera.breaker import CameraUnavailableError
+from camera.deadline import Deadline
+from camera.frame import Frame
+from camera.jpeg import get_jpeg_dimensions
 from utils.terminal import print_info, print_error, print_warning, print_success
 
 
-def set_camera_framesize(framesize=DEFAULT_FRAMESIZE, timeout=5, retries=2):
+def set_camera_framesize(
+    framesize=DEFAULT_FRAMESIZE,
+    timeout=5,
+    retries=2,
+    camera_ip=CAMERA_IP,
+    deadline=None,
+):
     """
     Set the camera framesize
 
@@ -17,6 +31,8 @@ def set_camera_framesize(framesize=DEFAULT_FRAMESIZE, timeout=5, retries=2):
         framesize: Frame size enum value (default: UXGA 1600x1200)
         timeout: Request timeout in seconds
         retries: Number of retry attempts
+        camera_ip: Camera to configure
+        deadline: Optional Deadline bounding all attempts
 
     Returns:
         bool: True if successful, False otherwise
@@ -35,19 +51,29 @@ def set_camera_framesize(framesize=DEFAULT_FRAMESIZE, timeout=5, retries=2):
     }
 
     resolution_name = framesize_map.get(framesize, f"Unknown ({framesize})")
-    control_url = f"{CONTROL_URL}?var=framesize&val={framesize}"
+    client = get_camera_client(camera_ip)
+    client.state.invalidate()
+    deadline = deadline or Deadline()
 
     for attempt in range(retries):
+        if deadline.expired():
+            break
         try:
             print_info(f"Setting camera resolution to {resolution_name}...")
-            response = requests.get(control_url, timeout=timeout)
+            response = client.get(
+                "/control",
+                params={"var": "framesize", "val": framesize},
+                timeout=timeout,
+                deadline=deadline,
+            )
 
             if response.status_code == 200:
                 print_success(f"Camera resolution set to {resolution_name}")
+                client.state.confirm_framesize(framesize)
                 # Important: Add a delay to allow the camera to adjust
                 delay = 1.5  # seconds
                 print_info(f"Waiting {delay} seconds for camera to adjust...")
-                time.sleep(delay)
+                deadline.sleep(delay)
                 return True
             else:
                 print_warning(
@@ -55,17 +81,47 @@ def set_camera_framesize(framesize=DEFAULT_FRAMESIZE, timeout=5, retries=2):
                 )
                 if attempt < retries - 1:
                     print_warning(f"Retrying...")
-                    time.sleep(1)
+                    deadline.sleep(1)
+        except CameraUnavailableError as e:
+            print_warning(f"Not setting camera resolution: {e}")
+            return False
         except Exception as e:
             print_error(f"Error setting camera resolution: {e}")
             if attempt < retries - 1:
                 print_warning(f"Retrying...")
-                time.sleep(1)
+                deadline.sleep(1)
 
     return False
 
 
-def capture_image(framesize=DEFAULT_FRAMESIZE, timeout=10, retries=3, retry_delay=2):
+def ensure_camera_framesize(
+    framesize=DEFAULT_FRAMESIZE, camera_ip=CAMERA_IP, deadline=None
+):
+    """
+    Set the camera framesize only if it differs from the last confirmed one
+
+    Args:
+        framesize: Frame size enum value
+        camera_ip: Camera to configure
+        deadline: Optional Deadline bounding all attempts
+
+    Returns:
+        bool: True if the camera is (or now is) at the requested framesize
+    """
+    client = get_camera_client(camera_ip)
+    if client.state.get_framesize() == framesize:
+        return True
+    return set_camera_framesize(framesize, camera_ip=camera_ip, deadline=deadline)
+
+
+def capture_image(
+    framesize=DEFAULT_FRAMESIZE,
+    timeout=10,
+    retries=3,
+    retry_delay=2,
+    camera_ip=CAMERA_IP,
+    deadline=None,
+):
     """
     Capture a single image from the ESP32 camera with retries
 
@@ -74,12 +130,22 @@ def capture_image(framesize=DEFAULT_FRAMESIZE, timeout=10, retries=3, retry_dela
         timeout: Request timeout in seconds
         retries: Number of retry attempts
         retry_delay: Delay between retries in seconds
+        camera_ip: Camera to capture from
+        deadline: Optional Deadline bounding all attempts and delays
 
     Returns:
         Image data or None if failed
     """
-    # First set the camera framesize to UXGA (1600x1200)
-    set_success = set_camera_framesize(framesize)
+    client = get_camera_client(camera_ip)
+    deadline = deadline or Deadline()
+    expected_width, expected_height = FRAMESIZE_DIMENSIONS.get(
+        framesize, FRAMESIZE_DIMENSIONS[FRAMESIZE_UXGA]
+    )
+
+    # First make sure the camera is at the requested framesize
+    set_success = ensure_camera_framesize(
+        framesize, camera_ip=camera_ip, deadline=deadline
+    )
     if not set_success:
         print_warning(
             "Failed to set camera resolution, but will still attempt to capture"
@@ -87,41 +153,42 @@ def capture_image(framesize=DEFAULT_FRAMESIZE, timeout=10, retries=3, retry_dela
 
     # Then capture the image
     for attempt in range(retries):
+        if deadline.expired():
+            print_warning("Capture deadline reached, giving up")
+            break
         try:
             print_info(f"Capturing image...")
-            response = requests.get(CAPTURE_URL, timeout=timeout)
+            response = client.get("/capture", timeout=timeout, deadline=deadline)
 
             if response.status_code == 200:
-                # Validate the image size
-                try:
-                    image_data = response.content
-                    img = Image.open(io.BytesIO(image_data))
-                    width, height = img.size
-
-                    if width == 1600 and height == 1200:
-                        print_success(
-                            f"Image captured successfully at full UXGA resolution (1600x1200)"
-                        )
-                    else:
-                        print_warning(
-                            f"Image captured at {width}x{height} instead of 1600x1200"
-                        )
+                # Validate the image size from the JPEG header
+                image_data = response.content
+                dimensions = get_jpeg_dimensions(image_data)
+                if dimensions is None:
+                    print_warning("Could not verify image dimensions")
+                    return image_data
+                width, height = dimensions
 
-                        # If resolution is wrong, try setting it again and recapturing
-                        if attempt < retries - 1 and (width != 1600 or height != 1200):
-                            print_warning(
-                                "Wrong resolution! Setting resolution again..."
-                            )
-                            # Try more forceful resolution setting
-                            for i in range(2):  # Try twice
-                                set_camera_framesize(framesize)
-                                time.sleep(1.5)  # Wait longer for camera to adjust
-                            continue  # Skip to next capture attempt
+                if width == expected_width and height == expected_height:
+                    client.state.confirm_framesize(framesize)
+                    print_success(f"Image captured successfully at {width}x{height}")
+                else:
+                    print_warning(
+                        f"Image captured at {width}x{height} instead of "
+                        f"{expected_width}x{expected_height}"
+                    )
+                    # The camera is not where we thought it was (e.g. it rebooted)
+                    client.state.invalidate()
 
-                    return image_data
-                except Exception as e:
-                    print_warning(f"Could not verify image dimensions: {e}")
-                    return response.content
+                    # If resolution is wrong, set it again and recapture
+                    if attempt < retries - 1:
+                        print_warning("Wrong resolution! Setting resolution again...")
+                        set_camera_framesize(
+                            framesize, camera_ip=camera_ip, deadline=deadline
+                        )
+                        continue  # Skip to next capture attempt
+
+                return image_data
             else:
                 print_warning(
                     f"Failed to capture image. Status code: {response.status_code}"
@@ -130,28 +197,31 @@ def capture_image(framesize=DEFAULT_FRAMESIZE, timeout=10, retries=3, retry_dela
                     print_warning(
                         f"Retrying in {retry_delay} seconds... (Attempt {attempt+1}/{retries})"
                     )
-                    time.sleep(retry_delay)
+                    deadline.sleep(retry_delay)
+        except CameraUnavailableError as e:
+            print_warning(f"Skipping capture: {e}")
+            return None
         except requests.exceptions.ConnectionError as e:
             print_error(f"Connection error to camera: {e}")
             if attempt < retries - 1:
                 print_warning(
                     f"Retrying in {retry_delay} seconds... (Attempt {attempt+1}/{retries})"
                 )
-                time.sleep(retry_delay)
+                deadline.sleep(retry_delay)
         except requests.exceptions.Timeout as e:
             print_error(f"Timeout error capturing image: {e}")
             if attempt < retries - 1:
                 print_warning(
                     f"Retrying in {retry_delay} seconds... (Attempt {attempt+1}/{retries})"
                 )
-                time.sleep(retry_delay)
+                deadline.sleep(retry_delay)
         except Exception as e:
             print_error(f"Error capturing image: {e}")
             if attempt < retries - 1:
                 print_warning(
                     f"Retrying in {retry_delay} seconds... (Attempt {attempt+1}/{retries})"
                 )
-                time.sleep(retry_delay)
+                deadline.sleep(retry_delay)
 
     # If we reach here, all retries failed
     print_error("All capture attempts failed after multiple retries")
@@ -159,7 +229,12 @@ def capture_image(framesize=DEFAULT_FRAMESIZE, timeout=10, retries=3, retry_dela
 
 
 def capture_image_alternative(
-    framesize=DEFAULT_FRAMESIZE, timeout=10, retries=3, retry_delay=2
+    framesize=DEFAULT_FRAMESIZE,
+    timeout=10,
+    retries=3,
+    retry_delay=2,
+    camera_ip=CAMERA_IP,
+    deadline=None,
 ):
     """
     Alternative capture method trying multiple approaches
@@ -169,36 +244,127 @@ def capture_image_alternative(
         timeout: Request timeout in seconds
         retries: Number of retry attempts
         retry_delay: Delay between retries in seconds
+        camera_ip: Camera to capture from
+        deadline: Optional Deadline bounding all attempts and delays
 
     Returns:
         Image data or None if failed
     """
-    # Try direct capture URL with framesize parameter
-    capture_url_with_size = f"{CAPTURE_URL}?size={framesize}"
+    client = get_camera_client(camera_ip)
+    deadline = deadline or Deadline()
+    expected_width, expected_height = FRAMESIZE_DIMENSIONS.get(
+        framesize, FRAMESIZE_DIMENSIONS[FRAMESIZE_UXGA]
+    )
+
+    # The firmware ignores the size parameter, so the framesize still has to
+    # be set, but only when it is not already known to be right
+    ensure_camera_framesize(framesize, camera_ip=camera_ip, deadline=deadline)
 
     for attempt in range(retries):
+        if deadline.expired():
+            break
         try:
             print_info(f"Attempting alternative capture with size parameter...")
-            response = requests.get(capture_url_with_size, timeout=timeout)
+            # Try direct capture URL with framesize parameter
+            response = client.get(
+                "/capture",
+                params={"size": framesize},
+                timeout=timeout,
+                deadline=deadline,
+            )
 
             if response.status_code == 200:
-                # Validate image size
-                try:
-                    image_data = response.content
-                    img = Image.open(io.BytesIO(image_data))
-                    width, height = img.size
-                    print_success(
-                        f"Alternative capture successful, image size: {width}x{height}"
-                    )
+                # Validate image size from the JPEG header
+                image_data = response.content
+                dimensions = get_jpeg_dimensions(image_data)
+                if dimensions is None:
                     return image_data
-                except Exception:
-                    return response.content
+                width, height = dimensions
+                if width != expected_width or height != expected_height:
+                    print_warning(
+                        f"Alternative capture returned {width}x{height} instead of "
+                        f"{expected_width}x{expected_height}"
+                    )
+                    client.state.invalidate()
+                    break
+                client.state.confirm_framesize(framesize)
+                print_success(
+                    f"Alternative capture successful, image size: {width}x{height}"
+                )
+                return image_data
             else:
                 print_warning(
                     f"Alternative capture failed with status: {response.status_code}"
                 )
+        except CameraUnavailableError as e:
+            print_warning(f"Skipping capture: {e}")
+            return None
         except Exception as e:
             print_error(f"Error in alternative capture: {e}")
 
     # If alternative method fails, fall back to regular method
-    return capture_image(framesize, timeout, retries, retry_delay)
+    if deadline.expired() or client.breaker.is_open():
+        print_warning(
+            f"Camera {camera_ip} unavailable, not falling back to regular capture"
+        )
+        return None
+    return capture_image(
+        framesize, timeout, retries, retry_delay, camera_ip, deadline=deadline
+    )
+
+
+def capture_frame(
+    framesize=DEFAULT_FRAMESIZE,
+    camera_ip=CAMERA_IP,
+    mode=CAPTURE_MODE,
+    max_age=CAMERA_STREAM_MAX_FRAME_AGE,
+    deadline=None,
+    stream_url=None,
+):
+    """
+    Capture one frame using the configured capture mode
+
+    In "stream" mode the freshest frame from the camera's MJPEG stream is
+    used; if the stream is down or has no recent frame at the requested
+    size, this falls back to a /capture request.
+
+    Args:
+        framesize: Frame size enum value
+        camera_ip: Camera to capture from
+        mode: "poll" or "stream"
+        max_age: Maximum age in seconds of a streamed frame
+        deadline: Optional Deadline bounding all attempts and delays
+        stream_url: MJPEG stream URL (default: derived from camera_ip)
+
+    Returns:
+        Frame or None if failed
+    """
+    deadline = deadline or Deadline()
+    if get_camera_client(camera_ip).breaker.is_open():
+        print_warning(f"Camera {camera_ip} circuit is open, skipping frame")
+        return None
+
+    if mode == "stream":
+        from camera.stream import get_stream_reader
+
+        expected = FRAMESIZE_DIMENSIONS.get(
+            framesize, FRAMESIZE_DIMENSIONS[FRAMESIZE_UXGA]
+        )
+        ensure_camera_framesize(framesize, camera_ip=camera_ip, deadline=deadline)
+        reader = get_stream_reader(camera_ip, stream_url)
+
+        frame = reader.get_latest_frame(max_age)
+        if (frame is None or frame.dimensions != expected) and reader.connected:
+            # Just connected or just resized: wait briefly for the next frame
+            frame = reader.wait_for_frame(deadline.limit(max_age))
+        if frame is not None and frame.dimensions == expected:
+            return frame
+
+        print_warning("No fresh frame on the MJPEG stream, falling back to /capture")
+
+    image_data = capture_image_alternative(
+        framesize=framesize, camera_ip=camera_ip, deadline=deadline
+    )
+    if not image_data:
+        return None
+    return Frame(image_data)
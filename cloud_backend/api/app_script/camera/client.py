@@ -0,0 +1,137 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from config import (
+    CAMERA_IP,
+    CAMERA_HTTP_POOL_SIZE,
+    CAMERA_CONNECT_TIMEOUT,
+    CAMERA_READ_TIMEOUT,
+)
+from camera.breaker import CircuitBreaker, CameraUnavailableError, STATE_HALF_OPEN
+
+
+class CameraState:
+    """
+    Last known configuration of a camera
+
+    Remembers the framesize the camera was last confirmed to be using, so
+    /control is only called (and the camera only given time to adjust)
+    when the framesize actually has to change.
+    """
+
+    def __init__(self):
+        self.framesize = None
+        self.confirmed_at = None
+        self.lock = threading.Lock()
+
+    def get_framesize(self):
+        """Get the confirmed framesize, or None if unknown"""
+        with self.lock:
+            return self.framesize
+
+    def confirm_framesize(self, framesize):
+        """Record that the camera is using a framesize"""
+        with self.lock:
+            self.framesize = framesize
+            self.confirmed_at = time.time()
+
+    def invalidate(self):
+        """Forget the framesize, e.g. after a wrong-size frame or camera reboot"""
+        with self.lock:
+            self.framesize = None
+            self.confirmed_at = None
+
+
+class CameraClient:
+    """
+    HTTP client for one ESP32 camera that keeps connections alive between requests
+
+    The ESP32-CAM web server can only hold a handful of sockets, so requests
+    share a small, blocking connection pool instead of opening a new TCP
+    connection for every frame and /control call. Every request goes through
+    the camera's circuit breaker.
+    """
+
+    def __init__(
+        self,
+        camera_ip,
+        pool_size=CAMERA_HTTP_POOL_SIZE,
+        connect_timeout=CAMERA_CONNECT_TIMEOUT,
+        read_timeout=CAMERA_READ_TIMEOUT,
+    ):
+        self.camera_ip = camera_ip
+        self.base_url = f"http://{camera_ip}"
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.state = CameraState()
+        self.breaker = CircuitBreaker(camera_ip)
+
+        self.session = requests.Session()
+        # pool_block keeps us within the camera's socket budget
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0
+        )
+        self.session.mount("http://", adapter)
+
+    def get(self, path, params=None, timeout=None, deadline=None):
+        """
+        Send a GET request to the camera over a pooled connection
+
+        Args:
+            path: URL path such as "/capture" or "/control"
+            params: Optional query parameters
+            timeout: Read timeout in seconds (default: CAMERA_READ_TIMEOUT)
+            deadline: Optional Deadline capping both timeouts
+
+        Returns:
+            requests.Response
+
+        Raises:
+            CameraUnavailableError: If the camera's circuit is open
+        """
+        if not self.breaker.allow_request():
+            raise CameraUnavailableError(f"Camera {self.camera_ip} circuit is open")
+
+        if self.breaker.get_state() == STATE_HALF_OPEN and path != "/status":
+            # Check health with a cheap request before trusting the camera again
+            self._send("/status", None, self.connect_timeout, deadline)
+        return self._send(path, params, timeout, deadline)
+
+    def _send(self, path, params, timeout, deadline):
+        read_timeout = self.read_timeout if timeout is None else timeout
+        connect_timeout = self.connect_timeout
+        if deadline is not None:
+            read_timeout = max(0.1, deadline.limit(read_timeout))
+            connect_timeout = max(0.1, deadline.limit(connect_timeout))
+        try:
+            response = self.session.get(
+                f"{self.base_url}{path}",
+                params=params,
+                timeout=(connect_timeout, read_timeout),
+            )
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.breaker.record_failure()
+            raise
+        # Any HTTP response means the camera is up
+        self.breaker.record_success()
+        return response
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
+
+
+# Shared clients, one per camera, used by every session
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_camera_client(camera_ip=CAMERA_IP):
+    """Get the shared client for a camera, creating it on first use"""
+    with _clients_lock:
+        client = _clients.get(camera_ip)
+        if client is None:
+            client = CameraClient(camera_ip)
+            _clients[camera_ip] = client
+        return client
@@ -0,0 +1,47 @@
+import time
+
+
+class Deadline:
+    """
+    Absolute time budget shared by every retry of a capture
+
+    Args:
+        seconds: Budget from now, or None for no limit
+        expires_at: Absolute expiry time (overrides seconds)
+    """
+
+    def __init__(self, seconds=None, expires_at=None):
+        if expires_at is None and seconds is not None:
+            expires_at = time.time() + seconds
+        self.expires_at = expires_at
+
+    def remaining(self):
+        """Seconds left, or None if unbounded"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.time())
+
+    def expired(self):
+        return self.expires_at is not None and time.time() >= self.expires_at
+
+    def limit(self, seconds):
+        """Cap a timeout or delay to the time left"""
+        remaining = self.remaining()
+        return seconds if remaining is None else min(seconds, remaining)
+
+    def sleep(self, seconds):
+        """
+        Sleep within the budget
+
+        Returns:
+            bool: False if the deadline expired, so the caller should stop retrying
+        """
+        time.sleep(self.limit(seconds))
+        return not self.expired()
+
+    def child(self, seconds):
+        """A deadline that ends after seconds, but never after this one"""
+        child = Deadline(seconds)
+        if self.expires_at is not None:
+            child.expires_at = min(child.expires_at, self.expires_at)
+        return child
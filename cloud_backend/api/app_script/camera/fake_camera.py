@@ -0,0 +1,201 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import cv2
+from config import FRAMESIZE_DIMENSIONS, FRAMESIZE_UXGA
+from utils.terminal import print_info
+
+STREAM_BOUNDARY = "123456789000000000000987654321"
+
+
+class _FakeCameraHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep connections alive, like the ESP32 httpd
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        camera = self.server.camera
+        with camera.lock:
+            camera.connections += 1
+        # Emulate the cost of accepting a new connection on the ESP32
+        if camera.connection_delay:
+            time.sleep(camera.connection_delay)
+        super().setup()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        camera = self.server.camera
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        with camera.lock:
+            camera.requests += 1
+
+        if url.path == "/capture":
+            with camera.lock:
+                camera.captures += 1
+            self._send(200, "image/jpeg", camera.get_jpeg())
+        elif url.path == "/control":
+            if query.get("var") == ["framesize"]:
+                camera.set_framesize(int(query.get("val", [FRAMESIZE_UXGA])[0]))
+            self._send(200, "text/plain", b"")
+        elif url.path == "/stream":
+            self._stream()
+        elif url.path == "/status":
+            status = json.dumps({"framesize": camera.framesize}).encode()
+            self._send(200, "application/json", status)
+        else:
+            self._send(404, "text/plain", b"Not found")
+
+    def _stream(self):
+        camera = self.server.camera
+        if not camera.stream_enabled:
+            self._send(503, "text/plain", b"Stream disabled")
+            return
+
+        # Same framing as the firmware's stream_handler; the body runs until
+        # the connection closes
+        self.close_connection = True
+        self.send_response(200)
+        self.send_header(
+            "Content-Type", f"multipart/x-mixed-replace;boundary={STREAM_BOUNDARY}"
+        )
+        self.end_headers()
+        try:
+            while camera.stream_enabled and not camera.stop_event.is_set():
+                jpeg = camera.get_jpeg()
+                self.wfile.write(f"\r\n--{STREAM_BOUNDARY}\r\n".encode())
+                self.wfile.write(
+                    (
+                        "Content-Type: image/jpeg\r\n"
+                        f"Content-Length: {len(jpeg)}\r\n"
+                        f"X-Timestamp: {time.time():.6f}\r\n\r\n"
+                    ).encode()
+                )
+                self.wfile.write(jpeg)
+                self.wfile.flush()
+                with camera.lock:
+                    camera.frames_streamed += 1
+                camera.stop_event.wait(1.0 / camera.stream_fps)
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeCamera:
+    """
+    Local stand-in for the ESP32 CameraWebServer firmware
+
+    Serves /capture (JPEG at the current framesize), /control (framesize
+    changes), /status and an MJPEG /stream, and counts connections and
+    requests so tests and benchmarks can check connection reuse. Clearing
+    stream_enabled ends open streams, emulating a dropped stream.
+    """
+
+    def __init__(
+        self,
+        host="127.0.0.1",
+        port=0,
+        framesize=FRAMESIZE_UXGA,
+        connection_delay=0.0,
+        quality=80,
+        stream_fps=10,
+    ):
+        self.host = host
+        self.port = port
+        self.framesize = framesize
+        self.connection_delay = connection_delay
+        self.quality = quality
+        self.stream_fps = stream_fps
+        self.stream_enabled = True
+        self.stop_event = threading.Event()
+        self.frames_streamed = 0
+        self.captures = 0  # /capture requests, as opposed to streamed frames
+        self.lock = threading.Lock()
+        self.jpeg_cache = {}
+        self.connections = 0
+        self.requests = 0
+        self.server = None
+        self.thread = None
+
+    @property
+    def address(self):
+        """host:port usable wherever a camera IP is expected"""
+        return f"{self.host}:{self.port}"
+
+    def start(self):
+        """Start serving in a background thread"""
+        self.server = ThreadingHTTPServer((self.host, self.port), _FakeCameraHandler)
+        self.server.daemon_threads = True
+        self.server.camera = self
+        self.stop_event.clear()
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, name="FakeCamera", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving"""
+        self.stop_event.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+    def set_framesize(self, framesize):
+        with self.lock:
+            self.framesize = framesize
+
+    def get_jpeg(self):
+        """Get a JPEG frame at the current framesize"""
+        with self.lock:
+            framesize = self.framesize
+            jpeg = self.jpeg_cache.get(framesize)
+        if jpeg is None:
+            jpeg = self._render(framesize)
+            with self.lock:
+                self.jpeg_cache[framesize] = jpeg
+        return jpeg
+
+    def _render(self, framesize):
+        width, height = FRAMESIZE_DIMENSIONS.get(
+            framesize, FRAMESIZE_DIMENSIONS[FRAMESIZE_UXGA]
+        )
+        # Gradient plus noise gives a realistic JPEG size
+        rng = np.random.default_rng(framesize)
+        gradient = np.linspace(0, 255, width, dtype=np.float32)[None, :, None]
+        img = np.broadcast_to(gradient, (height, width, 3)).copy()
+        img += rng.normal(0, 20, img.shape)
+        img = np.clip(img, 0, 255).astype(np.uint8)
+        ok, buf = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        return buf.tobytes()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a fake ESP32-CAM server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--connection-delay", type=float, default=0.0)
+    args = parser.parse_args()
+
+    camera = FakeCamera(args.host, args.port, connection_delay=args.connection_delay)
+    camera.start()
+    print_info(f"Fake camera listening on http://{camera.address}")
+    print_info(f"MJPEG stream at http://{camera.address}/stream")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        camera.stop()
@@ -0,0 +1,108 @@
+import threading
+import time
+import numpy as np
+import cv2
+from camera.jpeg import get_jpeg_dimensions
+
+# JPEG decoders can scale by 1/2, 1/4 and 1/8 while decoding
+_REDUCED_FLAGS = {
+    2: cv2.IMREAD_REDUCED_COLOR_2,
+    4: cv2.IMREAD_REDUCED_COLOR_4,
+    8: cv2.IMREAD_REDUCED_COLOR_8,
+}
+
+
+class Frame:
+    """
+    A captured JPEG that is decoded at most once
+
+    The raw bytes are kept for storage, the dimensions come from the JPEG
+    header, and the decoded BGR image is created on first use and shared by
+    detection and annotation. reduced() gives a cheaper, smaller decode for
+    inference. Treat the decoded images as read-only.
+
+    Args:
+        data: JPEG bytes as returned by the camera
+        captured_at: Capture time (default: now)
+    """
+
+    def __init__(self, data, captured_at=None):
+        self.data = data
+        self.captured_at = time.time() if captured_at is None else captured_at
+        self.dimensions = get_jpeg_dimensions(data)
+        self._image = None
+        self._decoded = False
+        self._reduced = {}  # scale factor -> decoded image
+        self._lock = threading.Lock()
+
+    @property
+    def width(self):
+        return self.dimensions[0] if self.dimensions else None
+
+    @property
+    def height(self):
+        return self.dimensions[1] if self.dimensions else None
+
+    @property
+    def image(self):
+        """Decoded BGR image, or None if the data is not a valid image"""
+        with self._lock:
+            if not self._decoded:
+                self._image = cv2.imdecode(
+                    np.frombuffer(self.data, np.uint8), cv2.IMREAD_COLOR
+                )
+                self._decoded = True
+                if self._image is not None:
+                    height, width = self._image.shape[:2]
+                    self.dimensions = (width, height)
+            return self._image
+
+    def reduced(self, min_size):
+        """
+        Decode at the smallest JPEG scale that keeps the longer side >= min_size
+
+        Args:
+            min_size: Smallest acceptable longer side, e.g. the model input size
+
+        Returns:
+            tuple: (image, scale) where scale maps reduced pixel coordinates
+            back to full resolution, or (None, 1.0) if decoding failed
+        """
+        factor = 1
+        if self.dimensions is not None:
+            longest = max(self.dimensions)
+            for candidate in sorted(_REDUCED_FLAGS):
+                if longest / candidate >= min_size:
+                    factor = candidate
+
+        with self._lock:
+            # Already decoded at full size: no point decoding again
+            if factor == 1 or self._decoded:
+                factor = 1
+            elif factor not in self._reduced:
+                self._reduced[factor] = cv2.imdecode(
+                    np.frombuffer(self.data, np.uint8), _REDUCED_FLAGS[factor]
+                )
+            image = self._reduced.get(factor)
+        if factor == 1:
+            image = self.image
+
+        if image is None:
+            return None, 1.0
+        if self.width is None:
+            return image, 1.0
+        return image, self.width / image.shape[1]
+
+    def release(self):
+        """Drop the decoded images, keeping the JPEG bytes"""
+        with self._lock:
+            self._image = None
+            self._decoded = False
+            self._reduced = {}
+
+
+def as_frame(image):
+    """Wrap raw JPEG bytes in a Frame, passing existing Frames through"""
+    if isinstance(image, Frame):
+        return image
+    return Frame(image)
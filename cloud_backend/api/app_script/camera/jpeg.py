@@ -0,0 +1,51 @@
+import struct
+
+# Start-of-frame markers carry the image dimensions. C4 (DHT), C8 (JPG) and
+# CC (DAC) share the range but are not frame headers.
+_SOF_MARKERS = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Markers that stand alone without a length field
+_STANDALONE_MARKERS = {0x01, 0xD0, 0xD1, 0xD2, 0xD3, 0xD4, 0xD5, 0xD6, 0xD7}
+
+
+def get_jpeg_dimensions(data):
+    """
+    Read the width and height of a JPEG from its SOF header without decoding it
+
+    Only the marker segments before the frame header are walked, so this
+    costs microseconds regardless of the image size.
+
+    Args:
+        data: JPEG bytes
+
+    Returns:
+        tuple: (width, height), or None if the data is not a parsable JPEG
+    """
+    if not data or len(data) < 4 or data[0] != 0xFF or data[1] != 0xD8:
+        return None
+
+    length = len(data)
+    pos = 2
+    while pos + 4 <= length:
+        if data[pos] != 0xFF:
+            return None
+        marker = data[pos + 1]
+        # Skip fill bytes between markers
+        if marker == 0xFF:
+            pos += 1
+            continue
+        if marker in _STANDALONE_MARKERS:
+            pos += 2
+            continue
+        if marker in (0xD9, 0xDA):
+            # End of image or start of scan before any frame header
+            return None
+
+        (segment_length,) = struct.unpack(">H", data[pos + 2 : pos + 4])
+        if marker in _SOF_MARKERS:
+            if pos + 9 > length:
+                return None
+            height, width = struct.unpack(">HH", data[pos + 5 : pos + 9])
+            return width, height
+        pos += 2 + segment_length
+
+    return None
@@ -0,0 +1,127 @@
+import asyncio
+import functools
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from config import (
+    CAMERA_IP,
+    DEFAULT_FRAMESIZE,
+    SITE_CAMERAS,
+    CAMERA_CAPTURE_TIMEOUT,
+    CAMERA_CAPTURE_WORKERS,
+)
+from camera.capture import capture_frame
+from camera.deadline import Deadline
+from utils.terminal import print_warning, print_error
+
+# Blocking fetches run here; the event loop only coordinates them
+_executor = None
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_site_cameras(device_id=None):
+    """Get the cameras covering a sensor device, defaulting to CAMERA_IP"""
+    return list(SITE_CAMERAS.get(device_id) or [CAMERA_IP])
+
+
+def _get_loop():
+    """Get the shared capture event loop, starting its thread on first use"""
+    global _executor, _loop
+    with _loop_lock:
+        if _loop is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=CAMERA_CAPTURE_WORKERS, thread_name_prefix="CameraFetch"
+            )
+            _loop = asyncio.new_event_loop()
+            _loop.set_default_executor(_executor)
+            threading.Thread(
+                target=_loop.run_forever, name="CameraCaptureLoop", daemon=True
+            ).start()
+        return _loop
+
+
+async def _capture_one(camera_ip, framesize, timeout, deadline):
+    loop = asyncio.get_running_loop()
+    # The deadline also stops the blocking fetch's retries once we stop waiting
+    camera_deadline = deadline.child(timeout)
+    fetch = functools.partial(
+        capture_frame, framesize, camera_ip, deadline=camera_deadline
+    )
+    try:
+        frame = await asyncio.wait_for(loop.run_in_executor(None, fetch), timeout)
+    except asyncio.TimeoutError:
+        print_warning(f"Camera {camera_ip} did not return a frame within {timeout}s")
+        frame = None
+    except Exception as e:
+        print_error(f"Error capturing from camera {camera_ip}: {e}")
+        frame = None
+    return camera_ip, frame
+
+
+async def capture_frames_async(
+    camera_ips,
+    framesize=DEFAULT_FRAMESIZE,
+    timeout=CAMERA_CAPTURE_TIMEOUT,
+    deadline=None,
+):
+    """
+    Capture one frame from each camera concurrently
+
+    Args:
+        camera_ips: Camera addresses to sample
+        framesize: Frame size enum value requested from every camera
+        timeout: Per-camera timeout in seconds
+        deadline: Optional Deadline no camera may exceed
+
+    Yields:
+        tuple: (camera_ip, Frame or None) in the order the cameras answer
+    """
+    deadline = deadline or Deadline()
+    tasks = [
+        _capture_one(camera_ip, framesize, timeout, deadline)
+        for camera_ip in camera_ips
+    ]
+    for next_result in asyncio.as_completed(tasks):
+        yield await next_result
+
+
+def iter_frames(
+    camera_ips,
+    framesize=DEFAULT_FRAMESIZE,
+    timeout=CAMERA_CAPTURE_TIMEOUT,
+    deadline=None,
+):
+    """
+    Blocking wrapper around capture_frames_async for worker threads
+
+    The fetches run concurrently on the shared capture loop, and results
+    are handed back as they arrive, so a session can start analysing the
+    first viewpoint while the others are still downloading.
+
+    Args:
+        camera_ips: Camera addresses to sample
+        framesize: Frame size enum value requested from every camera
+        timeout: Per-camera timeout in seconds
+        deadline: Optional Deadline no camera may exceed
+
+    Yields:
+        tuple: (camera_ip, Frame or None), one per camera
+    """
+    results = queue.Queue()
+
+    async def collect():
+        try:
+            async for result in capture_frames_async(
+                camera_ips, framesize, timeout, deadline
+            ):
+                results.put(result)
+        finally:
+            results.put(None)
+
+    asyncio.run_coroutine_threadsafe(collect(), _get_loop())
+    while True:
+        result = results.get()
+        if result is None:
+            return
+        yield result
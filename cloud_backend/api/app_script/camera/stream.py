@@ -0,0 +1,330 @@
+import threading
+import time
+from collections import deque
+import requests
+from config import (
+    CAMERA_IP,
+    CAMERA_STREAM_PORT,
+    CAMERA_STREAM_URLS,
+    CAMERA_STREAM_BUFFER_SIZE,
+    CAMERA_STREAM_RECONNECT_DELAY,
+    CAMERA_STREAM_IDLE_TIMEOUT,
+    CAMERA_CONNECT_TIMEOUT,
+    CAMERA_READ_TIMEOUT,
+)
+from camera.frame import Frame
+from utils.terminal import print_info, print_warning, print_success
+
+# Boundary used by the ESP32 CameraWebServer firmware
+DEFAULT_BOUNDARY = "123456789000000000000987654321"
+# A part larger than this means we lost sync with the stream
+MAX_PART_SIZE = 4 * 1024 * 1024
+
+
+def stream_url_for(camera_ip, port=CAMERA_STREAM_PORT):
+    """
+    Build the MJPEG stream URL for a camera address
+
+    CAMERA_STREAM_URLS overrides take precedence. A bare host streams on the
+    firmware's stream port; an explicit host:port (e.g. a FakeCamera, which
+    serves /stream next to /capture) is kept as is.
+    """
+    if camera_ip in CAMERA_STREAM_URLS:
+        return CAMERA_STREAM_URLS[camera_ip]
+    if ":" in camera_ip:
+        return f"http://{camera_ip}/stream"
+    return f"http://{camera_ip}:{port}/stream"
+
+
+def _parse_boundary(content_type):
+    for param in content_type.split(";")[1:]:
+        key, _, value = param.strip().partition("=")
+        if key.lower() == "boundary" and value:
+            return value.strip('"')
+    return DEFAULT_BOUNDARY
+
+
+def _parse_part_headers(block):
+    headers = {}
+    for line in bytes(block).decode("latin-1").split("\r\n"):
+        key, sep, value = line.partition(":")
+        if sep:
+            headers[key.strip().lower()] = value.strip()
+    return headers
+
+
+def iter_mjpeg_parts(chunks, boundary=DEFAULT_BOUNDARY):
+    """
+    Split a multipart MJPEG byte stream into parts
+
+    Parts are delimited by "--boundary" followed by headers. The body
+    length comes from Content-Length when present, otherwise the body
+    runs up to the next delimiter.
+
+    Args:
+        chunks: Iterable of byte chunks as read from the socket
+        boundary: Multipart boundary without the leading dashes
+
+    Yields:
+        tuple: (body_bytes, headers_dict)
+    """
+    delimiter = b"--" + boundary.encode()
+    buffer = bytearray()
+
+    for chunk in chunks:
+        buffer += chunk
+        while True:
+            start = buffer.find(delimiter)
+            if start < 0:
+                # Keep only what could be the start of a split delimiter
+                del buffer[: max(0, len(buffer) - len(delimiter))]
+                break
+
+            header_end = buffer.find(b"\r\n\r\n", start)
+            if header_end < 0:
+                break
+            headers = _parse_part_headers(buffer[start + len(delimiter) : header_end])
+            body_start = header_end + 4
+
+            length = headers.get("content-length")
+            if length is not None and length.isdigit():
+                body_end = body_start + int(length)
+                if len(buffer) < body_end:
+                    if len(buffer) - start > MAX_PART_SIZE:
+                        buffer.clear()
+                    break
+                body = bytes(buffer[body_start:body_end])
+            else:
+                body_end = buffer.find(delimiter, body_start)
+                if body_end < 0:
+                    if len(buffer) - start > MAX_PART_SIZE:
+                        buffer.clear()
+                    break
+                body = bytes(buffer[body_start:body_end]).rstrip(b"\r\n")
+
+            del buffer[:body_end]
+            yield body, headers
+
+
+class MJPEGStreamReader:
+    """
+    Background reader that keeps the most recent frames of a camera's MJPEG stream
+
+    Frames land in a fixed-size ring buffer, so a session can take the
+    freshest one without a request round trip. The reader reconnects on
+    its own when the stream drops; callers fall back to /capture while no
+    fresh frame is available.
+
+    Args:
+        stream_url: MJPEG stream URL
+        buffer_size: Number of recent frames to keep
+        reconnect_delay: Seconds to wait before reconnecting
+        connect_timeout: Seconds to establish the connection
+        read_timeout: Seconds without data before the stream counts as dropped
+    """
+
+    def __init__(
+        self,
+        stream_url,
+        buffer_size=CAMERA_STREAM_BUFFER_SIZE,
+        reconnect_delay=CAMERA_STREAM_RECONNECT_DELAY,
+        connect_timeout=CAMERA_CONNECT_TIMEOUT,
+        read_timeout=CAMERA_READ_TIMEOUT,
+    ):
+        self.stream_url = stream_url
+        self.reconnect_delay = reconnect_delay
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+
+        self.frames = deque(maxlen=buffer_size)
+        self.condition = threading.Condition()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.response = None
+        self.connected = False
+        self.last_used = time.time()
+
+        # Metrics
+        self.frames_received = 0
+        self.connects = 0
+        self.disconnects = 0
+
+    def start(self):
+        """Start the reader thread (no-op if already running)"""
+        if self.thread is not None and self.thread.is_alive():
+            return self
+        self.stop_event.clear()
+        self.thread = threading.Thread(
+            target=self._run, name=f"MJPEGStream-{self.stream_url}", daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def stop(self, timeout=5):
+        """Stop the reader and close the stream"""
+        self.stop_event.set()
+        response = self.response
+        if response is not None:
+            try:
+                response.close()
+            except Exception:
+                pass
+        if self.thread is not None:
+            self.thread.join(timeout)
+        self.thread = None
+
+    def get_latest_frame(self, max_age=None):
+        """
+        Get the most recent frame
+
+        Args:
+            max_age: Ignore frames older than this many seconds
+
+        Returns:
+            Frame or None if no (fresh enough) frame is buffered
+        """
+        with self.condition:
+            if not self.frames:
+                return None
+            frame = self.frames[-1]
+        if max_age is not None and time.time() - frame.captured_at > max_age:
+            return None
+        return frame
+
+    def wait_for_frame(self, timeout, after=None):
+        """
+        Wait for a frame newer than a timestamp
+
+        Args:
+            timeout: Maximum seconds to wait
+            after: Only accept frames captured after this time (default: now)
+
+        Returns:
+            Frame or None on timeout
+        """
+        after = time.time() if after is None else after
+        deadline = time.time() + timeout
+        with self.condition:
+            while not self.frames or self.frames[-1].captured_at <= after:
+                remaining = deadline - time.time()
+                if remaining <= 0 or self.stop_event.is_set():
+                    return None
+                self.condition.wait(remaining)
+            return self.frames[-1]
+
+    def get_stats(self):
+        """Get reader statistics"""
+        with self.condition:
+            buffered = len(self.frames)
+            last_frame_at = self.frames[-1].captured_at if self.frames else None
+        return {
+            "connected": self.connected,
+            "buffered": buffered,
+            "frames_received": self.frames_received,
+            "connects": self.connects,
+            "disconnects": self.disconnects,
+            "last_frame_age": (
+                time.time() - last_frame_at if last_frame_at is not None else None
+            ),
+        }
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            try:
+                self._read_stream()
+            except Exception as e:
+                if not self.stop_event.is_set():
+                    print_warning(f"MJPEG stream {self.stream_url} dropped: {e}")
+            finally:
+                if self.connected:
+                    self.disconnects += 1
+                self.connected = False
+                self.response = None
+            self.stop_event.wait(self.reconnect_delay)
+
+    def _read_stream(self):
+        # A dedicated session: the stream holds its connection for as long as it runs
+        with requests.Session() as session:
+            response = session.get(
+                self.stream_url,
+                stream=True,
+                timeout=(self.connect_timeout, self.read_timeout),
+            )
+            self.response = response
+            response.raise_for_status()
+
+            self.connected = True
+            self.connects += 1
+            print_success(f"Connected to MJPEG stream {self.stream_url}")
+
+            boundary = _parse_boundary(response.headers.get("Content-Type", ""))
+            chunks = response.iter_content(chunk_size=16384)
+            for body, headers in iter_mjpeg_parts(chunks, boundary):
+                if self.stop_event.is_set():
+                    break
+                if not body:
+                    continue
+                frame = Frame(body)
+                with self.condition:
+                    self.frames.append(frame)
+                    self.frames_received += 1
+                    self.condition.notify_all()
+
+            if not self.stop_event.is_set():
+                print_info(f"MJPEG stream {self.stream_url} ended")
+
+
+# Shared readers, one per camera, closed once idle
+_readers = {}
+_readers_lock = threading.Lock()
+_reaper = None
+
+
+def get_stream_reader(camera_ip=CAMERA_IP, stream_url=None):
+    """Get the shared, running stream reader for a camera, starting it on first use"""
+    global _reaper
+    with _readers_lock:
+        reader = _readers.get(camera_ip)
+        if reader is None:
+            reader = MJPEGStreamReader(stream_url or stream_url_for(camera_ip))
+            _readers[camera_ip] = reader
+        reader.last_used = time.time()
+        reader.start()
+        if _reaper is None:
+            _reaper = threading.Thread(
+                target=_reap_idle_readers, name="MJPEGStreamReaper", daemon=True
+            )
+            _reaper.start()
+        return reader
+
+
+def _reap_idle_readers(idle_timeout=CAMERA_STREAM_IDLE_TIMEOUT):
+    """Close streams no session has used for idle_timeout, until none are left"""
+    global _reaper
+    while True:
+        time.sleep(max(1.0, idle_timeout / 4))
+        now = time.time()
+        with _readers_lock:
+            idle = [
+                camera_ip
+                for camera_ip, reader in _readers.items()
+                if now - reader.last_used >= idle_timeout
+            ]
+            readers = [_readers.pop(camera_ip) for camera_ip in idle]
+            done = not _readers
+            if done:
+                _reaper = None
+        for reader in readers:
+            print_info(f"Closing idle MJPEG stream {reader.stream_url}")
+            reader.stop()
+        if done:
+            return
+
+
+def stop_stream_readers():
+    """Stop every shared stream reader"""
+    with _readers_lock:
+        readers = list(_readers.values())
+        _readers.clear()
+    for reader in readers:
+        reader.stop()
@@ -1,18 +1,74 @@
 import os
+import socket
 
-# MQTT broker settings
-MQTT_BROKER = "YOUR_MQTT_BROKER_ADDRESS"  # Replace with your MQTT broker address
-MQTT_PORT = 8883
-MQTT_USER = "YOUR_MQTT_USERNAME"  # Replace with your MQTT username
-MQTT_PASSWORD = "YOUR_MQTT_PASSWORD"  # Replace with your MQTT password
-MQTT_TOPIC_SENSOR = "esp32_01/sensors/data"
-MQTT_TOPIC_VERIFIED = "esp32_01/verified/status"
+# MQTT broker settings (environment variables override the defaults, e.g. to
+# run several pipeline processes against a local Mosquitto broker)
+MQTT_BROKER = os.environ.get(
+    "MQTT_BROKER", "YOUR_MQTT_BROKER_ADDRESS"
+)  # Replace with your MQTT broker address
+MQTT_PORT = int(os.environ.get("MQTT_PORT", 8883))
+MQTT_USER = os.environ.get(
+    "MQTT_USER", "YOUR_MQTT_USERNAME"
+)  # Replace with your MQTT username
+MQTT_PASSWORD = os.environ.get(
+    "MQTT_PASSWORD", "YOUR_MQTT_PASSWORD"
+)  # Replace with your MQTT password
+MQTT_TLS_ENABLED = os.environ.get("MQTT_TLS_ENABLED", "1") == "1"
+MQTT_TOPIC_SENSOR = "+/sensors/data"  # "+" matches the device id, e.g. esp32_01
+MQTT_TOPIC_VERIFIED = "{device_id}/verified/status"
+
+# MQTT publisher settings (persistent connections for verified statuses)
+MQTT_PUBLISHER_POOL_SIZE = 2  # Number of long-lived publishing connections
+MQTT_PUBLISHER_QUEUE_SIZE = 1000  # Max queued outbound messages
+MQTT_PUBLISHER_CONNECT_TIMEOUT = 10  # Seconds to wait for a pooled connection
+MQTT_PUBLISH_QOS = 0
+
+# Cluster mode: several pipeline processes join an MQTT v5 shared subscription
+# group and split the sensor traffic. Verification sessions are claimed with
+# retained messages so only one process verifies a device at a time.
+CLUSTER_ENABLED = os.environ.get("CLUSTER_ENABLED", "0") == "1"
+CLUSTER_GROUP = os.environ.get("CLUSTER_GROUP", "fireshield-pipeline")
+CLUSTER_NODE_ID = os.environ.get(
+    "CLUSTER_NODE_ID", f"{socket.gethostname()}-{os.getpid()}"
+)
+CLUSTER_CLAIM_TOPIC = "{device_id}/verification/claim"
+CLUSTER_CLAIM_TTL_SECONDS = 120  # Claims not refreshed within this time expire
 
 # ESP32 CAM settings
 CAMERA_IP = "192.168.1.100"  # Replace with your ESP32 camera's IP address
 CAPTURE_URL = f"http://{CAMERA_IP}/capture"
 CONTROL_URL = f"http://{CAMERA_IP}/control"
 
+# Camera HTTP client settings (keep-alive connections shared by all sessions)
+CAMERA_HTTP_POOL_SIZE = 2  # Max open connections per camera
+CAMERA_CONNECT_TIMEOUT = 3  # Seconds to establish a connection
+CAMERA_READ_TIMEOUT = 10  # Seconds to wait for a response
+
+# Per-camera circuit breaker (fail fast while a camera is offline)
+CAMERA_BREAKER_FAILURE_THRESHOLD = 3  # Consecutive failures that open the circuit
+CAMERA_BREAKER_RESET_SECONDS = 30  # Open time before a /status health probe
+
+# Capture mode: "poll" requests /capture for every frame, "stream" reads the
+# camera's MJPEG /stream in the background and uses the freshest frame
+CAPTURE_MODE = os.environ.get("CAPTURE_MODE", "poll")
+CAMERA_STREAM_PORT = 81  # The firmware serves /stream on a second port
+# Per-camera stream URL overrides, e.g. a camera behind a proxy or NAT
+CAMERA_STREAM_URLS = {
+    # "192.168.1.101": "http://192.168.1.101:8081/stream",
+}
+CAMERA_STREAM_BUFFER_SIZE = 4  # Recent frames kept in the ring buffer
+CAMERA_STREAM_MAX_FRAME_AGE = 2.0  # Older frames fall back to /capture
+CAMERA_STREAM_RECONNECT_DELAY = 2  # Seconds between reconnect attempts
+CAMERA_STREAM_IDLE_TIMEOUT = 300  # Streams not used for this long are closed
+
+# Multi-camera sites: sensor device_id -> camera addresses sampled together
+# for its alerts. Devices not listed here use CAMERA_IP.
+SITE_CAMERAS = {
+    # "tower-01": ["192.168.1.100", "192.168.1.101", "192.168.1.102"],
+}
+CAMERA_CAPTURE_TIMEOUT = 15  # Per-camera limit for one frame, retries included
+CAMERA_CAPTURE_WORKERS = 8  # Threads running blocking camera fetches
+
 # ESP32 Camera framesize constants
 FRAMESIZE_UXGA = 10  # 1600x1200
 FRAMESIZE_SXGA = 9  # 1280x1024
@@ -24,6 +80,19 @@ FRAMESIZE_QVGA = 4  # 320x240
 FRAMESIZE_HQVGA = 3  # 240x176
 FRAMESIZE_QQVGA = 0  # 160x120
 
+# Pixel dimensions (width, height) for each framesize
+FRAMESIZE_DIMENSIONS = {
+    FRAMESIZE_UXGA: (1600, 1200),
+    FRAMESIZE_SXGA: (1280, 1024),
+    FRAMESIZE_XGA: (1024, 768),
+    FRAMESIZE_SVGA: (800, 600),
+    FRAMESIZE_VGA: (640, 480),
+    FRAMESIZE_CIF: (400, 296),
+    FRAMESIZE_QVGA: (320, 240),
+    FRAMESIZE_HQVGA: (240, 176),
+    FRAMESIZE_QQVGA: (160, 120),
+}
+
 # Default framesize
 DEFAULT_FRAMESIZE = FRAMESIZE_UXGA
 
@@ -33,13 +102,98 @@ IMAGE_FOLDER = os.path.join(BASE_DIR, "wildfire_images")
 
 # Capture settings
 CAPTURE_DURATION_SECONDS = 60
-CAPTURE_INTERVAL_SECONDS = 5
+CAPTURE_INTERVAL_SECONDS = 5  # Start-to-start cadence between captures
+SESSION_STAGE_QUEUE_SIZE = 4  # Frames buffered between session pipeline stages
+
+# Per-stage latency metrics, kept per camera and model over a rolling window
+LATENCY_WINDOW = 500  # Most recent samples per camera/model/stage
+LATENCY_API_ENABLED = os.environ.get("LATENCY_API_ENABLED", "0") == "1"
+LATENCY_API_PORT = int(os.environ.get("LATENCY_API_PORT", 5000))  # Serves /latency
+
+# MQTT ingestion settings (decouples the network loop from processing)
+INGEST_WORKERS = 4  # Shards (one worker each), devices are hashed onto shards
+INGEST_QUEUE_SIZE = 1000  # Max messages waiting to be processed
+INGEST_BACKPRESSURE = "coalesce"  # "coalesce" (latest per topic) or "drop_oldest"
+
+# Verification scheduler settings
+VERIFY_MAX_CONCURRENT_SESSIONS = 2  # Worker threads running verification sessions
+VERIFY_MAX_PENDING_SESSIONS = 32  # Max devices waiting for a free worker
+
+# Verification decision policy (status is published as soon as it decides)
+VERIFY_CONFIRM_FRAMES = 2  # Confirm after K positive frames...
+VERIFY_WINDOW_FRAMES = 3  # ...within the last N frames
+VERIFY_CONFIDENCE_THRESHOLD = 1.0  # Or once summed fire/smoke confidence passes this
+VERIFY_REJECT_CLEAN_FRAMES = 4  # Reject after M consecutive clean frames
+VERIFY_CONTINUE_AFTER_DECISION = True  # Keep capturing evidence after deciding
+
+# Adaptive resolution: screen at a low framesize and switch to full
+# resolution only once the detector reports a fire/smoke candidate
+VERIFY_ADAPTIVE_RESOLUTION = True
+VERIFY_SCREEN_FRAMESIZE = FRAMESIZE_SVGA  # 800x600, YOLO runs at ~640 anyway
+VERIFY_CONFIRM_FRAMESIZE = FRAMESIZE_UXGA  # Evidence and small-object confirmation
+VERIFY_CONFIRM_HOLD_FRAMES = 3  # Clean full-resolution frames before screening again
 
 # AI Detection settings
 AI_MODELS_DIR = os.path.join(BASE_DIR, "fire_models")
 AI_MODEL_PATH = os.path.join(AI_MODELS_DIR, "fire_l.pt")
 AI_CONF_THRESHOLD = 0.10
 AI_IOU_THRESHOLD = 0.10
+AI_INFERENCE_IMGSZ = 640  # Model input size, frames are letterboxed to this
+# Decode JPEGs at 1/2, 1/4 or 1/8 scale for inference when the result is still
+# at least AI_INFERENCE_IMGSZ; full resolution is decoded only for evidence
+AI_REDUCED_DECODE = True
+
+# Model runtime: "pytorch" runs the .pt weights, "onnx" (ONNX Runtime) and
+# "openvino" run an export cached next to AI_MODEL_PATH, created on first use
+AI_MODEL_FORMAT = os.environ.get("AI_MODEL_FORMAT", "pytorch")
+AI_EXPORT_IMGSZ = AI_INFERENCE_IMGSZ  # Input size baked into exported models
+AI_DETECTION_JPEG_QUALITY = 95  # Quality of annotated detection images
+
+# Model registry: load and warm the model at startup, then watch AI_MODELS_DIR
+# for new versions and swap them in between frames without a restart
+AI_MODEL_WATCH_ENABLED = True
+AI_MODEL_WATCH_PATTERN = "fire_l*.pt"  # Versions of the model, newest file wins
+AI_MODEL_WATCH_INTERVAL = 10  # Seconds between scans of AI_MODELS_DIR
+AI_MODEL_SETTLE_SECONDS = 5  # Skip files modified more recently (still copying)
+
+# Frame-difference gate: reuse a camera's last result while its scene is
+# unchanged (reused results are stored but never count as verification evidence)
+AI_FRAME_GATE_ENABLED = False
+AI_FRAME_GATE_THRESHOLD = 2.0  # Mean absolute grayscale difference (0-255)
+AI_FRAME_GATE_SIZE = (64, 48)  # Thumbnail compared between frames
+AI_FRAME_GATE_MAX_REUSE = 3  # Force inference after this many reused frames
+
+# Result cache: byte-identical JPEGs (a stuck camera resending its buffer, or
+# several sessions fetching the same frame) reuse the earlier detection and
+# stored image instead of running inference and writing the file again
+AI_RESULT_CACHE_ENABLED = True
+AI_RESULT_CACHE_SIZE = 64  # Frames remembered (least recently used evicted)
+
+# Tiled inference: overlapping full-resolution tiles (plus the whole frame) run
+# as one batch, merged with cross-tile NMS, for small distant smoke plumes
+AI_TILED_INFERENCE = False
+AI_TILE_SIZE = 640  # Tile side in full-resolution pixels
+AI_TILE_OVERLAP = 0.2  # Fraction of a tile shared with its neighbour
+AI_TILE_NMS_IOU = 0.45  # IoU above which boxes from different tiles are merged
+
+# Regions never analyzed, as (x1, y1, x2, y2) fractions of the frame; tiles
+# mostly inside them are skipped and detections centred in them are dropped
+AI_ROI_EXCLUDE = [
+    # (0.0, 0.0, 1.0, 0.3),  # e.g. sky above the horizon
+]
+AI_TILE_MIN_ROI_COVERAGE = 0.1  # Skip tiles with less of their area in the ROI
+
+# Inference service (one long-lived worker batching frames from all sessions)
+AI_BATCH_MAX_SIZE = 4  # Max frames per model.predict call
+AI_BATCH_MAX_WAIT_MS = 20  # Max time the first frame waits for the batch to fill
+AI_DETECT_TIMEOUT = 15  # Seconds a caller waits for its result
+
+# Inference backend: "thread" runs the model in this process, "process" runs
+# one model copy per worker process that is killed and respawned on timeout
+AI_INFERENCE_BACKEND = os.environ.get("AI_INFERENCE_BACKEND", "thread")
+AI_PROCESS_WORKERS = 2  # Model processes (each loads its own copy)
+AI_PROCESS_THREADS_PER_WORKER = 1  # Torch threads / pinned cores per process
+AI_PROCESS_LOAD_TIMEOUT = 60  # Seconds for a worker to load and warm up
 
 # Telegram notification settings
 TELEGRAM_TOKEN = "YOUR_TELEGRAM_BOT_TOKEN"  # Replace with your Telegram bot token
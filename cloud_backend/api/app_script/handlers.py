@@ -1,13 +1,10 @@
 import json
 import threading
-import time
 import os
 import traceback
 from datetime import datetime
-import paho.mqtt.publish as mqtt_publish
 
-from camera.capture import capture_image, capture_image_alternative
-from storage.image_storage import create_alert_folder, save_image
+from storage.image_storage import create_alert_folder
 from config import (
     CAPTURE_DURATION_SECONDS,
     CAPTURE_INTERVAL_SECONDS,
@@ -15,16 +12,22 @@ from config import (
     AI_MODEL_PATH,
     AI_CONF_THRESHOLD,
     AI_IOU_THRESHOLD,
-    FRAMESIZE_UXGA,
-    MQTT_BROKER,
-    MQTT_PORT,
-    MQTT_USER,
-    MQTT_PASSWORD,
-    MQTT_TOPIC_SENSOR,
-    MQTT_TOPIC_VERIFIED,
+    CLUSTER_ENABLED,
+    VERIFY_CONTINUE_AFTER_DECISION,
+    VERIFY_ADAPTIVE_RESOLUTION,
     TELEGRAM_ENABLED,
 )
-from ai_detection.fire_detector import FireDetector
+from ai_detection.registry import ModelRegistry
+from camera.multi_capture import get_site_cameras
+from mqtt_client.publisher import get_publisher
+from mqtt_client.ingestion import IngestionQueue
+from mqtt_client.topics import parse_device_id, verified_topic
+from verification.scheduler import VerificationScheduler
+from verification.claims import SessionClaims
+from verification.policy import DecisionPolicy, DECISION_CONFIRMED
+from verification.session import VerificationSession
+from verification.resolution import AdaptiveResolution
+from verification.sinks import StorageSink, TelegramSink
 from utils.terminal import (
     print_info,
     print_warning,
@@ -38,8 +41,10 @@ from utils.terminal import (
 # Create AI models directory
 os.makedirs(AI_MODELS_DIR, exist_ok=True)
 
-# Create FireDetector instance
-fire_detector = FireDetector(
+# Fire detector that always runs the current model version; main() starts
+# its background load and directory watch
+fire_detector = ModelRegistry(
+    models_dir=AI_MODELS_DIR,
     model_path=AI_MODEL_PATH,
     conf_threshold=AI_CONF_THRESHOLD,
     iou_threshold=AI_IOU_THRESHOLD,
@@ -51,8 +56,8 @@ capture_lock = threading.Lock()
 
 
 # Function to publish verified wildfire status
-def publish_verified_status(original_data, wildfire_detected):
-    """Publish the verified wildfire status to the MQTT verified topic"""
+def publish_verified_status(original_data, wildfire_detected, device_id):
+    """Publish the verified wildfire status to the device's MQTT verified topic"""
     try:
         # Create a deep copy of the original data and add verified status
         verified_data = original_data.copy() if original_data else {}
@@ -61,24 +66,14 @@ def publish_verified_status(original_data, wildfire_detected):
         # Convert to JSON
         payload = json.dumps(verified_data)
 
-        # Setup auth for MQTT
-        auth = {"username": MQTT_USER, "password": MQTT_PASSWORD}
-
-        # Setup TLS parameters correctly
-        tls = {"tls_version": 2, "insecure": True}  # For testing only
-
-        # Publish to the verified topic
-        mqtt_publish.single(
-            MQTT_TOPIC_VERIFIED,
-            payload=payload,
-            hostname=MQTT_BROKER,
-            port=MQTT_PORT,
-            auth=auth,
-            tls=tls,
-        )
+        # Queue on the persistent publisher instead of opening a new connection
+        topic = verified_topic(device_id)
+        # Positive statuses are never dropped from a full outbound queue
+        if not get_publisher().publish(topic, payload, keep=bool(wildfire_detected)):
+            return False
 
         print_success(
-            f"Published verified status (wildfire_detected={wildfire_detected}) to {MQTT_TOPIC_VERIFIED}"
+            f"Queued verified status (wildfire_detected={wildfire_detected}) for {topic}"
         )
         return True
     except Exception as e:
@@ -87,17 +82,46 @@ def publish_verified_status(original_data, wildfire_detected):
         return False
 
 
+def _publish_session_result(job, fire_detected, policy):
+    """Publish a session's verified status along with its frame statistics"""
+    # Use the latest sensor reading folded into this session
+    latest_payload = job.get_payload()
+    payload_with_stats = latest_payload.copy() if latest_payload else {}
+    payload_with_stats["alert_messages"] = job.alert_count
+    payload_with_stats["verification_images"] = policy.frames
+    payload_with_stats["fire_detected_images"] = policy.positives
+    payload_with_stats["detection_ratio"] = (
+        policy.positives / policy.frames if policy.frames else 0
+    )
+    payload_with_stats["decision"] = policy.decision or "timeout"
+    payload_with_stats["decision_frame"] = policy.decided_at_frame
+
+    return publish_verified_status(payload_with_stats, fire_detected, job.key)
+
+
+def _session_sinks(alert_folder, alert_id, use_ai):
+    """Build the storage and (if enabled) Telegram sinks for a session"""
+    sinks = [StorageSink(alert_folder, fire_detector if use_ai else None)]
+    if TELEGRAM_ENABLED:
+        sinks.append(TelegramSink(alert_id))
+    return sinks
+
+
 # Function to verify potential wildfire with camera and AI
-def verify_potential_wildfire(payload):
+def verify_potential_wildfire(job):
     """Verify if there's an actual wildfire by capturing multiple images over a minute and using AI detection"""
+    payload = job.get_payload()
+    state = {"published": False}
     try:
         print_info("Verifying potential wildfire with multiple images over 1 minute...")
 
         # Check if model file exists
-        if not os.path.exists(AI_MODEL_PATH):
+        if not fire_detector.has_model():
             print_warning(f"YOLO model not found at {AI_MODEL_PATH}")
             # If no model, assume sensor data is correct and forward without verification
-            publish_verified_status(payload, payload.get("potential_wildfire", False))
+            publish_verified_status(
+                payload, payload.get("potential_wildfire", False), job.key
+            )
             return
 
         # Create a folder for this verification
@@ -105,185 +129,63 @@ def verify_potential_wildfire(payload):
         alert_folder = create_alert_folder(timestamp)
         alert_id = os.path.basename(alert_folder)
 
-        # Initialize detection results tracking
-        total_images = 0
-        fire_detected_count = 0
-        fire_detected_yet = False  # Track if we've detected fire at least once
-
-        # Start capturing and processing images for 1 minute
-        end_time = time.time() + 60  # 1 minute
-        image_count = 0
-
-        print_info(f"Starting 1-minute image capture and analysis sequence...")
-
         # Preload the model
         if not fire_detector.load_model():
             print_warning("Failed to load YOLO model")
-            publish_verified_status(payload, payload.get("potential_wildfire", False))
+            publish_verified_status(
+                payload, payload.get("potential_wildfire", False), job.key
+            )
             return
 
-        while time.time() < end_time:
-            try:
-                print_info(f"Capturing image {image_count+1}...")
-
-                # Capture image
-                image_data = capture_image_alternative(framesize=FRAMESIZE_UXGA)
+        # Sequential decision policy, the verified status is published as
+        # soon as it reaches a verdict
+        policy = DecisionPolicy()
 
-                if not image_data:
-                    print_warning(
-                        f"Failed to capture image {image_count+1}, skipping..."
-                    )
-                    # Skip this iteration but continue loop
-                    continue
-
-                # Process with YOLO detection
-                try:
-                    print_info(f"Processing image {image_count+1} with YOLO...")
-                    result_img, detection_text, fire_detected, detection_info = (
-                        fire_detector.detect(image_data)
-                    )
-
-                    total_images += 1
-                    if fire_detected:
-                        fire_detected_count += 1
-                        print_alert(f"FIRE/SMOKE DETECTED in image {image_count+1}!")
-
-                        # Send Telegram notification if enabled and fire is detected
-                        if TELEGRAM_ENABLED:
-                            try:
-                                from notifications.telegram_notifier import (
-                                    send_fire_alert,
-                                    send_photo,
-                                )
-
-                                # Send initial alert only for the first fire detection
-                                if not fire_detected_yet:
-                                    send_fire_alert(alert_id, sensor_data=payload)
-                                    fire_detected_yet = True
-
-                                # Save the image with detection results
-                                detection_result = (
-                                    result_img,
-                                    detection_text,
-                                    fire_detected,
-                                    detection_info,
-                                )
-                                original_path, detection_path, metadata_path = (
-                                    save_image(
-                                        image_data,
-                                        alert_folder,
-                                        image_count,
-                                        payload,
-                                        detection_result,
-                                    )
-                                )
-
-                                # Save detection image explicitly
-                                try:
-                                    fire_detector.save_detection_image(
-                                        result_img, detection_path
-                                    )
-                                    print_success(
-                                        f"Detection image saved to {detection_path}"
-                                    )
-
-                                    # Wait briefly to ensure the file is completely written
-                                    time.sleep(1)
-
-                                    # Verify file exists and has content
-                                    if (
-                                        os.path.exists(detection_path)
-                                        and os.path.getsize(detection_path) > 0
-                                    ):
-                                        # Send the detection image
-                                        caption = f"Fire detected! Alert ID: {alert_id}, Image: {image_count+1}"
-                                        print_info(
-                                            f"Sending detection image to Telegram: {detection_path}"
-                                        )
-                                        send_result = send_photo(
-                                            detection_path, caption=caption
-                                        )
-
-                                        if not send_result:
-                                            print_warning(
-                                                f"Failed to send image to Telegram, will retry once"
-                                            )
-                                            # Retry once after a short delay
-                                            time.sleep(2)
-                                            send_photo(detection_path, caption=caption)
-                                    else:
-                                        print_error(
-                                            f"Detection image file is missing or empty: {detection_path}"
-                                        )
-                                except Exception as save_error:
-                                    print_error(
-                                        f"Error handling detection image: {save_error}"
-                                    )
-                                    import traceback
-
-                                    traceback.print_exc()
-                            except Exception as telegram_error:
-                                print_error(
-                                    f"Failed to send Telegram notification: {telegram_error}"
-                                )
-                                import traceback
-
-                                traceback.print_exc()
-
-                    # Save the image with detection results if not already saved above
-                    if not fire_detected or not TELEGRAM_ENABLED:
-                        detection_result = (
-                            result_img,
-                            detection_text,
-                            fire_detected,
-                            detection_info,
-                        )
-                        original_path, detection_path, metadata_path = save_image(
-                            image_data,
-                            alert_folder,
-                            image_count,
-                            payload,
-                            detection_result,
-                        )
-
-                    # Save detection image if available and not already saved
-                    if (
-                        detection_result
-                        and detection_result[0] is not None
-                        and (not fire_detected or not TELEGRAM_ENABLED)
-                    ):
-                        try:
-                            fire_detector.save_detection_image(
-                                detection_result[0], detection_path
-                            )
-                            print_success(f"Detection image saved to {detection_path}")
-                        except Exception as save_error:
-                            print_error(f"Error saving detection image: {save_error}")
-
-                except Exception as ai_error:
-                    print_error(
-                        f"AI detection failed for image {image_count+1}: {ai_error}"
-                    )
-
-                image_count += 1
-
-                # Add a 5-second wait after capturing and processing each image
-                remaining_time = end_time - time.time()
-                if remaining_time <= 0:
-                    break
+        def on_decision(decision, session):
+            if job.cancelled.is_set():
+                return
+            if decision == DECISION_CONFIRMED:
+                print_alert(f"WILDFIRE CONFIRMED after {policy.frames} image(s)!")
+            else:
+                print_info(
+                    f"No wildfire after {policy.frames} clean image(s), rejecting alert"
+                )
+            state["published"] = _publish_session_result(
+                job, decision == DECISION_CONFIRMED, policy
+            )
 
-                wait_time = min(5, remaining_time)  # Wait 5 seconds or until end time
-                if wait_time > 0:
-                    print_info(f"Waiting 5 seconds before next capture...")
-                    time.sleep(wait_time)
+        print_info(f"Starting 1-minute image capture and analysis sequence...")
+        session = VerificationSession(
+            name=f"Verify-{job.key}",
+            payload_source=job.get_payload,
+            detector=fire_detector,
+            policy=policy,
+            on_decision=on_decision,
+            stop_on_decision=not VERIFY_CONTINUE_AFTER_DECISION,
+            sinks=_session_sinks(alert_folder, alert_id, use_ai=True),
+            cameras=get_site_cameras(job.key),
+            resolution=AdaptiveResolution() if VERIFY_ADAPTIVE_RESOLUTION else None,
+        )
+        # Another node won the device: stop capturing and publish nothing
+        job.on_cancel = session.stop
+        if job.cancelled.is_set():
+            return
+        session.run()
+        if job.cancelled.is_set():
+            print_info(f"Verification for {job.key} handed over to another node")
+            return
 
-                # Check if we've run out of time
-                if time.time() >= end_time:
-                    break
+        total_images = policy.frames
+        fire_detected_count = policy.positives
 
-            except Exception as e:
-                print_error(f"Error processing image {image_count+1}: {e}")
-                traceback.print_exc()
+        # Status was already published when the policy reached a decision
+        if state["published"]:
+            print_separator()
+            print_info(
+                f"Verification session complete: Analyzed {total_images} images, "
+                f"fire detected in {fire_detected_count}"
+            )
+            return
 
         # Make final determination based on all images
         final_fire_detected = False
@@ -291,8 +193,8 @@ def verify_potential_wildfire(payload):
 
         if total_images > 0:
             detection_ratio = fire_detected_count / total_images
-            # If at least one image detected fire, consider it a verified wildfire
-            final_fire_detected = fire_detected_count > 0
+            # Undecided at timeout: any positive image counts as a verified wildfire
+            final_fire_detected = policy.is_fire()
 
             print_separator()
             print_info(f"Verification complete: Analyzed {total_images} images")
@@ -309,20 +211,17 @@ def verify_potential_wildfire(payload):
             # Default to sensor data if no images were processed
             final_fire_detected = payload.get("potential_wildfire", False)
 
-        # Include additional data in the verified status
-        payload_with_stats = payload.copy() if payload else {}
-        payload_with_stats["verification_images"] = total_images
-        payload_with_stats["fire_detected_images"] = fire_detected_count
-        payload_with_stats["detection_ratio"] = detection_ratio
-
-        # Publish the verified status
-        publish_verified_status(payload_with_stats, final_fire_detected)
+        # Publish the verified status with the session statistics
+        state["published"] = _publish_session_result(job, final_fire_detected, policy)
 
     except Exception as e:
         print_error(f"Error verifying potential wildfire: {e}")
         traceback.print_exc()
         # In case of error, forward the original potential_wildfire value
-        publish_verified_status(payload, payload.get("potential_wildfire", False))
+        if not state["published"] and not job.cancelled.is_set():
+            publish_verified_status(
+                payload, payload.get("potential_wildfire", False), job.key
+            )
 
 
 def capture_images_for_duration(
@@ -339,13 +238,10 @@ def capture_images_for_duration(
         active_captures += 1
 
     try:
-        end_time = time.time() + duration_seconds
-        image_count = 0
         alert_id = os.path.basename(alert_folder)
-        fire_detected_yet = False  # Track if we've detected fire in this session
 
         # Check if model file exists
-        if not os.path.exists(AI_MODEL_PATH):
+        if not fire_detector.has_model():
             print_warning(f"YOLO model not found at {AI_MODEL_PATH}")
             print_warning(
                 f"Please download a YOLOv8 model and place it in the {AI_MODELS_DIR} directory"
@@ -367,217 +263,17 @@ def capture_images_for_duration(
                 use_ai = False
                 print_warning("Fire detection will be skipped due to error")
 
-        while time.time() < end_time:
-            try:
-                print_info(f"Capturing image {image_count+1}...")
-
-                # First try with the alternative method for better reliability
-                image_data = capture_image_alternative(framesize=FRAMESIZE_UXGA)
-
-                if image_data:
-                    # Process with AI if model is available
-                    detection_result = None
-                    if use_ai:
-                        try:
-                            print_info(
-                                "Processing image with YOLO fire detection model..."
-                            )
-                            # Use a try-except block with timeout for AI detection
-                            try:
-                                (
-                                    result_img,
-                                    detection_text,
-                                    fire_detected,
-                                    detection_info,
-                                ) = fire_detector.detect(image_data)
-
-                                if result_img is not None:
-                                    print_info(f"Detection result: {detection_text}")
-                                    if fire_detected:
-                                        print_alert("FIRE/SMOKE DETECTED IN IMAGE!")
-
-                                        # Send Telegram notification if enabled and fire is detected
-                                        if TELEGRAM_ENABLED:
-                                            try:
-                                                from notifications.telegram_notifier import (
-                                                    send_fire_alert,
-                                                    send_photo,
-                                                )
-
-                                                # Send initial alert only for the first fire detection
-                                                if not fire_detected_yet:
-                                                    send_fire_alert(
-                                                        alert_id, sensor_data=payload
-                                                    )
-                                                    fire_detected_yet = True
-
-                                                # Save the image with detection results
-                                                detection_result = (
-                                                    result_img,
-                                                    detection_text,
-                                                    fire_detected,
-                                                    detection_info,
-                                                )
-                                                (
-                                                    original_path,
-                                                    detection_path,
-                                                    metadata_path,
-                                                ) = save_image(
-                                                    image_data,
-                                                    alert_folder,
-                                                    image_count,
-                                                    payload,
-                                                    detection_result,
-                                                )
-
-                                                # Save detection image explicitly
-                                                if result_img is not None:
-                                                    try:
-                                                        fire_detector.save_detection_image(
-                                                            result_img, detection_path
-                                                        )
-                                                        print_success(
-                                                            f"Detection image saved to {detection_path}"
-                                                        )
-
-                                                        # Wait briefly to ensure the file is completely written
-                                                        time.sleep(1)
-
-                                                        # Verify file exists and has content
-                                                        if (
-                                                            os.path.exists(
-                                                                detection_path
-                                                            )
-                                                            and os.path.getsize(
-                                                                detection_path
-                                                            )
-                                                            > 0
-                                                        ):
-                                                            # Send the detection image to Telegram
-                                                            caption = f"Fire detected! Alert ID: {alert_id}, Image: {image_count+1}"
-                                                            print_info(
-                                                                f"Sending detection image to Telegram: {detection_path}"
-                                                            )
-                                                            send_result = send_photo(
-                                                                detection_path,
-                                                                caption=caption,
-                                                            )
-
-                                                            if not send_result:
-                                                                print_warning(
-                                                                    f"Failed to send image to Telegram, will retry once"
-                                                                )
-                                                                # Retry once after a short delay
-                                                                time.sleep(2)
-                                                                send_photo(
-                                                                    detection_path,
-                                                                    caption=caption,
-                                                                )
-                                                        else:
-                                                            print_error(
-                                                                f"Detection image file is missing or empty: {detection_path}"
-                                                            )
-                                                    except Exception as save_error:
-                                                        print_error(
-                                                            f"Error handling detection image: {save_error}"
-                                                        )
-                                                        import traceback
-
-                                                        traceback.print_exc()
-
-                                            except Exception as telegram_error:
-                                                print_error(
-                                                    f"Failed to send Telegram notification: {telegram_error}"
-                                                )
-                                                import traceback
-
-                                                traceback.print_exc()
-
-                                                # Still save the image without sending to Telegram
-                                                detection_result = (
-                                                    result_img,
-                                                    detection_text,
-                                                    fire_detected,
-                                                    detection_info,
-                                                )
-                                    else:
-                                        detection_result = (
-                                            result_img,
-                                            detection_text,
-                                            fire_detected,
-                                            detection_info,
-                                        )
-
-                            except Exception as ai_error:
-                                print_error(f"AI detection failed: {ai_error}")
-                                # Continue without AI detection
-                        except Exception as outer_e:
-                            print_error(f"Error during image detection: {outer_e}")
-                            traceback.print_exc()
-                            # Continue without AI detection
-
-                    # Save images if not already saved above (non-fire or Telegram disabled)
-                    if not (fire_detected and TELEGRAM_ENABLED and detection_result):
-                        try:
-                            original_path, detection_path, metadata_path = save_image(
-                                image_data,
-                                alert_folder,
-                                image_count,
-                                payload,
-                                detection_result,
-                            )
-
-                            # Save detection image if available
-                            if detection_result and detection_result[0] is not None:
-                                try:
-                                    fire_detector.save_detection_image(
-                                        detection_result[0], detection_path
-                                    )
-                                    print_success(
-                                        f"Detection image saved to {detection_path}"
-                                    )
-                                except Exception as save_error:
-                                    print_error(
-                                        f"Error saving detection image: {save_error}"
-                                    )
-                        except Exception as e:
-                            print_error(f"Error saving image: {e}")
-                            traceback.print_exc()
-
-                    image_count += 1
-                else:
-                    print_warning("Failed to capture image, skipping this iteration")
-
-            except Exception as e:
-                print_error(f"Error in capture loop: {e}")
-                traceback.print_exc()
-
-            # Explicitly call garbage collection to free memory
-            try:
-                import gc
-
-                gc.collect()
-            except:
-                pass
-
-            # Add a 5-second wait after capturing and processing each image
-            remaining_time = end_time - time.time()
-            if remaining_time <= 0:
-                break
-
-            wait_time = min(5, remaining_time)  # Wait 5 seconds or until end time
-            if wait_time > 0:
-                print_info(f"Waiting 5 seconds before next capture...")
-                time.sleep(wait_time)
-
-            # Check if we've run out of time
-            if time.time() >= end_time:
-                break
+        session = VerificationSession(
+            name="Capture",
+            payload_source=lambda: payload,
+            duration_seconds=duration_seconds,
+            interval_seconds=interval_seconds,
+            detector=fire_detector if use_ai else None,
+            sinks=_session_sinks(alert_folder, alert_id, use_ai),
+        ).run()
 
         # Show completion banner
-        completion_message = (
-            f"CAPTURE COMPLETE: {image_count} images captured for alert {alert_id}"
-        )
+        completion_message = f"CAPTURE COMPLETE: {session.frames_captured} images captured for alert {alert_id}"
         print_completion_banner(completion_message)
         print_info(f"The system remains active and listening for new alerts")
         print_separator()
@@ -591,40 +287,82 @@ def capture_images_for_duration(
             active_captures -= 1
 
 
-def on_message(client, userdata, msg):
-    """Handler for MQTT messages"""
+def _alert_priority(payload):
+    """Scheduling priority for an alert, higher smoke readings are verified first"""
     try:
+        return -float(payload.get("smoke", 0))
+    except (TypeError, ValueError):
+        return 0
+
+
+# In cluster mode, verification sessions are claimed across all pipeline processes
+cluster_claims = SessionClaims() if CLUSTER_ENABLED else None
+
+# Scheduler running verification sessions on a bounded worker pool
+verification_scheduler = VerificationScheduler(
+    verify_potential_wildfire, claims=cluster_claims
+)
+
+
+def process_message(topic, raw_payload):
+    """Decode and route an MQTT message, called from the ingestion workers"""
+    try:
+        # Track verification claims published by other pipeline processes
+        if cluster_claims is not None and cluster_claims.is_claim_topic(topic):
+            cluster_claims.handle_message(topic, raw_payload)
+            return
+
         # Parse the MQTT message
-        payload = json.loads(msg.payload.decode())
+        payload = json.loads(raw_payload.decode())
 
-        # Process messages from the sensor data topic
-        if msg.topic == MQTT_TOPIC_SENSOR:
-            print_info(f"Sensor data received: {payload}")
+        # Process messages from any device's sensor data topic
+        device_id = parse_device_id(topic)
+        if device_id is not None:
+            print_info(f"Sensor data received from {device_id}: {payload}")
 
             # Check if potential_wildfire flag is true
             if payload.get("potential_wildfire", False):
                 print_alert("Potential wildfire detected by sensors!")
                 print_separator()
 
-                # Verify with camera and AI in a separate thread
-                verify_thread = threading.Thread(
-                    target=verify_potential_wildfire,
-                    args=(payload,),
-                    name=f"Verify-{datetime.now().strftime('%H%M%S')}",
+                # Verify with camera and AI on the scheduler's worker pool,
+                # folding repeated alerts into the device's existing session;
+                # devices sharing a camera are verified one after another
+                status = verification_scheduler.submit(
+                    device_id,
+                    payload,
+                    priority=_alert_priority(payload),
+                    resources=get_site_cameras(device_id),
                 )
-                verify_thread.start()
-                print_info("Started wildfire verification process")
+                if status == "queued":
+                    print_info(f"Scheduled wildfire verification for {device_id}")
+                elif status == "folded":
+                    print_info(
+                        f"Verification already in progress for {device_id}, alert folded into session"
+                    )
             else:
                 # No potential wildfire, just forward the data
                 print_info("No potential wildfire detected, forwarding data")
-                publish_verified_status(payload, False)
+                publish_verified_status(payload, False, device_id)
 
     except Exception as e:
         print_error(f"Error processing MQTT message: {e}")
         traceback.print_exc()
 
 
+# Bounded queue decoupling the paho network loop from message processing,
+# sharded by device so each device's readings are handled in order
+ingestion_queue = IngestionQueue(process_message, key_func=parse_device_id)
+
+
+def on_message(client, userdata, msg):
+    """Handler for MQTT messages, runs on the paho network thread"""
+    # Only enqueue here so a slow message never stalls inbound traffic
+    ingestion_queue.put(msg.topic, msg.payload)
+
+
 def get_active_captures():
-    """Get the number of active capture sessions"""
+    """Get the number of active capture and verification sessions"""
     with capture_lock:
-        return active_captures
+        captures = active_captures
+    return captures + verification_scheduler.get_active_count()
@@ -4,7 +4,15 @@ import signal
 import sys
 import threading
 from mqtt_client.client import setup_mqtt
-from handlers import on_message, get_active_captures
+from mqtt_client.publisher import get_publisher, stop_publisher
+from camera.stream import stop_stream_readers
+from handlers import (
+    on_message,
+    get_active_captures,
+    verification_scheduler,
+    ingestion_queue,
+    fire_detector,
+)
 from config import (
     IMAGE_FOLDER,
     AI_MODELS_DIR,
@@ -12,6 +20,8 @@ from config import (
     TELEGRAM_ENABLED,
     TELEGRAM_CHAT_ID,
     TELEGRAM_TOKEN,
+    LATENCY_API_ENABLED,
+    LATENCY_API_PORT,
 )
 from utils.terminal import (
     print_header,
@@ -38,6 +48,29 @@ def heartbeat():
         if active_sessions > 0:
             status_msg += f" with {active_sessions} active capture session(s)"
         print_info(status_msg)
+
+        ingest = ingestion_queue.get_stats()
+        print_info(
+            f"Ingestion queue depth {ingest['depth']}/{ingest['capacity']} "
+            f"(max {ingest['max_depth']}), processed {ingest['processed']}, "
+            f"coalesced {ingest['coalesced']}, dropped {ingest['dropped']}, "
+            f"avg wait {ingest['avg_wait_ms']:.1f} ms"
+        )
+
+        gate = fire_detector.get_gate_stats()
+        if gate is not None:
+            print_info(
+                f"Frame gate: {gate['inferred']} inferred, {gate['skipped']} skipped "
+                f"({gate['skip_ratio']*100:.0f}% saved)"
+            )
+
+        cache = fire_detector.get_cache_stats()
+        if cache is not None and cache["hits"] + cache["misses"]:
+            print_info(
+                f"Result cache: {cache['hits']} hits, {cache['misses']} misses "
+                f"({cache['hit_ratio']*100:.0f}% hit rate), "
+                f"{cache['file_reuses']} stored file(s) reused"
+            )
         time.sleep(heartbeat_interval)
 
 
@@ -105,6 +138,25 @@ def main():
     else:
         print_info(f"YOLO model found at {AI_MODEL_PATH}")
 
+    # Load and warm the model in the background so the first alert doesn't
+    # wait for it, and pick up new model versions without a restart
+    fire_detector.start()
+
+    # Serve per-stage latency metrics (and the prediction API) from this process
+    if LATENCY_API_ENABLED:
+        try:
+            from api_server import start_api_server
+
+            start_api_server(host="0.0.0.0", port=LATENCY_API_PORT)
+        except Exception as e:
+            print_error(f"Failed to start API server: {e}")
+
+    # Start the persistent publisher for verified statuses
+    get_publisher()
+
+    # Start the ingestion workers before messages start arriving
+    ingestion_queue.start()
+
     # Setup MQTT client with our message handler
     mqtt_client = setup_mqtt(on_message)
 
@@ -131,6 +183,8 @@ def main():
             )
         while get_active_captures() > 0:
             time.sleep(1)
+        # Let the verification workers drain any queued sessions and exit
+        verification_scheduler.stop()
         print_info("All capture sessions have completed")
     except Exception as e:
         print_error(f"Error in main loop: {e}")
@@ -147,6 +201,30 @@ def main():
         except Exception as e:
             print_error(f"Error stopping MQTT client: {e}")
 
+        # Process messages already received before closing the publisher
+        try:
+            ingestion_queue.stop()
+        except Exception as e:
+            print_error(f"Error stopping ingestion queue: {e}")
+
+        # Flush pending verified statuses and close pooled connections
+        try:
+            stop_publisher()
+        except Exception as e:
+            print_error(f"Error stopping MQTT publisher: {e}")
+
+        # Stop watching for model versions and free the model
+        try:
+            fire_detector.stop()
+        except Exception as e:
+            print_error(f"Error stopping model registry: {e}")
+
+        # Close camera MJPEG streams
+        try:
+            stop_stream_readers()
+        except Exception as e:
+            print_error(f"Error stopping camera streams: {e}")
+
         print_success("Shutdown complete")
 
 
@@ -6,17 +6,35 @@ from config import (
     MQTT_PORT,
     MQTT_USER,
     MQTT_PASSWORD,
+    MQTT_TLS_ENABLED,
     MQTT_TOPIC_SENSOR,
+    CLUSTER_ENABLED,
+    CLUSTER_GROUP,
+    CLUSTER_CLAIM_TOPIC,
 )
 from utils.terminal import print_info, print_error, print_success, print_warning
 
 
-def on_connect(client, userdata, flags, rc):
+def get_subscriptions():
+    """Get the topic filters the pipeline subscribes to"""
+    if not CLUSTER_ENABLED:
+        return [MQTT_TOPIC_SENSOR]
+
+    return [
+        # Sensor traffic is split across the members of the shared group
+        f"$share/{CLUSTER_GROUP}/{MQTT_TOPIC_SENSOR}",
+        # Every member sees every verification claim
+        CLUSTER_CLAIM_TOPIC.format(device_id="+"),
+    ]
+
+
+def on_connect(client, userdata, flags, rc, properties=None):
     if rc == 0:
         print_success(f"Connected to MQTT broker successfully")
-        # Subscribe to sensor data topic
-        client.subscribe(MQTT_TOPIC_SENSOR)
-        print_info(f"Subscribed to {MQTT_TOPIC_SENSOR}")
+        # Subscribe to sensor data (and, in cluster mode, claim) topics
+        for topic in get_subscriptions():
+            client.subscribe(topic)
+            print_info(f"Subscribed to {topic}")
     else:
         print_error(f"Failed to connect to MQTT broker with result code {rc}")
 
@@ -25,35 +43,47 @@ def on_connect_fail(client, userdata):
     print_error(f"Connection failed: Check broker address and credentials")
 
 
-def setup_mqtt(message_callback):
-    """Setup MQTT client with the specified message callback"""
+def create_client(client_id_prefix="python-mqtt", protocol=mqtt.MQTTv311):
+    """Create an MQTT client configured with the broker credentials and TLS settings"""
     # Create a client with a unique ID to avoid broker connection conflicts
-    client_id = f"python-mqtt-{uuid.uuid4().hex}"
-    client = mqtt.Client(client_id=client_id, protocol=mqtt.MQTTv311, transport="tcp")
+    client_id = f"{client_id_prefix}-{uuid.uuid4().hex}"
+    client = mqtt.Client(client_id=client_id, protocol=protocol, transport="tcp")
 
     # Set username and password
     client.username_pw_set(MQTT_USER, MQTT_PASSWORD)
 
-    # Configure TLS with appropriate settings
-    client.tls_set(
-        certfile=None,
-        keyfile=None,
-        cert_reqs=ssl.CERT_REQUIRED,
-        tls_version=ssl.PROTOCOL_TLS,
-        ciphers=None,
-    )
+    if MQTT_TLS_ENABLED:
+        # Configure TLS with appropriate settings
+        client.tls_set(
+            certfile=None,
+            keyfile=None,
+            cert_reqs=ssl.CERT_REQUIRED,
+            tls_version=ssl.PROTOCOL_TLS,
+            ciphers=None,
+        )
 
-    # For testing: disable certificate verification if needed
-    # Remove this in production when using proper certificates
-    client.tls_insecure_set(True)
+        # For testing: disable certificate verification if needed
+        # Remove this in production when using proper certificates
+        client.tls_insecure_set(True)
+
+    client.on_connect_fail = on_connect_fail
+    return client
+
+
+def setup_mqtt(message_callback):
+    """Setup MQTT client with the specified message callback"""
+    # Shared subscriptions are an MQTT v5 feature
+    protocol = mqtt.MQTTv5 if CLUSTER_ENABLED else mqtt.MQTTv311
+    client = create_client(protocol=protocol)
 
     # Set callbacks
     client.on_connect = on_connect
     client.on_message = message_callback
-    client.on_connect_fail = on_connect_fail
 
     # Connect to broker
     print_info(f"Connecting to MQTT broker at {MQTT_BROKER}:{MQTT_PORT}")
+    if CLUSTER_ENABLED:
+        print_info(f"Cluster mode enabled, joining shared group '{CLUSTER_GROUP}'")
     try:
         client.connect(MQTT_BROKER, MQTT_PORT, 60)
         print_info("Connection attempt initiated")
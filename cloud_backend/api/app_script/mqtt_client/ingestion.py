@@ -0,0 +1,237 @@
+import itertools
+import re
+import threading
+import time
+import traceback
+import zlib
+from collections import OrderedDict
+from config import INGEST_WORKERS, INGEST_QUEUE_SIZE, INGEST_BACKPRESSURE
+from utils.terminal import print_info, print_error, print_warning
+
+# Matched on the raw bytes so the MQTT callback never decodes JSON
+_ALERT_PATTERN = re.compile(rb'"potential_wildfire"\s*:\s*true')
+
+
+def _is_alert(payload):
+    """Check whether a raw sensor payload has potential_wildfire set"""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    return bool(payload) and _ALERT_PATTERN.search(payload) is not None
+
+
+class _Shard:
+    """One bounded queue drained by a single worker, preserving message order"""
+
+    def __init__(self, index, handler, max_size, policy):
+        self.index = index
+        self.handler = handler
+        self.max_size = max_size
+        self.policy = policy
+        self.pending = OrderedDict()  # key -> (topic, payload, enqueued_at, alert)
+        self.sequence = itertools.count()
+        self.condition = threading.Condition()
+        self.worker = None
+        self.running = False
+
+        # Metrics
+        self.enqueued = 0
+        self.processed = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.total_wait = 0.0
+
+    def start(self):
+        with self.condition:
+            self.running = True
+        self.worker = threading.Thread(
+            target=self._run, name=f"Ingest-{self.index}", daemon=True
+        )
+        self.worker.start()
+
+    def stop(self, timeout):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.worker is not None:
+            self.worker.join(timeout)
+            self.worker = None
+
+    def put(self, topic, payload):
+        # Classified before taking the lock, and only when coalescing needs it
+        alert = self.policy == "coalesce" and _is_alert(payload)
+        with self.condition:
+            self.enqueued += 1
+
+            if self.policy == "coalesce":
+                key = topic
+                if key in self.pending:
+                    # Keep the queue position but carry the newest reading,
+                    # unless that would replace a pending alert with a
+                    # normal reading and lose the alert
+                    _, _, enqueued_at, pending_alert = self.pending[key]
+                    if alert or not pending_alert:
+                        self.pending[key] = (topic, payload, enqueued_at, alert)
+                    self.coalesced += 1
+                    return
+            else:
+                key = next(self.sequence)
+
+            if len(self.pending) >= self.max_size:
+                self.pending.popitem(last=False)
+                self.dropped += 1
+                if self.dropped % 100 == 1:
+                    print_warning(
+                        f"Ingestion shard {self.index} full, dropped oldest message "
+                        f"({self.dropped} dropped so far)"
+                    )
+
+            self.pending[key] = (topic, payload, time.time(), alert)
+            self.max_depth = max(self.max_depth, len(self.pending))
+            self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.pending and self.running:
+                    self.condition.wait()
+                if not self.pending:
+                    break
+                _, (topic, payload, enqueued_at, _) = self.pending.popitem(last=False)
+
+            wait = time.time() - enqueued_at
+            try:
+                self.handler(topic, payload)
+                ok = True
+            except Exception as e:
+                print_error(f"Error processing message from {topic}: {e}")
+                traceback.print_exc()
+                ok = False
+
+            with self.condition:
+                self.processed += 1
+                self.total_wait += wait
+                if not ok:
+                    self.failed += 1
+
+
+class IngestionQueue:
+    """
+    Bounded, sharded queue between the paho network loop and message processing
+
+    The MQTT callback only calls put(), which stores the raw topic and
+    payload and returns immediately. Messages are hashed by device key onto
+    a fixed set of shards, each drained by one worker thread, so messages
+    from one device are handled in order while different devices are
+    processed in parallel.
+
+    Backpressure policies (applied per shard):
+        "coalesce": a newer message for a topic replaces the one still
+            pending for that topic, so each device has at most one queued
+            reading; a pending potential_wildfire alert is only replaced by
+            a newer alert, never by a normal reading; when full, the oldest
+            pending message is dropped
+        "drop_oldest": every message is queued; when full, the oldest
+            pending message is dropped
+    """
+
+    def __init__(
+        self,
+        handler,
+        workers=INGEST_WORKERS,
+        max_size=INGEST_QUEUE_SIZE,
+        policy=INGEST_BACKPRESSURE,
+        key_func=None,
+    ):
+        if policy not in ("coalesce", "drop_oldest"):
+            raise ValueError(f"Unknown ingestion backpressure policy: {policy}")
+
+        self.num_workers = max(1, workers)
+        self.max_size = max(1, max_size)
+        self.policy = policy
+        self.key_func = key_func
+        self.lock = threading.Lock()
+        self.running = False
+
+        shard_size = max(1, -(-self.max_size // self.num_workers))
+        self.shards = [
+            _Shard(index, handler, shard_size, policy)
+            for index in range(self.num_workers)
+        ]
+
+    def start(self):
+        """Start one worker per shard"""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+
+        for shard in self.shards:
+            shard.start()
+
+        print_info(
+            f"Ingestion queue started with {self.num_workers} shard(s), "
+            f"capacity {self.max_size}, policy '{self.policy}'"
+        )
+
+    def stop(self, timeout=5):
+        """Stop the workers after the pending messages have been processed"""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+
+        for shard in self.shards:
+            shard.stop(timeout)
+
+    def shard_for(self, key):
+        """Get the shard index for a device key (stable across restarts)"""
+        return zlib.crc32(str(key).encode()) % self.num_workers
+
+    def put(self, topic, payload):
+        """Enqueue a raw MQTT message without decoding it"""
+        if not self.running:
+            self.start()
+
+        key = self.key_func(topic) if self.key_func else topic
+        if key is None:
+            key = topic
+        self.shards[self.shard_for(key)].put(topic, payload)
+
+    def get_depth(self):
+        """Get the number of messages waiting to be processed"""
+        return sum(len(shard.pending) for shard in self.shards)
+
+    def get_stats(self):
+        """Get queue depth and throughput counters aggregated over all shards"""
+        stats = {
+            "depth": 0,
+            "max_depth": 0,
+            "capacity": self.max_size,
+            "enqueued": 0,
+            "processed": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "failed": 0,
+            "shard_depths": [],
+        }
+        total_wait = 0.0
+
+        for shard in self.shards:
+            with shard.condition:
+                depth = len(shard.pending)
+                stats["depth"] += depth
+                stats["shard_depths"].append(depth)
+                stats["max_depth"] = max(stats["max_depth"], shard.max_depth)
+                stats["enqueued"] += shard.enqueued
+                stats["processed"] += shard.processed
+                stats["coalesced"] += shard.coalesced
+                stats["dropped"] += shard.dropped
+                stats["failed"] += shard.failed
+                total_wait += shard.total_wait
+
+        stats["avg_wait_ms"] = (
+            total_wait / stats["processed"] * 1000 if stats["processed"] else 0.0
+        )
+        return stats
@@ -0,0 +1,273 @@
+import threading
+import traceback
+import zlib
+from collections import deque
+import paho.mqtt.client as mqtt
+from config import (
+    MQTT_BROKER,
+    MQTT_PORT,
+    MQTT_PUBLISHER_POOL_SIZE,
+    MQTT_PUBLISHER_QUEUE_SIZE,
+    MQTT_PUBLISHER_CONNECT_TIMEOUT,
+    MQTT_PUBLISH_QOS,
+)
+from mqtt_client.client import create_client
+from utils.terminal import print_info, print_error, print_success, print_warning
+
+
+class _Outbound:
+    """Bounded outbound queue that sheds routine messages before kept ones"""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = deque()  # (message, keep), None once closed
+        self.condition = threading.Condition()
+
+    def put(self, message, keep=False):
+        """
+        Queue a message, dropping the oldest routine message if full
+
+        Kept messages are never dropped: when only kept messages are queued,
+        a new routine message is refused and a new kept one is still queued.
+
+        Returns:
+            tuple: (queued, dropped) with the number of older messages dropped
+        """
+        with self.condition:
+            dropped = 0
+            if len(self.items) >= self.max_size:
+                for index, (_, queued_keep) in enumerate(self.items):
+                    if not queued_keep:
+                        del self.items[index]
+                        dropped = 1
+                        break
+                else:
+                    if not keep:
+                        return False, 0
+            self.items.append((message, keep))
+            self.condition.notify()
+            return True, dropped
+
+    def close(self):
+        """Queue the stop sentinel behind pending messages, never blocking"""
+        with self.condition:
+            self.items.append((None, True))
+            self.condition.notify()
+
+    def get(self):
+        """Wait for the next message, None once closed"""
+        with self.condition:
+            while not self.items:
+                self.condition.wait()
+            message, _ = self.items.popleft()
+            return message
+
+    def qsize(self):
+        with self.condition:
+            return len(self.items)
+
+
+class MQTTPublisher:
+    """
+    Long-lived pool of connected MQTT clients, each with its own outbound queue
+
+    Messages are routed to a connection by topic hash, so messages for the
+    same topic are always published in the order they were queued. When a
+    queue is full the oldest routine message is dropped; messages queued
+    with keep=True (positive wildfire statuses) are never dropped.
+    """
+
+    def __init__(
+        self,
+        pool_size=MQTT_PUBLISHER_POOL_SIZE,
+        queue_size=MQTT_PUBLISHER_QUEUE_SIZE,
+        connect_timeout=MQTT_PUBLISHER_CONNECT_TIMEOUT,
+    ):
+        self.pool_size = max(1, pool_size)
+        self.connect_timeout = connect_timeout
+        self.queue_size = max(1, -(-queue_size // self.pool_size))
+        self.queues = []
+        self.clients = []
+        self.workers = []
+        self.running = False
+        self.lock = threading.Lock()
+
+        # Counters for monitoring the outbound path
+        self.published = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def start(self):
+        """Connect the client pool and start one sender thread per client"""
+        with self.lock:
+            if self.running:
+                return
+            self.running = True
+
+        for index in range(self.pool_size):
+            connected = threading.Event()
+            client = create_client(client_id_prefix=f"python-mqtt-pub{index}")
+            client.user_data_set(connected)
+            client.on_connect = self._on_connect
+            client.on_disconnect = self._on_disconnect
+
+            try:
+                # connect_async lets the network loop own (re)connection
+                client.connect_async(MQTT_BROKER, MQTT_PORT, 60)
+                client.loop_start()
+            except Exception as e:
+                print_error(f"Publisher connection error: {e}")
+
+            outbound = _Outbound(self.queue_size)
+            worker = threading.Thread(
+                target=self._sender,
+                args=(client, connected, outbound),
+                name=f"MQTTPublisher-{index}",
+            )
+            worker.daemon = True
+            worker.start()
+
+            self.clients.append(client)
+            self.queues.append(outbound)
+            self.workers.append(worker)
+
+        print_info(f"MQTT publisher started with {self.pool_size} connection(s)")
+
+    def stop(self, timeout=5):
+        """Flush queued messages, then disconnect every pooled client"""
+        with self.lock:
+            if not self.running:
+                return
+            self.running = False
+
+        # One sentinel per worker, queued behind any pending messages
+        for outbound in self.queues:
+            outbound.close()
+        for worker in self.workers:
+            worker.join(timeout)
+
+        for client in self.clients:
+            try:
+                client.loop_stop()
+                client.disconnect()
+            except Exception as e:
+                print_error(f"Error stopping publisher client: {e}")
+
+        self.clients = []
+        self.queues = []
+        self.workers = []
+        print_success("MQTT publisher stopped")
+
+    def publish(self, topic, payload, qos=MQTT_PUBLISH_QOS, retain=False, keep=False):
+        """
+        Queue a message for publishing on a warm connection
+
+        Args:
+            topic: Destination topic
+            payload: Message payload (str or bytes)
+            qos: MQTT quality of service level
+            retain: Whether the broker should retain the message
+            keep: Never drop this message when the queue is full
+
+        Returns:
+            bool: True if the message was queued, False otherwise
+        """
+        if not self.running:
+            print_error("MQTT publisher is not running")
+            return False
+
+        message = (topic, payload, qos, retain)
+        outbound = self.queues[zlib.crc32(topic.encode()) % len(self.queues)]
+        # A full queue drops its oldest routine message so fresh statuses
+        # still go out
+        queued, dropped = outbound.put(message, keep=keep)
+        if not queued:
+            dropped += 1
+        if dropped:
+            with self.lock:
+                self.dropped += dropped
+        if not queued:
+            print_warning(f"Outbound MQTT queue full, dropped message for {topic}")
+            return False
+        return True
+
+    def get_stats(self):
+        """Get publisher counters and current queue depth"""
+        with self.lock:
+            return {
+                "connections": len(self.clients),
+                "connected": sum(1 for c in self.clients if c.is_connected()),
+                "queue_depth": sum(q.qsize() for q in self.queues),
+                "published": self.published,
+                "failed": self.failed,
+                "dropped": self.dropped,
+            }
+
+    def _on_connect(self, client, connected, flags, rc):
+        if rc == 0:
+            connected.set()
+        else:
+            print_error(f"Publisher failed to connect with result code {rc}")
+
+    def _on_disconnect(self, client, connected, rc):
+        connected.clear()
+        if rc != 0 and self.running:
+            print_warning(
+                f"Publisher disconnected unexpectedly (rc={rc}), reconnecting"
+            )
+
+    def _sender(self, client, connected, outbound):
+        """Worker loop publishing queued messages on one pooled client"""
+        while True:
+            message = outbound.get()
+            if message is None:
+                break
+
+            topic, payload, qos, retain = message
+            try:
+                if not connected.wait(self.connect_timeout):
+                    print_error(
+                        f"Publisher not connected after {self.connect_timeout}s, dropping message for {topic}"
+                    )
+                    with self.lock:
+                        self.failed += 1
+                    continue
+
+                info = client.publish(topic, payload=payload, qos=qos, retain=retain)
+                if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                    print_error(
+                        f"Failed to publish to {topic}: {mqtt.error_string(info.rc)}"
+                    )
+                    with self.lock:
+                        self.failed += 1
+                else:
+                    with self.lock:
+                        self.published += 1
+            except Exception as e:
+                print_error(f"Error publishing to {topic}: {e}")
+                traceback.print_exc()
+                with self.lock:
+                    self.failed += 1
+
+
+# Shared publisher instance
+_publisher = None
+_publisher_lock = threading.Lock()
+
+
+def get_publisher():
+    """Get the shared MQTT publisher, starting it on first use"""
+    global _publisher
+    with _publisher_lock:
+        # Started once: a publisher stopped at shutdown stays stopped
+        if _publisher is None:
+            _publisher = MQTTPublisher()
+            _publisher.start()
+        return _publisher
+
+
+def stop_publisher():
+    """Stop the shared MQTT publisher if it was started"""
+    with _publisher_lock:
+        if _publisher is not None:
+            _publisher.stop()
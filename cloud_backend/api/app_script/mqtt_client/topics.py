@@ -0,0 +1,28 @@
+import paho.mqtt.client as mqtt
+from config import MQTT_TOPIC_SENSOR, MQTT_TOPIC_VERIFIED
+
+
+def parse_device_id(topic, pattern=MQTT_TOPIC_SENSOR):
+    """
+    Extract the device id from a topic matching a single-level wildcard pattern
+
+    Args:
+        topic: Topic the message was received on, e.g. "esp32_01/sensors/data"
+        pattern: Subscription pattern with a "+" in the device position
+
+    Returns:
+        str: Device id, or None if the topic does not match the pattern
+    """
+    if not mqtt.topic_matches_sub(pattern, topic):
+        return None
+
+    levels = pattern.split("/")
+    if "+" not in levels:
+        # Fixed topic: fall back to the first level as the device id
+        return topic.split("/")[0]
+    return topic.split("/")[levels.index("+")]
+
+
+def verified_topic(device_id):
+    """Get the verified status topic for a device"""
+    return MQTT_TOPIC_VERIFIED.format(device_id=device_id)
@@ -53,71 +53,87 @@ def send_message(message):
         return False
 
 
-def send_photo(photo_path, caption=None):
-    """Send a photo to Telegram using the HTTP API directly"""
+def send_photo(photo, caption=None, filename=None):
+    """
+    Send a photo to Telegram using the HTTP API directly
+
+    Args:
+        photo: Path to a JPEG file, or JPEG bytes already in memory
+        caption: Optional caption
+        filename: Name shown for in-memory photos (default: photo.jpg)
+    """
     if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID:
         print_error("Telegram not initialized. Call initialize_telegram first.")
         return False
 
-    # Verify the file exists
-    if not os.path.exists(photo_path):
-        print_error(f"Photo file does not exist: {photo_path}")
-        return False
+    if isinstance(photo, (bytes, bytearray)):
+        # Already encoded (e.g. shared with disk storage), no file round trip
+        photo_data = bytes(photo)
+        photo_name = filename or "photo.jpg"
+        if not photo_data:
+            print_error("Photo data is empty (0 bytes)")
+            return False
+        print_info(f"Photo size: {len(photo_data)} bytes")
+    else:
+        photo_path = photo
+        photo_name = os.path.basename(photo_path)
 
-    # Check file size
-    try:
-        file_size = os.path.getsize(photo_path)
-        if file_size == 0:
-            print_error(f"Photo file is empty (0 bytes): {photo_path}")
+        # Verify the file exists
+        if not os.path.exists(photo_path):
+            print_error(f"Photo file does not exist: {photo_path}")
+            return False
+
+        # Check file size
+        try:
+            file_size = os.path.getsize(photo_path)
+            if file_size == 0:
+                print_error(f"Photo file is empty (0 bytes): {photo_path}")
+                return False
+            print_info(f"Photo file size: {file_size} bytes")
+        except Exception as e:
+            print_error(f"Error checking file size: {e}")
+
+        # Wait a moment to ensure file is completely written
+        time.sleep(0.5)
+
+        # Use with statement to properly handle file closing
+        try:
+            with open(photo_path, "rb") as photo_file:
+                # Read the file data into memory
+                photo_data = photo_file.read()
+        except Exception as e:
+            print_error(f"Error reading photo file: {e}")
             return False
-        print_info(f"Photo file size: {file_size} bytes")
-    except Exception as e:
-        print_error(f"Error checking file size: {e}")
 
-    # Wait a moment to ensure file is completely written
-    time.sleep(0.5)
+        if not photo_data:
+            print_error(f"Failed to read photo data from {photo_path}")
+            return False
 
-    # Use with statement to properly handle file closing
     try:
         url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendPhoto"
-        print_info(
-            f"Preparing to send photo {os.path.basename(photo_path)} to Telegram..."
-        )
+        print_info(f"Preparing to send photo {photo_name} to Telegram...")
 
-        # Open the file with 'with' to ensure proper closing
-        with open(photo_path, "rb") as photo_file:
-            # Read the file data into memory
-            photo_data = photo_file.read()
+        # Prepare the multipart/form-data
+        files = {"photo": (photo_name, photo_data, "image/jpeg")}
 
-            if not photo_data:
-                print_error(f"Failed to read photo data from {photo_path}")
-                return False
+        data = {"chat_id": TELEGRAM_CHAT_ID}
+        if caption:
+            data["caption"] = caption
 
-            # Prepare the multipart/form-data
-            files = {"photo": (os.path.basename(photo_path), photo_data, "image/jpeg")}
-
-            data = {"chat_id": TELEGRAM_CHAT_ID}
-            if caption:
-                data["caption"] = caption
-
-            # Send the request
-            print_info(f"Sending HTTP request to Telegram API...")
-            response = requests.post(url, data=data, files=files, timeout=30)
-
-            # Check response
-            if response.status_code == 200:
-                print_success(
-                    f"Telegram photo sent successfully: {os.path.basename(photo_path)}"
-                )
-                response_json = response.json()
-                print_info(f"Telegram API response: {response_json}")
-                return True
-            else:
-                print_error(
-                    f"Failed to send photo. Status code: {response.status_code}"
-                )
-                print_error(f"Response: {response.text}")
-                return False
+        # Send the request
+        print_info(f"Sending HTTP request to Telegram API...")
+        response = requests.post(url, data=data, files=files, timeout=30)
+
+        # Check response
+        if response.status_code == 200:
+            print_success(f"Telegram photo sent successfully: {photo_name}")
+            response_json = response.json()
+            print_info(f"Telegram API response: {response_json}")
+            return True
+        else:
+            print_error(f"Failed to send photo. Status code: {response.status_code}")
+            print_error(f"Response: {response.text}")
+            return False
     except Exception as e:
         print_error(f"Error sending Telegram photo: {e}")
         import traceback
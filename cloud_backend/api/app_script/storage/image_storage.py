@@ -22,7 +22,13 @@ def create_alert_folder(timestamp=None):
 
 
 def save_image(
-    image_data, folder_path, image_count, sensor_data, detection_result=None
+    image_data,
+    folder_path,
+    image_count,
+    sensor_data,
+    detection_result=None,
+    timings=None,
+    existing_paths=None,
 ):
     """
     Save image data to the specified folder with metadata in the filename
@@ -33,6 +39,9 @@ def save_image(
         image_count: Image sequence number
         sensor_data: Dictionary containing sensor readings
         detection_result: Optional AI detection results
+        timings: Optional per-stage durations (ms) of this frame so far
+        existing_paths: (original_path, detection_path) of an identical frame
+            already stored; only the metadata is written, pointing at them
 
     Returns:
         tuple: (original_path, detection_path, metadata_path)
@@ -48,22 +57,26 @@ def save_image(
         f"S{sensor_data.get('smoke', 0)}"
     )
 
-    # Original image path
-    original_path = f"{folder_path}/{base_filename}_original.jpg"
+    if existing_paths:
+        original_path, detection_path = existing_paths
+    else:
+        # Original image path
+        original_path = f"{folder_path}/{base_filename}_original.jpg"
 
-    # Detection image path (if available)
-    detection_path = (
-        f"{folder_path}/{base_filename}_detection.jpg" if detection_result else None
-    )
+        # Detection image path (if available)
+        detection_path = (
+            f"{folder_path}/{base_filename}_detection.jpg" if detection_result else None
+        )
 
     # Metadata path for saving detection results
     metadata_path = f"{folder_path}/{base_filename}_metadata.json"
 
     try:
         # Save original image
-        with open(original_path, "wb") as f:
-            f.write(image_data)
-        print_success(f"Original image saved to {original_path}")
+        if not existing_paths:
+            with open(original_path, "wb") as f:
+                f.write(image_data)
+            print_success(f"Original image saved to {original_path}")
 
         # Save detection metadata if available
         if detection_result:
@@ -79,6 +92,12 @@ def save_image(
                 "sensor_data": sensor_data,
                 "detection_info": detection_info,
             }
+            if existing_paths:
+                metadata["duplicate_of"] = original_path
+            if timings:
+                metadata["timings_ms"] = {
+                    stage: round(ms, 2) for stage, ms in timings.items()
+                }
 
             with open(metadata_path, "w") as f:
                 json.dump(metadata, f, indent=4)
@@ -0,0 +1,64 @@
+import sys
+import time
+from config import FRAMESIZE_UXGA
+from camera.capture import capture_frame
+from camera.fake_camera import FakeCamera
+from camera.stream import get_stream_reader, stop_stream_readers
+from utils.terminal import print_info, print_error, print_success
+
+
+def _wait_connected(reader, timeout=5):
+    deadline = time.time() + timeout
+    while not reader.connected and time.time() < deadline:
+        time.sleep(0.05)
+    return reader.connected
+
+
+def test_stream_capture():
+    """Frames come from the MJPEG stream without further HTTP requests"""
+    camera = FakeCamera(stream_fps=20).start()
+    try:
+        reader = get_stream_reader(camera.address)
+        assert _wait_connected(reader), "Stream did not connect"
+        assert reader.wait_for_frame(5) is not None, "No frame on the stream"
+
+        frame = capture_frame(FRAMESIZE_UXGA, camera.address, mode="stream")
+        assert frame is not None, "No frame captured"
+        assert frame.dimensions == (1600, 1200), f"Got {frame.dimensions}"
+        assert camera.captures == 0, "Frame came from /capture, not the stream"
+        assert any(frame is buffered for buffered in reader.frames)
+
+        # The framesize is known now, so the next frame needs no request at all
+        requests_before = camera.requests
+        frame = capture_frame(FRAMESIZE_UXGA, camera.address, mode="stream")
+        assert frame is not None, "No second frame captured"
+        assert camera.requests == requests_before, "Stream frame made a request"
+        print_info(f"{camera.frames_streamed} frame(s) streamed")
+    finally:
+        stop_stream_readers()
+        camera.stop()
+
+
+def test_stream_fallback():
+    """A camera without a working stream falls back to /capture"""
+    camera = FakeCamera().start()
+    camera.stream_enabled = False
+    try:
+        frame = capture_frame(FRAMESIZE_UXGA, camera.address, mode="stream")
+        assert frame is not None, "Fallback capture failed"
+        assert frame.dimensions == (1600, 1200), f"Got {frame.dimensions}"
+        assert camera.frames_streamed == 0, "Stream should have been unavailable"
+        assert camera.captures == 1, "Frame should have come from /capture"
+    finally:
+        stop_stream_readers()
+        camera.stop()
+
+
+if __name__ == "__main__":
+    try:
+        test_stream_capture()
+        test_stream_fallback()
+    except AssertionError as e:
+        print_error(f"Camera stream tests failed: {e}")
+        sys.exit(1)
+    print_success("All camera stream tests passed!")
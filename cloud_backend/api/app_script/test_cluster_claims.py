@@ -0,0 +1,95 @@
+import sys
+import threading
+from verification.claims import SessionClaims
+from verification.scheduler import VerificationScheduler
+from utils.terminal import print_error, print_success
+
+DEVICE = "device-1"
+
+
+class FakeBroker:
+    """Holds published claims until delivered to every node, like a slow broker"""
+
+    def __init__(self):
+        self.nodes = []
+        self.messages = []
+
+    def publish(self, topic, payload, retain=False):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        self.messages.append((topic, payload))
+        return True
+
+    def deliver(self):
+        while self.messages:
+            topic, payload = self.messages.pop(0)
+            for node in self.nodes:
+                node.handle_message(topic, payload)
+
+
+def _claims(broker, node_id):
+    claims = SessionClaims(node_id=node_id, publisher=broker)
+    broker.nodes.append(claims)
+    return claims
+
+
+def test_claim_tie_break():
+    """Of two nodes claiming a device at once, exactly the earlier one keeps it"""
+    broker = FakeBroker()
+    first = _claims(broker, "node-a")
+    second = _claims(broker, "node-b")
+    lost = []
+    second.on_lost = lost.append
+
+    # Both claim before seeing each other's claim
+    first.claim(DEVICE)
+    second.claim(DEVICE)
+    broker.deliver()
+
+    assert first.owns(DEVICE), "Earlier claim should win"
+    assert not second.owns(DEVICE), "Later claim should lose"
+    assert lost == [DEVICE], lost
+    assert first.get_remote_owner(DEVICE) is None
+    assert second.get_remote_owner(DEVICE) == "node-a"
+
+    # The loser's release must not clear the winner's retained claim
+    second.release(DEVICE)
+    assert not broker.messages, broker.messages
+
+
+def test_scheduler_drops_lost_session():
+    """The losing node stops its running session and refuses new alerts"""
+    broker = FakeBroker()
+    first = _claims(broker, "node-a")
+    second = _claims(broker, "node-b")
+    started = threading.Event()
+    finished = []
+
+    def handler(job):
+        started.set()
+        finished.append(job.cancelled.wait(5))
+
+    scheduler = VerificationScheduler(handler, claims=second)
+    try:
+        first.claim(DEVICE)
+        assert scheduler.submit(DEVICE, {}) == "queued"
+        assert started.wait(5), "Session did not start"
+        broker.deliver()
+        assert scheduler.submit(DEVICE, {}) == "refused"
+
+        scheduler.stop(timeout=5)
+        assert finished == [True], "Running session was not cancelled"
+        assert scheduler.get_stats()["cancelled"] == 1
+        assert scheduler.get_active_count() == 0
+    finally:
+        scheduler.stop(timeout=5)
+
+
+if __name__ == "__main__":
+    try:
+        test_claim_tie_break()
+        test_scheduler_drops_lost_session()
+    except AssertionError as e:
+        print_error(f"Cluster claim tests failed: {e}")
+        sys.exit(1)
+    print_success("All cluster claim tests passed!")
@@ -0,0 +1,115 @@
+import sys
+import threading
+import time
+from verification.policy import (
+    DecisionPolicy,
+    DECISION_CONFIRMED,
+    DECISION_REJECTED,
+)
+from verification.scheduler import VerificationScheduler
+from verification.session import VerificationSession
+from utils.terminal import print_error, print_success
+
+
+class ScriptedDetector:
+    """Detector returning a fixed sequence of fire/clean results"""
+
+    def __init__(self, results):
+        self.results = list(results)
+
+    def detect(self, image, camera_id=None):
+        fire_detected = self.results.pop(0)
+        info = {"fire_confidence": 0.4 if fire_detected else 0.0}
+        return object(), "scripted", fire_detected, info
+
+
+def _feed(session, count):
+    for index in range(count):
+        frame = {
+            "index": index,
+            "camera": "camera",
+            "image_data": f"frame {index}".encode(),
+            "image": None,
+            "timings": {},
+        }
+        session._detect(frame)
+
+
+def test_policy_rejection_then_confirmation():
+    """Fire after an early rejection turns the decision into confirmed"""
+    policy = DecisionPolicy(
+        confirm_frames=2,
+        window_frames=3,
+        confidence_threshold=0,
+        reject_clean_frames=2,
+    )
+    assert policy.update(False) is None
+    assert policy.update(False) == DECISION_REJECTED
+    assert policy.decided_at_frame == 2
+    assert policy.update(True) == DECISION_REJECTED
+    assert policy.update(True) == DECISION_CONFIRMED
+    assert policy.decided_at_frame == 4
+
+    # A confirmation is final
+    for _ in range(5):
+        assert policy.update(False) == DECISION_CONFIRMED
+    assert policy.is_fire()
+
+
+def test_session_republishes_confirmation():
+    """A session that keeps capturing reports the later confirmation"""
+    decisions = []
+    session = VerificationSession(
+        name="Test",
+        payload_source=dict,
+        detector=ScriptedDetector([False] * 4 + [True] * 2 + [False] * 2),
+        policy=DecisionPolicy(
+            confirm_frames=2,
+            window_frames=3,
+            confidence_threshold=0,
+            reject_clean_frames=4,
+        ),
+        on_decision=lambda decision, session: decisions.append(decision),
+    )
+    _feed(session, 8)
+    assert decisions == [DECISION_REJECTED, DECISION_CONFIRMED], decisions
+
+
+def test_scheduler_serializes_shared_camera():
+    """Devices falling back to the same camera are never verified at once"""
+    lock = threading.Lock()
+    running = []
+    overlaps = []
+    done = threading.Event()
+
+    def handler(job):
+        with lock:
+            if running:
+                overlaps.append((running[0], job.key))
+            running.append(job.key)
+        time.sleep(0.1)
+        with lock:
+            running.remove(job.key)
+            if job.key == "device-c":
+                done.set()
+
+    scheduler = VerificationScheduler(handler, max_workers=3)
+    try:
+        for device_id in ("device-a", "device-b", "device-c"):
+            scheduler.submit(device_id, {}, resources=["192.168.1.100"])
+        assert done.wait(5), "Sessions did not finish"
+        assert not overlaps, f"Sessions overlapped: {overlaps}"
+        assert scheduler.get_stats()["started"] == 3
+    finally:
+        scheduler.stop(timeout=5)
+
+
+if __name__ == "__main__":
+    try:
+        test_policy_rejection_then_confirmation()
+        test_session_republishes_confirmation()
+        test_scheduler_serializes_shared_camera()
+    except AssertionError as e:
+        print_error(f"Verification tests failed: {e}")
+        sys.exit(1)
+    print_success("All verification tests passed!")
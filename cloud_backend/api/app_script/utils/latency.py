@@ -0,0 +1,104 @@
+import threading
+from collections import deque
+import numpy as np
+from config import LATENCY_WINDOW
+
+# Stages of one frame, in the order they happen
+STAGES = (
+    "fetch",
+    "decode",
+    "preprocess",
+    "queue",
+    "inference",
+    "nms",
+    "render",
+    "encode",
+    "persist",
+    "notify",
+)
+
+
+class LatencyStats:
+    """
+    Rolling per-stage latency percentiles, kept per camera and model
+
+    Every frame's stage timings are added to a bounded window of the most
+    recent samples for its (camera, model, stage), so percentiles follow
+    current behaviour rather than the whole uptime.
+
+    Args:
+        window: Samples kept per camera/model/stage
+    """
+
+    def __init__(self, window=LATENCY_WINDOW):
+        self.window = window
+        self.samples = {}  # (camera, model, stage) -> deque of ms
+        self.lock = threading.Lock()
+
+    def record(self, camera, model, stage, ms):
+        """Add one stage duration in milliseconds"""
+        key = (camera or "unknown", model or "none", stage)
+        with self.lock:
+            samples = self.samples.get(key)
+            if samples is None:
+                samples = self.samples[key] = deque(maxlen=self.window)
+            samples.append(float(ms))
+
+    def record_frame(self, camera, model, timings):
+        """Add the timings of one frame, ignoring keys that are not stages"""
+        for stage in STAGES:
+            if stage in timings:
+                self.record(camera, model, stage, timings[stage])
+
+    def get_summary(self, camera=None, model=None):
+        """
+        Get percentiles per camera, model and stage
+
+        Args:
+            camera: Only include this camera
+            model: Only include this model
+
+        Returns:
+            dict: {camera: {model: {stage: {count, mean_ms, p50_ms, p95_ms,
+            p99_ms, max_ms}}}}, stages in pipeline order
+        """
+        with self.lock:
+            snapshot = {
+                key: list(samples)
+                for key, samples in self.samples.items()
+                if (camera is None or key[0] == camera)
+                and (model is None or key[1] == model)
+            }
+
+        summary = {}
+        for (cam, mdl, stage), values in sorted(
+            snapshot.items(), key=lambda item: (item[0][:2], STAGES.index(item[0][2]))
+        ):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            summary.setdefault(cam, {}).setdefault(mdl, {})[stage] = {
+                "count": len(values),
+                "mean_ms": round(float(np.mean(values)), 2),
+                "p50_ms": round(float(p50), 2),
+                "p95_ms": round(float(p95), 2),
+                "p99_ms": round(float(p99), 2),
+                "max_ms": round(max(values), 2),
+            }
+        return summary
+
+    def reset(self):
+        """Forget all samples"""
+        with self.lock:
+            self.samples.clear()
+
+
+_stats = None
+_stats_lock = threading.Lock()
+
+
+def get_latency_stats():
+    """Get the process-wide latency statistics"""
+    global _stats
+    with _stats_lock:
+        if _stats is None:
+            _stats = LatencyStats()
+        return _stats
@@ -0,0 +1 @@
+# Verification package
@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+from config import CLUSTER_NODE_ID, CLUSTER_CLAIM_TOPIC, CLUSTER_CLAIM_TTL_SECONDS
+from mqtt_client.publisher import get_publisher
+from mqtt_client.topics import parse_device_id
+from utils.terminal import print_info, print_warning
+
+
+class SessionClaims:
+    """
+    Cluster-wide ownership of per-device verification sessions
+
+    Each pipeline process keeps its session state local and announces the
+    devices it is verifying with a retained message on the device's claim
+    topic. Claims from other processes are tracked so a process can refuse
+    to start a duplicate session. Claims are refreshed while held and expire
+    after the TTL if the owning process disappears without releasing them.
+
+    Two nodes can still claim a device before either sees the other's claim.
+    Every node then applies the same tie-break: the claim with the lowest
+    (claimed_at, node_id) wins. The winner re-publishes its claim, the loser
+    forgets its own without clearing the retained message and reports the
+    device through on_lost so its session can be dropped.
+
+    Args:
+        node_id: Identifier of this pipeline process
+        ttl: Seconds a claim stays valid without a refresh
+        on_lost: Called as on_lost(device_id) when another node wins a
+            device this node claimed
+        publisher: Object with publish(topic, payload, retain=...) used to
+            announce claims (default: the shared MQTT publisher)
+    """
+
+    def __init__(
+        self,
+        node_id=CLUSTER_NODE_ID,
+        ttl=CLUSTER_CLAIM_TTL_SECONDS,
+        on_lost=None,
+        publisher=None,
+    ):
+        self.node_id = node_id
+        self.ttl = ttl
+        self.on_lost = on_lost
+        self.publisher = publisher
+        self.claim_pattern = CLUSTER_CLAIM_TOPIC.format(device_id="+")
+        self.remote = {}  # device_id -> (node_id, expires_at)
+        self.owned = {}  # device_id -> claimed_at
+        self.lock = threading.Lock()
+        self.refresh_thread = None
+        self.conflicts = 0
+        self.lost = 0
+
+    def is_claim_topic(self, topic):
+        """Check whether a topic carries verification claims"""
+        return parse_device_id(topic, pattern=self.claim_pattern) is not None
+
+    def owns(self, device_id):
+        """Check whether this node still holds its claim on a device"""
+        with self.lock:
+            return device_id in self.owned
+
+    def get_remote_owner(self, device_id):
+        """Get the node currently verifying a device, or None if no other node is"""
+        with self.lock:
+            claim = self.remote.get(device_id)
+            if claim is None:
+                return None
+            node_id, expires_at = claim
+            if time.time() >= expires_at:
+                del self.remote[device_id]
+                return None
+            return node_id
+
+    def claim(self, device_id):
+        """Announce that this node is verifying a device"""
+        with self.lock:
+            self.owned[device_id] = time.time()
+        self._start_refresh()
+        self._publish_claim(device_id)
+
+    def release(self, device_id):
+        """Release this node's claim on a device"""
+        with self.lock:
+            if self.owned.pop(device_id, None) is None:
+                return
+        # An empty retained message clears the claim on the broker
+        self._get_publisher().publish(
+            CLUSTER_CLAIM_TOPIC.format(device_id=device_id), b"", retain=True
+        )
+
+    def handle_message(self, topic, raw_payload):
+        """Track a claim published by any node (including our own echo)"""
+        device_id = parse_device_id(topic, pattern=self.claim_pattern)
+        if device_id is None:
+            return
+
+        if not raw_payload:
+            with self.lock:
+                self.remote.pop(device_id, None)
+            return
+
+        claim = json.loads(raw_payload.decode())
+        node_id = claim.get("node_id")
+        if node_id == self.node_id:
+            return
+
+        now = time.time()
+        claimed_at = claim.get("claimed_at", now)
+        refreshed_at = min(now, claim.get("refreshed_at", claimed_at))
+        expires_at = refreshed_at + claim.get("ttl", self.ttl)
+        with self.lock:
+            ours = self.owned.get(device_id)
+            won = ours is not None and (ours, self.node_id) < (claimed_at, node_id)
+            if ours is not None:
+                self.conflicts += 1
+            if won:
+                # The other node drops its session once it sees our claim
+                self.remote.pop(device_id, None)
+            else:
+                self.remote[device_id] = (node_id, expires_at)
+                if ours is not None:
+                    # Our claim was overwritten on the broker, only forget it
+                    del self.owned[device_id]
+                    self.lost += 1
+
+        if ours is None:
+            return
+        if won:
+            print_info(f"Node {node_id} also claimed {device_id}, keeping the claim")
+            self._publish_claim(device_id)
+        else:
+            print_warning(f"Node {node_id} won the claim on {device_id}, dropping it")
+            if self.on_lost is not None:
+                self.on_lost(device_id)
+
+    def get_stats(self):
+        """Get claim counters"""
+        with self.lock:
+            return {
+                "node_id": self.node_id,
+                "owned": len(self.owned),
+                "remote": len(self.remote),
+                "conflicts": self.conflicts,
+                "lost": self.lost,
+            }
+
+    def _get_publisher(self):
+        return self.publisher if self.publisher is not None else get_publisher()
+
+    def _publish_claim(self, device_id):
+        with self.lock:
+            claimed_at = self.owned.get(device_id)
+        if claimed_at is None:
+            return
+        # claimed_at stays fixed for the tie-break, refreshed_at drives expiry
+        payload = json.dumps(
+            {
+                "node_id": self.node_id,
+                "claimed_at": claimed_at,
+                "refreshed_at": time.time(),
+                "ttl": self.ttl,
+            }
+        )
+        self._get_publisher().publish(
+            CLUSTER_CLAIM_TOPIC.format(device_id=device_id), payload, retain=True
+        )
+
+    def _start_refresh(self):
+        with self.lock:
+            if self.refresh_thread is not None:
+                return
+            self.refresh_thread = threading.Thread(
+                target=self._refresh_loop, name="ClaimRefresh", daemon=True
+            )
+        self.refresh_thread.start()
+        print_info(f"Cluster claims active for node {self.node_id}")
+
+    def _refresh_loop(self):
+        """Re-publish held claims well before they expire"""
+        while True:
+            time.sleep(self.ttl / 3)
+            with self.lock:
+                devices = list(self.owned)
+            for device_id in devices:
+                self._publish_claim(device_id)
@@ -0,0 +1,90 @@
+import queue
+import threading
+import time
+import traceback
+from config import SESSION_STAGE_QUEUE_SIZE
+from utils.terminal import print_error, print_warning
+
+# Marks the end of the frame stream as it flows through the stages
+_END = object()
+
+
+class FramePipeline:
+    """
+    Per-session chain of frame stages, each on its own thread
+
+    Stages are connected by bounded queues so one frame can be captured
+    while the previous one is being analyzed, saved or uploaded. Each stage
+    is a callable taking a frame and returning it (or a replacement) to pass
+    on, or None to stop processing that frame.
+
+    submit() never blocks: if the first stage is backed up, the oldest
+    waiting frame is dropped so the capture cadence is kept. Later stages
+    use blocking puts, so frames that were analyzed are never lost.
+    """
+
+    def __init__(self, stages, queue_size=SESSION_STAGE_QUEUE_SIZE, name="Session"):
+        self.stages = stages  # list of (stage_name, callable)
+        self.name = name
+        self.queues = [queue.Queue(maxsize=queue_size) for _ in stages]
+        self.threads = []
+        self.dropped = 0
+
+    def start(self):
+        """Start one thread per stage"""
+        for index, (stage_name, _) in enumerate(self.stages):
+            thread = threading.Thread(
+                target=self._run_stage,
+                args=(index,),
+                name=f"{self.name}-{stage_name}",
+                daemon=True,
+            )
+            thread.start()
+            self.threads.append(thread)
+
+    def submit(self, frame):
+        """Hand a captured frame to the first stage without blocking"""
+        first = self.queues[0]
+        while True:
+            try:
+                first.put_nowait(frame)
+                return
+            except queue.Full:
+                try:
+                    first.get_nowait()
+                    self.dropped += 1
+                    print_warning(
+                        "Analysis is falling behind the capture cadence, dropped oldest frame"
+                    )
+                except queue.Empty:
+                    pass
+
+    def close(self, timeout=None):
+        """Wait for every submitted frame to pass through all stages"""
+        self.queues[0].put(_END)
+        deadline = None if timeout is None else time.time() + timeout
+        for thread in self.threads:
+            remaining = None if deadline is None else max(0, deadline - time.time())
+            thread.join(remaining)
+
+    def _run_stage(self, index):
+        stage_name, func = self.stages[index]
+        inbound = self.queues[index]
+        outbound = self.queues[index + 1] if index + 1 < len(self.queues) else None
+
+        while True:
+            frame = inbound.get()
+            if frame is _END:
+                if outbound is not None:
+                    outbound.put(_END)
+                break
+
+            try:
+                result = func(frame)
+            except Exception as e:
+                print_error(f"{stage_name} stage failed: {e}")
+                traceback.print_exc()
+                result = None
+
+            if result is not None and outbound is not None:
+                outbound.put(result)
@@ -0,0 +1,97 @@
+from collections import deque
+from config import (
+    VERIFY_CONFIRM_FRAMES,
+    VERIFY_WINDOW_FRAMES,
+    VERIFY_CONFIDENCE_THRESHOLD,
+    VERIFY_REJECT_CLEAN_FRAMES,
+)
+
+DECISION_CONFIRMED = "confirmed"
+DECISION_REJECTED = "rejected"
+
+
+class DecisionPolicy:
+    """
+    Sequential decision rule for a verification session
+
+    Frames are fed in as they are analyzed. The session is confirmed as soon
+    as K of the last N frames contain fire/smoke, or the summed fire/smoke
+    confidence passes a threshold, and rejected after M consecutive clean
+    frames. Until one of these happens the decision is None.
+
+    A confirmation is final, a rejection is not: a session that keeps
+    capturing after rejecting moves to confirmed if fire shows up later.
+    """
+
+    def __init__(
+        self,
+        confirm_frames=VERIFY_CONFIRM_FRAMES,
+        window_frames=VERIFY_WINDOW_FRAMES,
+        confidence_threshold=VERIFY_CONFIDENCE_THRESHOLD,
+        reject_clean_frames=VERIFY_REJECT_CLEAN_FRAMES,
+    ):
+        self.confirm_frames = confirm_frames
+        self.confidence_threshold = confidence_threshold
+        self.reject_clean_frames = reject_clean_frames
+        self.window = deque(maxlen=max(window_frames, confirm_frames))
+
+        self.frames = 0
+        self.positives = 0
+        self.consecutive_clean = 0
+        self.cumulative_confidence = 0.0
+        self.decision = None
+        self.decided_at_frame = None
+
+    def update(self, fire_detected, confidence=0.0):
+        """
+        Add one analyzed frame
+
+        Args:
+            fire_detected: Whether fire or smoke was detected in the frame
+            confidence: Highest fire/smoke confidence in the frame
+
+        Returns:
+            str: DECISION_CONFIRMED, DECISION_REJECTED, or None if undecided
+        """
+        self.frames += 1
+        self.window.append(bool(fire_detected))
+
+        if fire_detected:
+            self.positives += 1
+            self.consecutive_clean = 0
+            self.cumulative_confidence += confidence or 0.0
+        else:
+            self.consecutive_clean += 1
+
+        decision = self.decision
+        if decision != DECISION_CONFIRMED:
+            if sum(self.window) >= self.confirm_frames:
+                decision = DECISION_CONFIRMED
+            elif (
+                self.confidence_threshold
+                and self.cumulative_confidence >= self.confidence_threshold
+            ):
+                decision = DECISION_CONFIRMED
+            elif (
+                decision is None
+                and self.reject_clean_frames
+                and self.consecutive_clean >= self.reject_clean_frames
+            ):
+                decision = DECISION_REJECTED
+
+        if decision != self.decision:
+            self.decision = decision
+            self.decided_at_frame = self.frames
+
+        return self.decision
+
+    def is_fire(self):
+        """
+        Final verdict for the session
+
+        Uses the sequential decision if one was reached, otherwise falls back
+        to treating any positive frame as a verified wildfire.
+        """
+        if self.decision is not None:
+            return self.decision == DECISION_CONFIRMED
+        return self.positives > 0
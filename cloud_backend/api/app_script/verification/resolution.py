@@ -0,0 +1,70 @@
+import threading
+from config import (
+    VERIFY_SCREEN_FRAMESIZE,
+    VERIFY_CONFIRM_FRAMESIZE,
+    VERIFY_CONFIRM_HOLD_FRAMES,
+)
+from utils.terminal import print_info
+
+
+class AdaptiveResolution:
+    """
+    Two-tier capture resolution for a verification session
+
+    Frames are captured at the screening framesize until the detector
+    reports a fire/smoke candidate, then at the confirmation framesize for
+    evidence images and small-object confirmation. After hold_frames clean
+    full-resolution frames in a row the session drops back to screening.
+
+    Args:
+        screen_framesize: Framesize used while nothing has been seen
+        confirm_framesize: Framesize used once a candidate is detected
+        hold_frames: Clean confirmation frames before screening again
+    """
+
+    def __init__(
+        self,
+        screen_framesize=VERIFY_SCREEN_FRAMESIZE,
+        confirm_framesize=VERIFY_CONFIRM_FRAMESIZE,
+        hold_frames=VERIFY_CONFIRM_HOLD_FRAMES,
+    ):
+        self.screen_framesize = screen_framesize
+        self.confirm_framesize = confirm_framesize
+        self.hold_frames = hold_frames
+        self.framesize = screen_framesize
+        self.clean_frames = 0
+        self.escalations = 0
+        self.lock = threading.Lock()
+
+    def current(self):
+        """Framesize to request for the next capture"""
+        with self.lock:
+            return self.framesize
+
+    def update(self, fire_detected, framesize):
+        """
+        Feed one analyzed frame
+
+        Args:
+            fire_detected: Whether the detector saw fire/smoke
+            framesize: Framesize the frame was captured at
+        """
+        with self.lock:
+            if fire_detected:
+                self.clean_frames = 0
+                if self.framesize != self.confirm_framesize:
+                    self.framesize = self.confirm_framesize
+                    self.escalations += 1
+                    print_info(
+                        "Fire/smoke candidate seen, switching to full resolution"
+                    )
+            elif (
+                self.framesize == self.confirm_framesize
+                and framesize == self.confirm_framesize
+                and self.confirm_framesize != self.screen_framesize
+            ):
+                self.clean_frames += 1
+                if self.clean_frames >= self.hold_frames:
+                    self.framesize = self.screen_framesize
+                    self.clean_frames = 0
+                    print_info("No candidate at full resolution, back to screening")
@@ -0,0 +1,273 @@
+import heapq
+import itertools
+import threading
+import time
+import traceback
+from config import VERIFY_MAX_CONCURRENT_SESSIONS, VERIFY_MAX_PENDING_SESSIONS
+from utils.terminal import print_info, print_error, print_warning
+
+
+class VerificationJob:
+    """A verification request for one device that absorbs repeated alert messages"""
+
+    def __init__(self, key, payload, priority=0, resources=()):
+        self.key = key
+        self.payload = payload
+        self.priority = priority
+        self.resources = frozenset(resources)
+        self.alert_count = 1
+        self.first_seen = time.time()
+        self.last_seen = self.first_seen
+        self.state = "pending"
+        self.lock = threading.Lock()
+        self.cancelled = threading.Event()
+        self.on_cancel = None  # Set by the handler to stop a running session
+
+    def fold(self, payload, priority):
+        """Merge a newer alert message for the same device into this job"""
+        with self.lock:
+            self.payload = payload
+            self.priority = min(self.priority, priority)
+            self.alert_count += 1
+            self.last_seen = time.time()
+
+    def get_payload(self):
+        """Get the most recent sensor payload folded into this job"""
+        with self.lock:
+            return self.payload
+
+    def cancel(self):
+        """Drop this job, stopping its session if one is running"""
+        self.cancelled.set()
+        with self.lock:
+            on_cancel = self.on_cancel
+        if on_cancel is not None:
+            on_cancel()
+
+
+class VerificationScheduler:
+    """
+    Runs verification sessions on a bounded worker pool
+
+    At most one job exists per key: alerts for a device that is already
+    queued or being verified are folded into that job instead of starting
+    another session. Pending jobs run in priority order (lowest value first).
+    Jobs naming the same resource (e.g. devices that share a camera) never
+    run at the same time: a job waits while another one holds its resources.
+
+    In cluster mode an optional SessionClaims instance extends this across
+    processes: jobs for devices claimed by another node are refused, and
+    each job holds a claim on its device until it finishes. A job whose
+    claim is lost to another node is cancelled, whether pending or running.
+    """
+
+    def __init__(
+        self,
+        handler,
+        max_workers=VERIFY_MAX_CONCURRENT_SESSIONS,
+        max_pending=VERIFY_MAX_PENDING_SESSIONS,
+        claims=None,
+    ):
+        self.handler = handler
+        self.claims = claims
+        if claims is not None:
+            claims.on_lost = self.cancel
+        self.max_workers = max(1, max_workers)
+        self.max_pending = max_pending
+        self.jobs = {}  # key -> VerificationJob (pending or active)
+        self.busy = set()  # Resources held by active jobs
+        self.heap = []
+        self.counter = itertools.count()
+        self.condition = threading.Condition()
+        self.workers = []
+        self.running = False
+        self.closed = False
+        self.active = 0
+
+        # Counters for monitoring
+        self.started = 0
+        self.folded = 0
+        self.rejected = 0
+        self.refused = 0
+        self.cancelled = 0
+
+    def start(self):
+        """Start the worker pool"""
+        with self.condition:
+            if self.running:
+                return
+            self.running = True
+
+        for index in range(self.max_workers):
+            worker = threading.Thread(
+                target=self._worker, name=f"Verify-{index}", daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+
+        print_info(f"Verification scheduler started with {self.max_workers} worker(s)")
+
+    def stop(self, timeout=None):
+        """Stop accepting work and wait for the workers to exit"""
+        with self.condition:
+            self.closed = True
+            if not self.running:
+                return
+            self.running = False
+            self.condition.notify_all()
+
+        for worker in self.workers:
+            worker.join(timeout)
+        self.workers = []
+
+    def submit(self, key, payload, priority=0, resources=()):
+        """
+        Schedule verification for a device, folding into an existing job if present
+
+        Args:
+            key: Device/camera identifier, at most one job per key
+            payload: Sensor payload that triggered the alert
+            priority: Lower values are verified first
+            resources: Identifiers (e.g. camera addresses) the job needs to
+                itself; jobs sharing one are run one after another
+
+        Returns:
+            str: "queued", "folded", "refused" (claimed by another node) or
+                "rejected" (queue full or scheduler stopped)
+        """
+        if self.closed:
+            return "rejected"
+        self.start()
+
+        with self.condition:
+            job = self.jobs.get(key)
+            if job is not None:
+                previous_priority = job.priority
+                job.fold(payload, priority)
+                self.folded += 1
+                # Re-push so a pending job can move up the queue
+                if job.state == "pending" and job.priority != previous_priority:
+                    heapq.heappush(self.heap, (job.priority, next(self.counter), job))
+                return "folded"
+
+            if self.claims is not None:
+                owner = self.claims.get_remote_owner(key)
+                if owner is not None:
+                    self.refused += 1
+                    print_info(f"Verification for {key} is running on node {owner}")
+                    return "refused"
+
+            pending = len(self.jobs) - self.active
+            if pending >= self.max_pending:
+                self.rejected += 1
+                print_warning(
+                    f"Verification queue full ({pending} pending), rejecting alert for {key}"
+                )
+                return "rejected"
+
+            job = VerificationJob(key, payload, priority, resources)
+            self.jobs[key] = job
+            if self.claims is not None:
+                self.claims.claim(key)
+            heapq.heappush(self.heap, (priority, next(self.counter), job))
+            self.condition.notify()
+            return "queued"
+
+    def cancel(self, key):
+        """
+        Drop the job for a key, stopping its session if it is running
+
+        Returns:
+            bool: True if there was a job to cancel
+        """
+        with self.condition:
+            job = self.jobs.pop(key, None)
+            if job is None:
+                return False
+            self.cancelled += 1
+            if self.claims is not None:
+                self.claims.release(key)
+            # A pending job is skipped by the workers, an active one is
+            # cleaned up by its worker once the handler returns
+            if job.state == "pending":
+                job.state = "done"
+        print_warning(f"Verification for {key} cancelled")
+        job.cancel()
+        return True
+
+    def get_active_count(self):
+        """Get the number of sessions currently running"""
+        with self.condition:
+            return self.active
+
+    def get_pending_count(self):
+        """Get the number of jobs waiting for a worker"""
+        with self.condition:
+            return len(self.jobs) - self.active
+
+    def get_stats(self):
+        """Get scheduler counters"""
+        with self.condition:
+            return {
+                "active": self.active,
+                "pending": len(self.jobs) - self.active,
+                "started": self.started,
+                "folded": self.folded,
+                "rejected": self.rejected,
+                "refused": self.refused,
+                "cancelled": self.cancelled,
+            }
+
+    def _next_job(self):
+        """Block until a pending job is available, or return None on shutdown"""
+        with self.condition:
+            while True:
+                job = None
+                deferred = []
+                while self.heap:
+                    entry = heapq.heappop(self.heap)
+                    priority, _, candidate = entry
+                    # Skip stale heap entries left behind by folding
+                    if candidate.state != "pending" or priority != candidate.priority:
+                        continue
+                    # Another session is using one of its cameras
+                    if not self.busy.isdisjoint(candidate.resources):
+                        deferred.append(entry)
+                        continue
+                    job = candidate
+                    break
+                for entry in deferred:
+                    heapq.heappush(self.heap, entry)
+
+                if job is not None:
+                    job.state = "active"
+                    self.busy.update(job.resources)
+                    self.active += 1
+                    self.started += 1
+                    return job
+                if not self.running:
+                    return None
+                self.condition.wait()
+
+    def _worker(self):
+        while True:
+            job = self._next_job()
+            if job is None:
+                break
+
+            try:
+                self.handler(job)
+            except Exception as e:
+                print_error(f"Verification session for {job.key} failed: {e}")
+                traceback.print_exc()
+            finally:
+                with self.condition:
+                    job.state = "done"
+                    self.active -= 1
+                    self.busy.difference_update(job.resources)
+                    # Jobs waiting for these resources can run now
+                    self.condition.notify_all()
+                    if self.jobs.get(job.key) is job:
+                        del self.jobs[job.key]
+                        if self.claims is not None:
+                            self.claims.release(job.key)
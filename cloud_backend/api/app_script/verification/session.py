@@ -0,0 +1,315 @@
+import threading
+import time
+from camera.capture import capture_frame
+from camera.multi_capture import iter_frames
+from camera.client import get_camera_client
+from camera.deadline import Deadline
+from ai_detection.result_cache import content_hash
+from config import (
+    CAMERA_IP,
+    CAPTURE_DURATION_SECONDS,
+    CAPTURE_INTERVAL_SECONDS,
+    FRAMESIZE_UXGA,
+    SESSION_STAGE_QUEUE_SIZE,
+)
+from verification.pipeline import FramePipeline
+from utils.latency import get_latency_stats
+from utils.terminal import print_info, print_warning, print_alert
+
+
+def _lazy_timings(frame):
+    """Render/encode times of the frame's detection image so far"""
+    detection_result = frame.get("detection")
+    if not detection_result or detection_result[0] is None:
+        return {}
+    return dict(getattr(detection_result[0], "timings", {}))
+
+
+class VerificationSession:
+    """
+    Capture/analysis session engine shared by every alert workflow
+
+    Frames are captured on a fixed cadence for a bounded duration, one per
+    camera per round with all cameras fetched concurrently, and flow
+    through a FramePipeline: a detect stage (optional detector plus optional
+    decision policy) followed by one stage per sink. Every stage is timed
+    per frame and summarized when the session ends; the finer detection
+    stages (decode, inference, render, ...) are kept in frame["timings"]
+    and added to the process-wide latency stats once a frame is done.
+
+    Only fresh analyses are evidence: results the frame gate carried over
+    from an earlier frame are stored but not fed to the policy or the
+    resolution, so enabling the gate does not change the confirmation rule.
+    Likewise a camera resending byte-identical frames counts only once.
+
+    Args:
+        name: Name used for the stage threads and log lines
+        payload_source: Callable returning the latest sensor payload
+        duration_seconds: Maximum session length
+        interval_seconds: Start-to-start capture cadence
+        detector: FireDetector with a loaded model, or None to skip detection
+        policy: DecisionPolicy fed with every analyzed frame, or None
+        on_decision: Called as on_decision(decision, session) when the
+            policy reaches a verdict, and again if a rejection later turns
+            into a confirmation
+        stop_on_decision: Stop capturing as soon as the policy decides
+        sinks: Objects with a name and handle(frame, session), run in order
+        framesize: Camera framesize requested for every frame
+        cameras: Camera addresses sampled every round (default: CAMERA_IP)
+        resolution: Optional AdaptiveResolution choosing the framesize per
+            round from the detections so far (overrides framesize)
+    """
+
+    def __init__(
+        self,
+        name,
+        payload_source,
+        duration_seconds=CAPTURE_DURATION_SECONDS,
+        interval_seconds=CAPTURE_INTERVAL_SECONDS,
+        detector=None,
+        policy=None,
+        on_decision=None,
+        stop_on_decision=False,
+        sinks=(),
+        framesize=FRAMESIZE_UXGA,
+        cameras=None,
+        resolution=None,
+    ):
+        self.name = name
+        self.payload_source = payload_source
+        self.duration_seconds = duration_seconds
+        self.interval_seconds = interval_seconds
+        self.detector = detector
+        self.policy = policy
+        self.on_decision = on_decision
+        self.stop_on_decision = stop_on_decision
+        self.sinks = list(sinks)
+        self.framesize = framesize
+        self.cameras = list(cameras or [CAMERA_IP])
+        self.resolution = resolution
+
+        self.stop_event = threading.Event()
+        self.reported_decision = None
+        self.frames_captured = 0
+        self.frames_analyzed = 0
+        self.frames_with_fire = 0
+        self.frames_reused = 0  # Frame gate results carried over, not evidence
+        self.frames_repeated = 0  # Byte-identical resends, not evidence
+        self.seen_content = set()  # (camera, content hash) already counted
+        self.timings = {}  # stage -> list of durations in ms
+        self.timings_lock = threading.Lock()
+        self.latency_stats = get_latency_stats()
+
+    def get_payload(self):
+        """Get the latest sensor payload for this session"""
+        return self.payload_source()
+
+    def stop(self):
+        """Ask the capture loop to stop after the current frame"""
+        self.stop_event.set()
+
+    def run(self):
+        """Run the session to completion and return self for inspection"""
+        stages = [("Detect", self._timed("detect", self._detect))]
+        for sink in self.sinks:
+            stages.append(
+                (sink.name, self._timed(sink.name.lower(), self._sink_stage(sink)))
+            )
+        # Frames are complete once they leave the last stage
+        name, last = stages[-1]
+        stages[-1] = (name, self._reported(last))
+
+        # Room for a full round of frames so no viewpoint is dropped on arrival
+        pipeline = FramePipeline(
+            stages,
+            queue_size=max(SESSION_STAGE_QUEUE_SIZE, len(self.cameras)),
+            name=self.name,
+        )
+        pipeline.start()
+        try:
+            self._capture_loop(pipeline)
+        finally:
+            # Let in-flight frames finish analysis, storage and upload
+            pipeline.close()
+
+        self._print_timing_summary()
+        return self
+
+    def get_timing_summary(self):
+        """Get count/avg/max per stage in milliseconds"""
+        with self.timings_lock:
+            return {
+                stage: {
+                    "count": len(values),
+                    "avg_ms": sum(values) / len(values),
+                    "max_ms": max(values),
+                }
+                for stage, values in self.timings.items()
+                if values
+            }
+
+    def _record(self, stage, started):
+        elapsed = (time.time() - started) * 1000
+        with self.timings_lock:
+            self.timings.setdefault(stage, []).append(elapsed)
+        return elapsed
+
+    def _timed(self, stage, func):
+        def run_stage(frame):
+            started = time.time()
+            lazy_before = _lazy_timings(frame)
+            try:
+                return func(frame)
+            finally:
+                elapsed = self._record(stage, started)
+                timings = frame.setdefault("timings", {})
+                # Rendering/encoding happens in whichever sink needs the image
+                # first; report it as its own stages, not as part of that sink
+                lazy_after = _lazy_timings(frame)
+                timings.update(lazy_after)
+                elapsed -= sum(lazy_after.values()) - sum(lazy_before.values())
+                timings[stage] = max(0.0, elapsed)
+
+        return run_stage
+
+    def _reported(self, func):
+        def run_stage(frame):
+            try:
+                return func(frame)
+            finally:
+                self.latency_stats.record_frame(
+                    frame.get("camera"), frame.get("model"), frame.get("timings", {})
+                )
+
+        return run_stage
+
+    def _sink_stage(self, sink):
+        return lambda frame: sink.handle(frame, self)
+
+    def _capture_loop(self, pipeline):
+        end_time = time.time() + self.duration_seconds
+        next_capture = time.time()
+        # Retries against a slow or dead camera never outlive the session
+        deadline = Deadline(expires_at=end_time)
+
+        while time.time() < end_time and not self.stop_event.is_set():
+            print_info(f"Capturing image {self.frames_captured+1}...")
+            captured_at = time.time()
+            framesize = self.resolution.current() if self.resolution else self.framesize
+            if len(self.cameras) == 1:
+                camera_ip = self.cameras[0]
+                results = [
+                    (
+                        camera_ip,
+                        capture_frame(framesize, camera_ip, deadline=deadline),
+                    )
+                ]
+            else:
+                results = iter_frames(self.cameras, framesize, deadline=deadline)
+
+            # Frames are submitted as each camera answers
+            for camera_ip, image in results:
+                fetch_ms = self._record("fetch", captured_at)
+                if image is not None:
+                    pipeline.submit(
+                        {
+                            "index": self.frames_captured,
+                            "camera": camera_ip,
+                            "framesize": framesize,
+                            "image_data": image.data,
+                            "image": image,
+                            "captured_at": image.captured_at,
+                            "timings": {"fetch": fetch_ms},
+                        }
+                    )
+                    self.frames_captured += 1
+                else:
+                    print_warning(
+                        f"Failed to capture image from camera {camera_ip}, skipping..."
+                    )
+
+            if all(get_camera_client(ip).breaker.is_open() for ip in self.cameras):
+                print_warning(
+                    f"{self.name}: all cameras unavailable, ending session early"
+                )
+                break
+
+            # Keep a fixed start-to-start cadence regardless of how long the
+            # capture took; analysis and I/O run on the pipeline's own threads
+            next_capture = max(next_capture + self.interval_seconds, time.time())
+            wait_time = min(next_capture, end_time) - time.time()
+            if wait_time > 0:
+                self.stop_event.wait(wait_time)
+
+    def _detect(self, frame):
+        frame["detection"] = None
+        if self.detector is None:
+            return frame
+
+        print_info(f"Processing image {frame['index']+1} with YOLO...")
+        detection_result = self.detector.detect(
+            frame["image"], camera_id=frame.get("camera")
+        )
+        result_img, detection_text, fire_detected, detection_info = detection_result
+        frame["detection"] = detection_result
+        frame["model"] = detection_info.get("model")
+        frame["timings"].update(detection_info.get("timings", {}))
+
+        if result_img is None:
+            # Detection failed, keep the original image but don't count it
+            print_warning(
+                f"AI detection failed for image {frame['index']+1}: {detection_text}"
+            )
+            return frame
+
+        print_info(f"Detection result: {detection_text}")
+        if detection_info.get("reused"):
+            # The frame gate carried over the result of an earlier frame,
+            # which was already counted, so this frame is no new evidence
+            self.frames_reused += 1
+            return frame
+
+        # A camera resending the same buffered JPEG is one observation, not
+        # several: count it once per session whatever the cache returned
+        frame_hash = detection_info.get("content_hash")
+        if frame_hash is None and frame.get("image_data"):
+            frame_hash = content_hash(frame["image_data"])
+        if frame_hash is not None:
+            key = (frame.get("camera"), frame_hash)
+            if key in self.seen_content:
+                self.frames_repeated += 1
+                print_info(
+                    f"Image {frame['index']+1} repeats an earlier frame, not counted"
+                )
+                return frame
+            self.seen_content.add(key)
+
+        self.frames_analyzed += 1
+        if fire_detected:
+            self.frames_with_fire += 1
+            print_alert(f"FIRE/SMOKE DETECTED in image {frame['index']+1}!")
+
+        if self.resolution is not None:
+            self.resolution.update(fire_detected, frame.get("framesize"))
+
+        if self.policy is not None:
+            decision = self.policy.update(
+                fire_detected, detection_info.get("fire_confidence", 0.0)
+            )
+            if decision is not None and decision != self.reported_decision:
+                self.reported_decision = decision
+                if self.on_decision is not None:
+                    self.on_decision(decision, self)
+                if self.stop_on_decision:
+                    self.stop()
+        return frame
+
+    def _print_timing_summary(self):
+        summary = self.get_timing_summary()
+        if not summary:
+            return
+        parts = [
+            f"{stage} avg {stats['avg_ms']:.0f} ms (max {stats['max_ms']:.0f})"
+            for stage, stats in summary.items()
+        ]
+        print_info(f"Stage timings: {', '.join(parts)}")
@@ -0,0 +1,115 @@
+import os
+import time
+from storage.image_storage import save_image
+from utils.terminal import print_info, print_error, print_success, print_warning
+
+
+def _frame_has_fire(frame):
+    detection_result = frame.get("detection")
+    return bool(detection_result and detection_result[2])
+
+
+class StorageSink:
+    """Saves the original image, detection metadata and detection image of every frame"""
+
+    name = "Persist"
+
+    def __init__(self, alert_folder, detector=None):
+        self.alert_folder = alert_folder
+        self.detector = detector
+
+    def handle(self, frame, session):
+        detection_result = frame.get("detection")
+        save_detection = (
+            self.detector is not None
+            and detection_result
+            and detection_result[0] is not None
+        )
+
+        # A byte-identical frame was already stored: reference its files
+        frame_hash = detection_result[3].get("content_hash") if save_detection else None
+        stored = self.detector.get_saved_paths(frame_hash) if frame_hash else None
+
+        if save_detection and stored is None:
+            # Encode first so render/encode times make it into the metadata
+            try:
+                detection_result[0].encode()
+            except Exception as e:
+                print_error(f"Error encoding detection image {frame['index']+1}: {e}")
+        timings = dict(frame.get("timings", {}))
+        if save_detection:
+            timings.update(detection_result[0].timings)
+
+        original_path, detection_path, metadata_path = save_image(
+            frame["image_data"],
+            self.alert_folder,
+            frame["index"],
+            session.get_payload(),
+            detection_result,
+            timings=timings,
+            existing_paths=stored,
+        )
+        frame["original_path"] = original_path
+        frame["detection_path"] = None
+
+        if stored is not None:
+            print_info(
+                f"Identical frame already stored as {original_path}, not saved again"
+            )
+            frame["detection_path"] = detection_path
+        elif save_detection and detection_path:
+            # Save detection image if available
+            if self.detector.save_detection_image(detection_result[0], detection_path):
+                print_success(f"Detection image saved to {detection_path}")
+                frame["detection_path"] = detection_path
+                self.detector.set_saved_paths(frame_hash, original_path, detection_path)
+
+        return frame
+
+
+class TelegramSink:
+    """Sends the session's fire alert once, then every fire/smoke detection image"""
+
+    name = "Notify"
+
+    def __init__(self, alert_id, retry_delay=2):
+        self.alert_id = alert_id
+        self.retry_delay = retry_delay
+        self.alert_sent = False
+
+    def handle(self, frame, session):
+        if not _frame_has_fire(frame):
+            return frame
+
+        from notifications.telegram_notifier import send_fire_alert, send_photo
+
+        # Send initial alert only for the first fire detection
+        if not self.alert_sent:
+            send_fire_alert(self.alert_id, sensor_data=session.get_payload())
+            self.alert_sent = True
+
+        # Same JPEG bytes the storage sink wrote, encoded once
+        detection_img = frame["detection"][0]
+        if detection_img is None:
+            print_error(f"Detection image is missing for image {frame['index']+1}")
+            return frame
+        try:
+            photo = detection_img.encode()
+        except Exception as e:
+            print_error(f"Error encoding detection image {frame['index']+1}: {e}")
+            return frame
+
+        detection_path = frame.get("detection_path")
+        filename = (
+            os.path.basename(detection_path)
+            if detection_path
+            else f"{self.alert_id}_img_{frame['index']+1:03d}.jpg"
+        )
+        caption = f"Fire detected! Alert ID: {self.alert_id}, Image: {frame['index']+1}"
+        print_info(f"Sending detection image to Telegram: {filename}")
+        if not send_photo(photo, caption=caption, filename=filename):
+            print_warning(f"Failed to send image to Telegram, will retry once")
+            # Retry once after a short delay
+            time.sleep(self.retry_delay)
+            send_photo(photo, caption=caption, filename=filename)
+        return frame